@@ -0,0 +1,97 @@
+import asyncio
+import hmac
+import http
+from typing import Annotated, Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+
+from app.diagnostics.profiler import sample_stacks
+from app.diagnostics.setup import Diagnostics
+
+
+async def get_diagnostics(
+    request: Request,
+    x_diagnostics_token: Annotated[Optional[str], Header()] = None,
+) -> Diagnostics:
+    """
+    Dependência que fornece o estado do diagnóstico e valida o token.
+
+    Args:
+        request: Requisição atual
+        x_diagnostics_token: Header X-Diagnostics-Token
+
+    Returns:
+        Estado do diagnóstico do processo
+
+    Raises:
+        HTTPException: Se o diagnóstico estiver desligado ou o token for inválido
+    """
+    diagnostics = getattr(request.app.state, "diagnostics", None)
+    if diagnostics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Diagnóstico não está habilitado",
+        )
+    expected = diagnostics.settings.token
+    if not expected or not hmac.compare_digest(
+        (x_diagnostics_token or "").encode("utf-8"), expected.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token de diagnóstico inválido",
+        )
+    return diagnostics
+
+
+router = APIRouter(
+    prefix="/diagnostics",
+    tags=["Diagnostics"],
+    dependencies=[Depends(get_diagnostics)],
+)
+
+
+@router.get(
+    "/event-loop",
+    status_code=http.HTTPStatus.OK,
+    summary="Consultar o atraso do event loop",
+)
+async def get_event_loop_lag(
+    diagnostics: Annotated[Diagnostics, Depends(get_diagnostics)],
+) -> Dict[str, Any]:
+    """Estatísticas de atraso do event loop na janela recente."""
+    return diagnostics.lag_monitor.stats()
+
+
+@router.get(
+    "/profile",
+    response_class=PlainTextResponse,
+    status_code=http.HTTPStatus.OK,
+    summary="Capturar pilhas com o profiler por amostragem",
+    responses={409: {"description": "Já existe uma captura em andamento"}},
+)
+async def capture_profile(
+    diagnostics: Annotated[Diagnostics, Depends(get_diagnostics)],
+    seconds: Annotated[float, Query(gt=0, le=60)] = 5.0,
+    interval_ms: Annotated[float, Query(ge=1, le=1000)] = 10.0,
+) -> PlainTextResponse:
+    """
+    Amostra as pilhas de todas as threads durante ``seconds`` segundos e
+    retorna o resultado no formato collapsed (flamegraph.pl, speedscope).
+
+    Raises:
+        HTTPException: Se outra captura estiver em andamento
+    """
+    if diagnostics.profile_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Já existe uma captura em andamento",
+        )
+    async with diagnostics.profile_lock:
+        collapsed = await asyncio.to_thread(
+            sample_stacks, seconds, interval_ms / 1000
+        )
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'},
+    )
@@ -0,0 +1,202 @@
+import copy
+import hmac
+import http
+from typing import Annotated, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.database.database import MOCK_INVENTORY_DB, MOCK_INVENTORY_VERSIONS
+from app.models.schemas import (
+    ShardAssignment,
+    ShardRingStatus,
+    TenantSnapshot,
+)
+from app.repositories.change_log import INVENTORY_CHANGES
+from app.services.low_stock_rules import LOW_STOCK_RULES, LowStockRuleStore
+from app.sharding import state as sharding_state
+from app.sharding.state import ShardState
+
+
+async def get_shard_state(
+    x_shard_token: Annotated[Optional[str], Header()] = None,
+) -> ShardState:
+    """
+    Dependência que fornece o estado do shard local e valida o token interno.
+
+    Args:
+        x_shard_token: Header X-Shard-Token enviado pelos outros shards
+
+    Returns:
+        Estado do shard local
+
+    Raises:
+        HTTPException: Se o modo sharded estiver desligado ou o token for inválido
+    """
+    shard_state = sharding_state.SHARD_STATE
+    if shard_state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Modo sharded não está habilitado",
+        )
+    expected = shard_state.settings.token
+    if not expected or not hmac.compare_digest(
+        (x_shard_token or "").encode("utf-8"), expected.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token interno de shard inválido",
+        )
+    return shard_state
+
+
+router = APIRouter(
+    prefix="/internal/shards",
+    tags=["Sharding"],
+    dependencies=[Depends(get_shard_state)],
+)
+
+
+@router.get(
+    "/ring",
+    response_model=ShardRingStatus,
+    status_code=http.HTTPStatus.OK,
+    summary="Consultar o anel de shards",
+)
+async def get_ring(
+    shard_state: Annotated[ShardState, Depends(get_shard_state)],
+    database_session: Dict = Depends(lambda: MOCK_INVENTORY_DB),
+) -> ShardRingStatus:
+    """Retorna os shards do anel, as atribuições fixas e os tenants locais."""
+    return ShardRingStatus(
+        shard_id=shard_state.shard_id,
+        shards=shard_state.ring.shards,
+        pins=dict(shard_state.ring.pins),
+        local_tenants=sorted(database_session),
+    )
+
+
+@router.get(
+    "/tenants/{tenant_id}/owner",
+    response_model=ShardAssignment,
+    status_code=http.HTTPStatus.OK,
+    summary="Consultar o shard dono de um tenant",
+)
+async def get_owner(
+    tenant_id: str,
+    shard_state: Annotated[ShardState, Depends(get_shard_state)],
+) -> ShardAssignment:
+    """Retorna o shard responsável pelo tenant segundo o anel local."""
+    return ShardAssignment(shard_id=shard_state.owner_of(tenant_id))
+
+
+@router.post(
+    "/tenants/{tenant_id}/freeze",
+    response_model=TenantSnapshot,
+    status_code=http.HTTPStatus.OK,
+    summary="Congelar escritas e exportar o inventário de um tenant",
+)
+async def freeze_tenant(
+    tenant_id: str,
+    shard_state: Annotated[ShardState, Depends(get_shard_state)],
+    database_session: Dict = Depends(lambda: MOCK_INVENTORY_DB),
+    inventory_versions: Dict = Depends(lambda: MOCK_INVENTORY_VERSIONS),
+    low_stock_rules: LowStockRuleStore = Depends(lambda: LOW_STOCK_RULES),
+) -> TenantSnapshot:
+    """
+    Suspende as escritas do tenant, aguarda as que já estavam em andamento e
+    retorna uma cópia consistente do seu inventário e das suas regras de
+    estoque baixo. Leituras continuam sendo atendidas durante a migração.
+    """
+    if tenant_id not in database_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tenant '{tenant_id}' não está carregado neste shard",
+        )
+
+    shard_state.freeze(tenant_id)
+    await shard_state.wait_writes_drained(tenant_id)
+    return TenantSnapshot(
+        tenant_id=tenant_id,
+        version=inventory_versions.get(tenant_id, 0),
+        inventory=copy.deepcopy(database_session[tenant_id]),
+        low_stock_rules=low_stock_rules.get_custom_rules(tenant_id),
+    )
+
+
+@router.put(
+    "/tenants/{tenant_id}",
+    status_code=http.HTTPStatus.NO_CONTENT,
+    summary="Importar o inventário de um tenant",
+)
+async def import_tenant(
+    tenant_id: str,
+    snapshot: TenantSnapshot,
+    database_session: Dict = Depends(lambda: MOCK_INVENTORY_DB),
+    inventory_versions: Dict = Depends(lambda: MOCK_INVENTORY_VERSIONS),
+    low_stock_rules: LowStockRuleStore = Depends(lambda: LOW_STOCK_RULES),
+) -> None:
+    """Carrega no shard local o inventário e as regras exportados por outro shard."""
+    if snapshot.tenant_id != tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Tenant do snapshot difere do tenant da rota",
+        )
+
+    database_session[tenant_id] = snapshot.inventory
+    inventory_versions[tenant_id] = snapshot.version
+    # O histórico não migra: clientes anteriores à versão importada ressincronizam
+    INVENTORY_CHANGES.reset(tenant_id, snapshot.version)
+    if snapshot.low_stock_rules is not None:
+        low_stock_rules.set_rules(tenant_id, snapshot.low_stock_rules)
+    else:
+        low_stock_rules.discard(tenant_id)
+
+
+@router.put(
+    "/assignments/{tenant_id}",
+    status_code=http.HTTPStatus.NO_CONTENT,
+    summary="Fixar um tenant em um shard",
+)
+async def assign_tenant(
+    tenant_id: str,
+    assignment: ShardAssignment,
+    shard_state: Annotated[ShardState, Depends(get_shard_state)],
+) -> None:
+    """Atualiza o anel local para que o tenant passe a pertencer ao shard informado."""
+    try:
+        shard_state.ring.pin(tenant_id, assignment.shard_id)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(error)
+        )
+
+
+@router.post(
+    "/tenants/{tenant_id}/release",
+    status_code=http.HTTPStatus.NO_CONTENT,
+    summary="Liberar um tenant congelado",
+)
+async def release_tenant(
+    tenant_id: str,
+    shard_state: Annotated[ShardState, Depends(get_shard_state)],
+    drop: bool = True,
+    database_session: Dict = Depends(lambda: MOCK_INVENTORY_DB),
+    inventory_versions: Dict = Depends(lambda: MOCK_INVENTORY_VERSIONS),
+    low_stock_rules: LowStockRuleStore = Depends(lambda: LOW_STOCK_RULES),
+) -> None:
+    """
+    Retoma as escritas do tenant. Com ``drop=true`` (fim de uma migração) o
+    inventário local é descartado e as escritas pendentes seguem para o novo
+    dono; com ``drop=false`` a migração é abortada.
+    """
+    if drop and shard_state.owns(tenant_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Tenant '{tenant_id}' ainda pertence a este shard",
+        )
+    if drop:
+        database_session.pop(tenant_id, None)
+        inventory_versions.pop(tenant_id, None)
+        INVENTORY_CHANGES.discard(tenant_id)
+        low_stock_rules.discard(tenant_id)
+    shard_state.unfreeze(tenant_id)
@@ -1,18 +1,90 @@
+import hashlib
 import http
-from typing import Annotated, List
+from datetime import datetime
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
 
+from app.dependencies.auth_dependency import get_tenant_id
 from app.dependencies.inventory_dependencies import get_inventory_dependency
+from app.diagnostics.timing import TimedRoute
 from app.models.schemas import (
     ErrorResponse,
+    InventoryChanges,
     InventoryItem,
+    LowStockAlert,
+    LowStockRuleSet,
+    LowStockRulesRequest,
+    PredictedStockout,
+    RestockPolicy,
+    RestockRecommendation,
     RestockRequest,
     RestockResponse,
+    RestockStatus,
+    StockMovement,
+    StockMovementRequest,
+)
+from app.services.idempotency import (
+    IDEMPOTENCY_STORE,
+    IdempotencyKeyReusedError,
+    IdempotencyStore,
 )
 from app.services.inventory import InventoryService
+from app.services.low_stock_rules import LOW_STOCK_RULES, LowStockRuleStore
+
+router = APIRouter(prefix="/inventory", tags=["Inventory"], route_class=TimedRoute)
+
+# Header com a versão do inventário usada como ponto de partida de /changes
+VERSION_HEADER = "X-Inventory-Version"
+
+
+class _RestockFailed(Exception):
+    """Solicitação não enviada ao ERP; não é guardada para replays."""
+
+    def __init__(self, response: RestockResponse):
+        super().__init__(response.message)
+        self.response = response
+
 
-router = APIRouter(prefix="/inventory", tags=["Inventory"])
+# Registrada antes de /{product_name} para não ser capturada como produto
+@router.get(
+    "/changes",
+    response_model=InventoryChanges,
+    status_code=http.HTTPStatus.OK,
+    summary="Listar alterações desde uma versão",
+    description=(
+        "Retorna apenas os produtos adicionados, alterados ou removidos desde "
+        "a versão informada. Se o histórico dessa versão já foi descartado, "
+        "`resync_required` indica que o inventário completo deve ser baixado "
+        f"novamente (a versão atual vem no header `{VERSION_HEADER}`)."
+    ),
+    responses={
+        http.HTTPStatus.UNAUTHORIZED: {
+            "model": ErrorResponse,
+            "description": "Não autenticado",
+        },
+        http.HTTPStatus.FORBIDDEN: {
+            "model": ErrorResponse,
+            "description": "Tenant não autorizado",
+        },
+    },
+)
+async def get_inventory_changes(
+    since: Annotated[int, Query(ge=0, description="Versão já sincronizada")],
+    inventory_service: Annotated[InventoryService, Depends(get_inventory_dependency)],
+) -> InventoryChanges:
+    """
+    Lista as alterações do inventário do tenant desde uma versão.
+
+    Args:
+        since: Versão já sincronizada pelo cliente
+        inventory_service: Serviço de inventário injetado pela dependência
+
+    Returns:
+        InventoryChanges com os produtos alterados e a versão atual
+    """
+    return inventory_service.get_changes(since=since)
 
 
 @router.get(
@@ -63,11 +135,20 @@ async def get_inventory(
 
 @router.get(
     "",
-    response_model=List[InventoryItem],
+    response_model=None,
+    response_class=JSONResponse,
     status_code=http.HTTPStatus.OK,
     summary="Listar todo o estoque",
-    description="Retorna todos os produtos do estoque do tenant autenticado.",
+    description=(
+        "Retorna todos os produtos do estoque do tenant autenticado. O header "
+        f"`{VERSION_HEADER}` traz a versão do inventário, usada como `since` "
+        "em `/changes`."
+    ),
     responses={
+        http.HTTPStatus.OK: {
+            "model": List[InventoryItem],
+            "description": "Produtos do estoque do tenant",
+        },
         http.HTTPStatus.UNAUTHORIZED: {
             "model": ErrorResponse,
             "description": "Não autenticado",
@@ -80,26 +161,45 @@ async def get_inventory(
 )
 async def list_inventory(
     inventory_service: Annotated[InventoryService, Depends(get_inventory_dependency)],
-) -> list[InventoryItem]:
+) -> Response:
     """
     Lista todos os produtos do estoque do tenant.
 
+    Requisições idênticas e simultâneas do mesmo tenant compartilham a mesma
+    consulta e os mesmos bytes serializados, retornados sem nova validação; o
+    schema da resposta é documentado em ``responses``.
+
     Args:
         inventory_service: Serviço de inventário injetado pela dependência
 
     Returns:
         Lista de InventoryItem com todos os produtos do estoque
     """
-    return inventory_service.get_all_inventory()
+    # Lida antes da listagem: alterações concorrentes reaparecem em /changes
+    version = inventory_service.get_inventory_version()
+    return Response(
+        content=await inventory_service.get_all_inventory_json(),
+        media_type="application/json",
+        headers={VERSION_HEADER: str(version)},
+    )
 
 
 @router.get(
     "/alerts/low-stock",
-    response_model=List[InventoryItem],
+    response_model=None,
+    response_class=JSONResponse,
     status_code=http.HTTPStatus.OK,
     summary="Listar produtos com estoque baixo",
-    description="Retorna apenas os produtos com quantidade abaixo do nível mínimo.",
+    description=(
+        "Retorna os produtos que casam com as regras de estoque baixo do tenant, "
+        "com a severidade e a regra de cada alerta. Sem regras cadastradas, "
+        "lista os produtos com quantidade abaixo do nível mínimo."
+    ),
     responses={
+        http.HTTPStatus.OK: {
+            "model": List[LowStockAlert],
+            "description": "Produtos com estoque baixo e a regra de cada alerta",
+        },
         http.HTTPStatus.UNAUTHORIZED: {
             "model": ErrorResponse,
             "description": "Não autenticado",
@@ -112,17 +212,182 @@ async def list_inventory(
 )
 async def get_low_stock_alerts(
     inventory_service: Annotated[InventoryService, Depends(get_inventory_dependency)],
-) -> list[InventoryItem]:
+) -> Response:
     """
-    Lista apenas os itens onde sua quantidade é menor que o atributo indicador de quantidade mínima.
+    Lista os itens que casam com as regras de estoque baixo do tenant.
+
+    Requisições idênticas e simultâneas do mesmo tenant compartilham a mesma
+    consulta e os mesmos bytes serializados, retornados sem nova validação; o
+    schema da resposta é documentado em ``responses``.
 
     Args:
         inventory_service: Serviço de inventário injetado pela dependência
 
     Returns:
-        Lista de InventoryItem com produtos que precisam de reabastecimento
+        Lista de LowStockAlert com a severidade e a regra de cada produto
     """
-    return inventory_service.get_low_stock_items()
+    return Response(
+        content=await inventory_service.get_low_stock_items_json(),
+        media_type="application/json",
+    )
+
+
+@router.get(
+    "/alerts/rules",
+    response_model=LowStockRuleSet,
+    status_code=http.HTTPStatus.OK,
+    summary="Consultar regras de estoque baixo",
+    responses={
+        http.HTTPStatus.UNAUTHORIZED: {
+            "model": ErrorResponse,
+            "description": "Não autenticado",
+        },
+        http.HTTPStatus.FORBIDDEN: {
+            "model": ErrorResponse,
+            "description": "Tenant não autorizado",
+        },
+    },
+)
+async def get_low_stock_rules(
+    tenant_id: Annotated[str, Depends(get_tenant_id)],
+    rule_store: Annotated[LowStockRuleStore, Depends(lambda: LOW_STOCK_RULES)],
+) -> LowStockRuleSet:
+    """
+    Retorna as regras de estoque baixo em vigor para o tenant.
+
+    Args:
+        tenant_id: Identificador do tenant autenticado
+        rule_store: Regras de estoque baixo de cada tenant
+
+    Returns:
+        LowStockRuleSet com a versão e as regras
+    """
+    version, rules = rule_store.get_rules(tenant_id)
+    return LowStockRuleSet(tenant_id=tenant_id, version=version, rules=rules)
+
+
+@router.put(
+    "/alerts/rules",
+    response_model=LowStockRuleSet,
+    status_code=http.HTTPStatus.OK,
+    summary="Substituir regras de estoque baixo",
+    description=(
+        "Substitui todas as regras do tenant. Cada produto gera no máximo um "
+        "alerta: o da regra de maior severidade que casar com ele (empates "
+        "seguem a ordem da lista)."
+    ),
+    responses={
+        http.HTTPStatus.UNAUTHORIZED: {
+            "model": ErrorResponse,
+            "description": "Não autenticado",
+        },
+        http.HTTPStatus.FORBIDDEN: {
+            "model": ErrorResponse,
+            "description": "Tenant não autorizado",
+        },
+    },
+)
+async def set_low_stock_rules(
+    rules_request: LowStockRulesRequest,
+    tenant_id: Annotated[str, Depends(get_tenant_id)],
+    rule_store: Annotated[LowStockRuleStore, Depends(lambda: LOW_STOCK_RULES)],
+) -> LowStockRuleSet:
+    """
+    Substitui as regras de estoque baixo do tenant.
+
+    Args:
+        rules_request: Novas regras
+        tenant_id: Identificador do tenant autenticado
+        rule_store: Regras de estoque baixo de cada tenant
+
+    Returns:
+        LowStockRuleSet com a nova versão e as regras
+    """
+    version = rule_store.set_rules(tenant_id, rules_request.rules)
+    return LowStockRuleSet(
+        tenant_id=tenant_id, version=version, rules=rules_request.rules
+    )
+
+
+@router.get(
+    "/alerts/predicted-stockout",
+    response_model=List[PredictedStockout],
+    status_code=http.HTTPStatus.OK,
+    summary="Listar produtos com ruptura prevista",
+    description=(
+        "Retorna os produtos com consumo observado, ordenados pelos dias "
+        "estimados até a ruptura (mais urgentes primeiro)."
+    ),
+    responses={
+        http.HTTPStatus.UNAUTHORIZED: {
+            "model": ErrorResponse,
+            "description": "Não autenticado",
+        },
+        http.HTTPStatus.FORBIDDEN: {
+            "model": ErrorResponse,
+            "description": "Tenant não autorizado",
+        },
+    },
+)
+async def get_predicted_stockouts(
+    inventory_service: Annotated[InventoryService, Depends(get_inventory_dependency)],
+    horizon_days: Annotated[
+        Optional[float],
+        Query(gt=0, description="Limita aos produtos que se esgotam nesse prazo"),
+    ] = None,
+) -> list[PredictedStockout]:
+    """
+    Lista os produtos com ruptura prevista, do mais urgente ao menos urgente.
+
+    Args:
+        inventory_service: Serviço de inventário injetado pela dependência
+        horizon_days: Prazo máximo, em dias, para incluir um produto
+
+    Returns:
+        Lista de PredictedStockout ordenada por dias até a ruptura
+    """
+    return inventory_service.get_predicted_stockouts(horizon_days=horizon_days)
+
+
+@router.get(
+    "/alerts/recommendations",
+    response_model=List[RestockRecommendation],
+    status_code=http.HTTPStatus.OK,
+    summary="Sugerir quantidades de reabastecimento",
+    description=(
+        "Calcula a quantidade sugerida de pedido para todos os produtos com "
+        "estoque baixo do tenant, a partir do estoque mínimo e da política informada."
+    ),
+    responses={
+        http.HTTPStatus.UNAUTHORIZED: {
+            "model": ErrorResponse,
+            "description": "Não autenticado",
+        },
+        http.HTTPStatus.FORBIDDEN: {
+            "model": ErrorResponse,
+            "description": "Tenant não autorizado",
+        },
+        http.HTTPStatus.UNPROCESSABLE_CONTENT: {
+            "model": ErrorResponse,
+            "description": "Política inválida",
+        },
+    },
+)
+async def get_restock_recommendations(
+    policy: Annotated[RestockPolicy, Query()],
+    inventory_service: Annotated[InventoryService, Depends(get_inventory_dependency)],
+) -> list[RestockRecommendation]:
+    """
+    Sugere quantidades de reabastecimento para todo o tenant de uma só vez.
+
+    Args:
+        policy: Política de estoque-alvo (multiplicador, estoque de segurança e lote)
+        inventory_service: Serviço de inventário injetado pela dependência
+
+    Returns:
+        Lista de RestockRecommendation com as quantidades sugeridas
+    """
+    return inventory_service.get_restock_recommendations(policy=policy)
 
 
 @router.post(
@@ -130,8 +395,21 @@ async def get_low_stock_alerts(
     response_model=RestockResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Solicitar reabastecimento",
-    description="Dispara uma solicitação de reabastecimento para o sistema ERP externo.",
+    description=(
+        "Dispara uma solicitação de reabastecimento para o sistema ERP externo. "
+        "Com o ERP indisponível, a solicitação é enfileirada para reenvio (202, "
+        "status `pending`) ou recusada na hora (503, status `failed`), conforme "
+        "a configuração do servidor."
+    ),
     responses={
+        http.HTTPStatus.ACCEPTED: {
+            "model": RestockResponse,
+            "description": "ERP indisponível; solicitação enfileirada para reenvio",
+        },
+        http.HTTPStatus.SERVICE_UNAVAILABLE: {
+            "model": RestockResponse,
+            "description": "ERP indisponível; solicitação não enviada",
+        },
         http.HTTPStatus.UNAUTHORIZED: {
             "model": ErrorResponse,
             "description": "Não autenticado",
@@ -142,26 +420,210 @@ async def get_low_stock_alerts(
         },
         http.HTTPStatus.UNPROCESSABLE_CONTENT: {
             "model": ErrorResponse,
-            "description": "Dados inválidos",
+            "description": "Dados inválidos ou chave de idempotência reutilizada",
         },
     },
 )
 async def request_restock(
     restock_request: RestockRequest,
+    response: Response,
     inventory_service: Annotated[InventoryService, Depends(get_inventory_dependency)],
+    idempotency_store: Annotated[
+        IdempotencyStore, Depends(lambda: IDEMPOTENCY_STORE)
+    ],
+    idempotency_key: Annotated[
+        Optional[str],
+        Header(
+            alias="Idempotency-Key",
+            min_length=1,
+            max_length=255,
+            description="Chave para deduplicar novas tentativas da mesma solicitação",
+        ),
+    ] = None,
 ) -> RestockResponse:
     """
     Dispara uma ação para o sistema ERP externo solicitando
     o reabastecimento da quantidade especificada.
 
+    Quando o header Idempotency-Key é enviado, repetições da mesma
+    solicitação dentro da janela de retenção devolvem a resposta original
+    sem disparar um novo pedido ao ERP. Solicitações com status FAILED não
+    são guardadas, então podem ser repetidas com a mesma chave; a repetição
+    usa o mesmo Idempotency-Key no ERP, que descarta o pedido se a tentativa
+    anterior tiver chegado até ele.
+
     Args:
         restock_request: Dados da requisição de reabastecimento
+        response: Resposta HTTP, usada para sinalizar replays
         inventory_service: Serviço de inventário injetado pela dependência
+        idempotency_store: Armazém de resultados idempotentes
+        idempotency_key: Chave de idempotência enviada pelo cliente
 
     Returns:
         RestockResponse com o status da solicitação
     """
-    return inventory_service.request_restock(
-        product_name=restock_request.product_name,
-        quantity=restock_request.quantity,
+
+    async def restock() -> RestockResponse:
+        result = await inventory_service.request_restock(
+            product_name=restock_request.product_name,
+            quantity=restock_request.quantity,
+            idempotency_key=idempotency_key,
+        )
+        if result.status is RestockStatus.FAILED:
+            raise _RestockFailed(result)
+        return result
+
+    replayed = False
+    try:
+        if idempotency_key is None:
+            result = await restock()
+        else:
+            fingerprint = hashlib.sha256(
+                restock_request.model_dump_json().encode("utf-8")
+            ).hexdigest()
+            result, replayed = await idempotency_store.execute(
+                tenant_id=inventory_service.tenant_id,
+                key=idempotency_key,
+                fingerprint=fingerprint,
+                operation=restock,
+            )
+    except IdempotencyKeyReusedError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(error)
+        )
+    except _RestockFailed as error:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=error.response.model_dump(mode="json"),
+        )
+
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    if result.status is RestockStatus.PENDING:
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
+
+
+@router.post(
+    "/{product_name}/movements",
+    response_model=InventoryItem,
+    status_code=http.HTTPStatus.OK,
+    summary="Registrar movimentação de estoque",
+    description=(
+        "Aplica uma entrada ou saída de estoque ao produto, em um local, e a "
+        "registra no histórico de movimentações."
+    ),
+    responses={
+        http.HTTPStatus.NOT_FOUND: {
+            "model": ErrorResponse,
+            "description": "Produto não encontrado",
+        },
+        http.HTTPStatus.UNAUTHORIZED: {
+            "model": ErrorResponse,
+            "description": "Não autenticado",
+        },
+        http.HTTPStatus.FORBIDDEN: {
+            "model": ErrorResponse,
+            "description": "Tenant não autorizado",
+        },
+        http.HTTPStatus.UNPROCESSABLE_CONTENT: {
+            "model": ErrorResponse,
+            "description": "Dados inválidos ou estoque resultante negativo",
+        },
+    },
+)
+async def record_movement(
+    product_name: str,
+    movement_request: StockMovementRequest,
+    inventory_service: Annotated[InventoryService, Depends(get_inventory_dependency)],
+) -> InventoryItem:
+    """
+    Registra uma movimentação de estoque de um produto.
+
+    Args:
+        product_name: Nome do produto movimentado
+        movement_request: Dados da movimentação
+        inventory_service: Serviço de inventário injetado pela dependência
+
+    Returns:
+        InventoryItem com o estoque atualizado
+    """
+    try:
+        item = inventory_service.record_movement(
+            product_name=product_name,
+            delta=movement_request.delta,
+            location=movement_request.location,
+        )
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(error)
+        )
+
+    if item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Produto '{product_name}' não encontrado no estoque",
+        )
+
+    return item
+
+
+@router.get(
+    "/{product_name}/history",
+    response_model=List[StockMovement],
+    status_code=http.HTTPStatus.OK,
+    summary="Consultar histórico de movimentações",
+    description=(
+        "Retorna as movimentações de estoque de um produto, opcionalmente "
+        "filtradas por intervalo de tempo."
+    ),
+    responses={
+        http.HTTPStatus.NOT_FOUND: {
+            "model": ErrorResponse,
+            "description": "Produto não encontrado",
+        },
+        http.HTTPStatus.UNAUTHORIZED: {
+            "model": ErrorResponse,
+            "description": "Não autenticado",
+        },
+        http.HTTPStatus.FORBIDDEN: {
+            "model": ErrorResponse,
+            "description": "Tenant não autorizado",
+        },
+    },
+)
+async def get_movement_history(
+    product_name: str,
+    inventory_service: Annotated[InventoryService, Depends(get_inventory_dependency)],
+    start: Annotated[
+        Optional[datetime],
+        Query(alias="from", description="Início do intervalo (inclusivo)"),
+    ] = None,
+    end: Annotated[
+        Optional[datetime],
+        Query(alias="to", description="Fim do intervalo (inclusivo)"),
+    ] = None,
+) -> list[StockMovement]:
+    """
+    Consulta o histórico de movimentações de um produto.
+
+    Args:
+        product_name: Nome do produto
+        inventory_service: Serviço de inventário injetado pela dependência
+        start: Início do intervalo de tempo
+        end: Fim do intervalo de tempo
+
+    Returns:
+        Lista de StockMovement em ordem temporal
+    """
+    history = await inventory_service.get_movement_history(
+        product_name=product_name, start=start, end=end
     )
+
+    if history is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Produto '{product_name}' não encontrado no estoque",
+        )
+
+    return history
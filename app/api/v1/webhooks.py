@@ -0,0 +1,142 @@
+import http
+from typing import Annotated, List
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from app.dependencies.auth_dependency import get_tenant_id
+from app.diagnostics.timing import TimedRoute
+from app.models.schemas import (
+    ErrorResponse,
+    WebhookDeadLetter,
+    WebhookSubscription,
+    WebhookSubscriptionRequest,
+)
+from app.services.webhooks import (
+    WEBHOOK_DISPATCHER,
+    WebhookDestinationError,
+    WebhookDispatcher,
+)
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"], route_class=TimedRoute)
+
+AUTH_RESPONSES = {
+    http.HTTPStatus.UNAUTHORIZED: {
+        "model": ErrorResponse,
+        "description": "Não autenticado",
+    },
+    http.HTTPStatus.FORBIDDEN: {
+        "model": ErrorResponse,
+        "description": "Tenant não autorizado",
+    },
+}
+
+
+@router.post(
+    "",
+    response_model=WebhookSubscription,
+    status_code=http.HTTPStatus.CREATED,
+    summary="Cadastrar webhook",
+    description=(
+        "Cadastra uma URL que recebe, via POST e em lotes, os eventos de "
+        "produtos do tenant que entram ou saem do estoque baixo. URLs que "
+        "apontam para endereços internos (loopback, redes privadas, "
+        "link-local) são recusadas."
+    ),
+    responses={
+        http.HTTPStatus.UNPROCESSABLE_CONTENT: {
+            "model": ErrorResponse,
+            "description": "URL inválida ou destino não permitido",
+        },
+        **AUTH_RESPONSES,
+    },
+)
+async def create_subscription(
+    subscription_request: WebhookSubscriptionRequest,
+    tenant_id: Annotated[str, Depends(get_tenant_id)],
+    dispatcher: Annotated[WebhookDispatcher, Depends(lambda: WEBHOOK_DISPATCHER)],
+) -> WebhookSubscription:
+    """
+    Cadastra um webhook para o tenant autenticado.
+
+    Args:
+        subscription_request: URL do webhook
+        tenant_id: Identificador do tenant autenticado
+        dispatcher: Dispatcher de eventos de webhook
+
+    Returns:
+        WebhookSubscription cadastrada
+
+    Raises:
+        HTTPException: Se a URL apontar para um endereço não permitido
+    """
+    try:
+        return await dispatcher.subscribe(tenant_id, str(subscription_request.url))
+    except WebhookDestinationError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(error)
+        )
+
+
+@router.get(
+    "",
+    response_model=List[WebhookSubscription],
+    status_code=http.HTTPStatus.OK,
+    summary="Listar webhooks",
+    responses=AUTH_RESPONSES,
+)
+async def list_subscriptions(
+    tenant_id: Annotated[str, Depends(get_tenant_id)],
+    dispatcher: Annotated[WebhookDispatcher, Depends(lambda: WEBHOOK_DISPATCHER)],
+) -> List[WebhookSubscription]:
+    """Lista os webhooks do tenant autenticado."""
+    return dispatcher.list_subscriptions(tenant_id)
+
+
+@router.get(
+    "/dead-letters",
+    response_model=List[WebhookDeadLetter],
+    status_code=http.HTTPStatus.OK,
+    summary="Listar entregas que falharam",
+    description=(
+        "Retorna os lotes de eventos cuja entrega foi abandonada após esgotar "
+        "as tentativas, do mais antigo para o mais recente."
+    ),
+    responses=AUTH_RESPONSES,
+)
+async def list_dead_letters(
+    tenant_id: Annotated[str, Depends(get_tenant_id)],
+    dispatcher: Annotated[WebhookDispatcher, Depends(lambda: WEBHOOK_DISPATCHER)],
+) -> List[WebhookDeadLetter]:
+    """Lista as dead letters do tenant autenticado."""
+    return dispatcher.get_dead_letters(tenant_id)
+
+
+@router.delete(
+    "/{subscription_id}",
+    status_code=http.HTTPStatus.NO_CONTENT,
+    summary="Remover webhook",
+    responses={
+        http.HTTPStatus.NOT_FOUND: {
+            "model": ErrorResponse,
+            "description": "Webhook não encontrado",
+        },
+        **AUTH_RESPONSES,
+    },
+)
+async def delete_subscription(
+    subscription_id: str,
+    tenant_id: Annotated[str, Depends(get_tenant_id)],
+    dispatcher: Annotated[WebhookDispatcher, Depends(lambda: WEBHOOK_DISPATCHER)],
+) -> Response:
+    """
+    Remove um webhook do tenant autenticado.
+
+    Raises:
+        HTTPException: Se o webhook não existir para o tenant
+    """
+    if not dispatcher.unsubscribe(tenant_id, subscription_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Webhook '{subscription_id}' não encontrado",
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,28 +1,108 @@
 # Base de dados mockada para simular multi-tenancy
 # Cada tenant tem seu próprio inventário com dados diferentes
+# "quantity" é o total do produto, mantido incrementalmente a partir de "locations"
+# "category" é opcional e usado pelas regras de estoque baixo de cada tenant
 MOCK_INVENTORY_DB = {
     "LojaA": {
-        "Parafuso M8": {"quantity": 15, "min_stock": 50},
-        "Porca Sextavada": {"quantity": 200, "min_stock": 100},
-        "Arruela de Pressão": {"quantity": 5, "min_stock": 30},
-        "Broca 6mm": {"quantity": 45, "min_stock": 20},
-        "Chave de Fenda": {"quantity": 12, "min_stock": 15},
+        "Parafuso M8": {
+            "category": "Fixadores",
+            "quantity": 15,
+            "min_stock": 50,
+            "locations": {"Depósito": 10, "Prateleira": 5},
+        },
+        "Porca Sextavada": {
+            "category": "Fixadores",
+            "quantity": 200,
+            "min_stock": 100,
+            "locations": {"Depósito": 150, "Prateleira": 50},
+        },
+        "Arruela de Pressão": {
+            "category": "Fixadores",
+            "quantity": 5,
+            "min_stock": 30,
+            "locations": {"Depósito": 5, "Prateleira": 0},
+        },
+        "Broca 6mm": {
+            "category": "Ferramentas",
+            "quantity": 45,
+            "min_stock": 20,
+            "locations": {"Depósito": 30, "Prateleira": 15},
+        },
+        "Chave de Fenda": {
+            "category": "Ferramentas",
+            "quantity": 12,
+            "min_stock": 15,
+            "locations": {"Depósito": 8, "Prateleira": 4},
+        },
     },
     "LojaB": {
-        "Parafuso M8": {"quantity": 150, "min_stock": 50},
-        "Porca Sextavada": {"quantity": 80, "min_stock": 100},
-        "Arruela de Pressão": {"quantity": 500, "min_stock": 200},
-        "Broca 6mm": {"quantity": 10, "min_stock": 25},
-        "Martelo": {"quantity": 30, "min_stock": 10},
+        "Parafuso M8": {
+            "category": "Fixadores",
+            "quantity": 150,
+            "min_stock": 50,
+            "locations": {"Depósito": 100, "Prateleira": 50},
+        },
+        "Porca Sextavada": {
+            "category": "Fixadores",
+            "quantity": 80,
+            "min_stock": 100,
+            "locations": {"Depósito": 60, "Prateleira": 20},
+        },
+        "Arruela de Pressão": {
+            "category": "Fixadores",
+            "quantity": 500,
+            "min_stock": 200,
+            "locations": {"Depósito": 400, "Prateleira": 100},
+        },
+        "Broca 6mm": {
+            "category": "Ferramentas",
+            "quantity": 10,
+            "min_stock": 25,
+            "locations": {"Depósito": 10, "Prateleira": 0},
+        },
+        "Martelo": {
+            "category": "Ferramentas",
+            "quantity": 30,
+            "min_stock": 10,
+            "locations": {"Depósito": 20, "Prateleira": 10},
+        },
     },
     "LojaC": {
-        "Parafuso M8": {"quantity": 75, "min_stock": 60},
-        "Prego 2 polegadas": {"quantity": 1000, "min_stock": 500},
-        "Serra Manual": {"quantity": 8, "min_stock": 5},
-        "Fita Isolante": {"quantity": 25, "min_stock": 40},
-        "Alicate": {"quantity": 18, "min_stock": 10},
+        "Parafuso M8": {
+            "category": "Fixadores",
+            "quantity": 75,
+            "min_stock": 60,
+            "locations": {"Depósito": 50, "Prateleira": 25},
+        },
+        "Prego 2 polegadas": {
+            "category": "Fixadores",
+            "quantity": 1000,
+            "min_stock": 500,
+            "locations": {"Depósito": 800, "Prateleira": 200},
+        },
+        "Serra Manual": {
+            "category": "Ferramentas",
+            "quantity": 8,
+            "min_stock": 5,
+            "locations": {"Depósito": 5, "Prateleira": 3},
+        },
+        "Fita Isolante": {
+            "category": "Elétrica",
+            "quantity": 25,
+            "min_stock": 40,
+            "locations": {"Depósito": 20, "Prateleira": 5},
+        },
+        "Alicate": {
+            "category": "Ferramentas",
+            "quantity": 18,
+            "min_stock": 10,
+            "locations": {"Depósito": 12, "Prateleira": 6},
+        },
     },
 }
 
 # Base de tenants mockada para validação de existência
 MOCK_TENANTS_DB = list(MOCK_INVENTORY_DB.keys())
+
+# Versão do inventário de cada tenant, incrementada a cada alteração de estoque
+MOCK_INVENTORY_VERSIONS = {tenant_id: 0 for tenant_id in MOCK_INVENTORY_DB}
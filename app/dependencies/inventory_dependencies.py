@@ -2,15 +2,37 @@ from typing import Dict
 
 from fastapi import Depends
 
-from app.database.database import MOCK_INVENTORY_DB
+from app.database.database import MOCK_INVENTORY_DB, MOCK_INVENTORY_VERSIONS
 from app.dependencies.auth_dependency import get_tenant_id
+from app.repositories.change_log import INVENTORY_CHANGES, InventoryChangeLog
 from app.repositories.inventory_repository import InventoryRepository
+from app.repositories.movement_log import MOVEMENT_LOG, StockMovementLog
+from app.services.erp import ERP_CLIENT, ErpClient
+from app.services.forecasting import CONSUMPTION_FORECASTER, ConsumptionForecaster
 from app.services.inventory import InventoryService
+from app.services.low_stock_rules import LOW_STOCK_RULES, LowStockRuleStore
+from app.services.restock_recommendations import (
+    RECOMMENDATION_CACHE,
+    RecommendationCache,
+)
+from app.services.single_flight import SINGLE_FLIGHT, SingleFlight
+from app.services.webhooks import WEBHOOK_DISPATCHER, WebhookDispatcher
 
 
 async def get_inventory_dependency(
     x_tenant_id: str = Depends(get_tenant_id),
     database_session: Dict = Depends(lambda: MOCK_INVENTORY_DB),
+    inventory_versions: Dict = Depends(lambda: MOCK_INVENTORY_VERSIONS),
+    inventory_changes: InventoryChangeLog = Depends(lambda: INVENTORY_CHANGES),
+    recommendation_cache: RecommendationCache = Depends(
+        lambda: RECOMMENDATION_CACHE
+    ),
+    movement_log: StockMovementLog = Depends(lambda: MOVEMENT_LOG),
+    forecaster: ConsumptionForecaster = Depends(lambda: CONSUMPTION_FORECASTER),
+    single_flight: SingleFlight = Depends(lambda: SINGLE_FLIGHT),
+    webhook_dispatcher: WebhookDispatcher = Depends(lambda: WEBHOOK_DISPATCHER),
+    low_stock_rules: LowStockRuleStore = Depends(lambda: LOW_STOCK_RULES),
+    erp_client: ErpClient = Depends(lambda: ERP_CLIENT),
 ) -> InventoryService:
     """
     Dependência para fornecer uma instância do InventoryService configurada
@@ -19,6 +41,14 @@ async def get_inventory_dependency(
     Args:
         x_tenant_id: Identificador do tenant autenticado
         database_session: Sessão de banco de dados para operações de inventário
+        inventory_versions: Versões do inventário de cada tenant
+        inventory_changes: Histórico recente de alterações do inventário
+        recommendation_cache: Cache compartilhado de recomendações de reabastecimento
+        movement_log: Log de movimentações de estoque
+        forecaster: Estimador de taxa de consumo dos produtos
+        single_flight: Grupo de coalescência de leituras concorrentes
+        webhook_dispatcher: Dispatcher de eventos para os webhooks do tenant
+        low_stock_rules: Regras de estoque baixo de cada tenant
         erp_client: Cliente para comunicação com o sistema ERP
 
     Returns:
@@ -26,5 +56,16 @@ async def get_inventory_dependency(
     """
     return InventoryService(
         tenant_id=x_tenant_id,
-        repository=InventoryRepository(session=database_session),
+        repository=InventoryRepository(
+            session=database_session,
+            versions=inventory_versions,
+            changes=inventory_changes,
+        ),
+        recommendation_cache=recommendation_cache,
+        movement_log=movement_log,
+        forecaster=forecaster,
+        single_flight=single_flight,
+        webhook_dispatcher=webhook_dispatcher,
+        low_stock_rules=low_stock_rules,
+        erp_client=erp_client,
     )
@@ -0,0 +1,136 @@
+import asyncio
+import itertools
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """
+    Monitor de atraso do event loop.
+
+    Uma tarefa acorda a cada ``interval`` segundos e mede quanto o ``sleep``
+    passou do previsto: esse excedente é o tempo em que o loop ficou ocupado
+    com código síncrono. Uma thread watchdog acompanha o último batimento da
+    tarefa e, quando o loop fica parado por mais de ``threshold`` segundos,
+    registra a pilha da thread do loop naquele momento, apontando a chamada
+    que o bloqueou.
+
+    É a única medição de atraso do processo: o monitor de prontidão lê as
+    amostras recentes, e o diagnóstico liga ``report_stalls`` (avisos de
+    travamento e watchdog).
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        window: int = 1200,
+        report_stalls: bool = True,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.report_stalls = report_stalls
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._run(), name="event-loop-lag")
+        if self.report_stalls:
+            self._watchdog = threading.Thread(
+                target=self._run_watchdog, name="event-loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def recent_max(self, seconds: float) -> float:
+        """Retorna o maior atraso, em segundos, dos últimos ``seconds`` segundos."""
+        count = max(1, math.ceil(seconds / self.interval))
+        recent = itertools.islice(reversed(self.samples), count)
+        return max(recent, default=0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna as estatísticas de atraso da janela recente, em milissegundos."""
+        ordered = sorted(self.samples)
+        count = len(ordered)
+
+        def percentile(fraction: float) -> float:
+            if not count:
+                return 0.0
+            return round(ordered[min(count - 1, int(count * fraction))] * 1000, 3)
+
+        return {
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "samples": count,
+            "p50_ms": percentile(0.5),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(self.max_lag * 1000, 3),
+            "stalls": self.stalls,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag = max(0.0, now - started - self.interval)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if self.report_stalls and lag > self.threshold:
+                self.stalls += 1
+                logger.warning(
+                    f"[DIAGNOSTICS] Event loop bloqueado por {lag * 1000:.1f}ms",
+                    extra={"loop_lag_ms": lag * 1000},
+                )
+
+    def _run_watchdog(self) -> None:
+        reported_heartbeat = None
+        while not self._stopped.wait(self.interval):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            if stalled_for <= self.threshold or heartbeat == reported_heartbeat:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            reported_heartbeat = heartbeat
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(
+                f"[DIAGNOSTICS] Event loop parado há {stalled_for * 1000:.1f}ms, "
+                f"pilha atual:\n{stack}"
+            )
@@ -0,0 +1,54 @@
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Counter as CounterType
+from typing import List
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{module}:{code.co_qualname}"
+
+
+def _collapse(thread_name: str, frame: FrameType) -> str:
+    labels: List[str] = []
+    current = frame
+    while current is not None:
+        labels.append(_frame_label(current))
+        current = current.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+def sample_stacks(duration: float, interval: float = 0.01) -> str:
+    """
+    Amostra as pilhas de todas as threads do processo durante ``duration``
+    segundos.
+
+    Deve ser executado fora do event loop (ex.: ``asyncio.to_thread``), para
+    que a thread do loop seja amostrada enquanto atende requisições.
+
+    Args:
+        duration: Duração da captura, em segundos
+        interval: Intervalo entre amostras, em segundos
+
+    Returns:
+        Pilhas no formato collapsed (``thread;frame;frame contagem`` por
+        linha), compatível com flamegraph.pl e speedscope
+    """
+    own_thread = threading.get_ident()
+    stacks: CounterType[str] = Counter()
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            stacks[_collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+        time.sleep(interval)
+
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
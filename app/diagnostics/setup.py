@@ -0,0 +1,86 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import FastAPI
+
+from app.diagnostics.lag import EventLoopLagMonitor
+from app.diagnostics.timing import SlowRequestMiddleware
+from app.services.health import HEALTH_MONITOR
+
+
+@dataclass
+class DiagnosticsSettings:
+    """Configuração do diagnóstico, lida das variáveis de ambiente."""
+
+    token: str
+    slow_request_ms: float = 500.0
+    loop_lag_ms: float = 100.0
+
+    @classmethod
+    def from_env(cls) -> Optional["DiagnosticsSettings"]:
+        """
+        Lê ``STOCKWISE_DIAGNOSTICS``, ``STOCKWISE_SLOW_REQUEST_MS``,
+        ``STOCKWISE_LOOP_LAG_MS`` e ``STOCKWISE_DIAGNOSTICS_TOKEN``.
+
+        Returns:
+            DiagnosticsSettings ou None quando o diagnóstico está desligado
+
+        Raises:
+            ValueError: Se o diagnóstico estiver ligado sem token
+        """
+        if os.getenv("STOCKWISE_DIAGNOSTICS", "").lower() not in {"1", "true", "yes"}:
+            return None
+        # O profiler expõe pilhas e tempos internos: sem token, não sobe
+        token = os.getenv("STOCKWISE_DIAGNOSTICS_TOKEN")
+        if not token:
+            raise ValueError(
+                "STOCKWISE_DIAGNOSTICS_TOKEN é obrigatório com o diagnóstico ligado"
+            )
+        return cls(
+            token=token,
+            slow_request_ms=float(os.getenv("STOCKWISE_SLOW_REQUEST_MS", "500")),
+            loop_lag_ms=float(os.getenv("STOCKWISE_LOOP_LAG_MS", "100")),
+        )
+
+
+@dataclass
+class Diagnostics:
+    """Estado do diagnóstico do processo, guardado em ``app.state.diagnostics``."""
+
+    settings: DiagnosticsSettings
+    lag_monitor: EventLoopLagMonitor
+    profile_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def configure_diagnostics(app: FastAPI, settings: DiagnosticsSettings) -> Diagnostics:
+    """
+    Habilita o diagnóstico no processo.
+
+    Liga os avisos de travamento e o watchdog no monitor de atraso do event
+    loop do monitor de prontidão (iniciado no lifespan), registra o log de
+    requisições lentas com tempo por fase e as rotas de diagnóstico.
+    Deve ser chamado depois dos demais middlewares, para medir a requisição
+    inteira.
+
+    Args:
+        app: Aplicação FastAPI
+        settings: Configuração do diagnóstico
+
+    Returns:
+        Estado do diagnóstico
+    """
+    from app.api.internal import diagnostics
+
+    lag_monitor = HEALTH_MONITOR.lag_monitor
+    lag_monitor.threshold = settings.loop_lag_ms / 1000
+    lag_monitor.report_stalls = True
+    state = Diagnostics(settings=settings, lag_monitor=lag_monitor)
+    app.state.diagnostics = state
+
+    app.include_router(diagnostics.router)
+    app.add_middleware(
+        SlowRequestMiddleware, threshold=settings.slow_request_ms / 1000
+    )
+    return state
@@ -0,0 +1,142 @@
+import contextvars
+import functools
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestTimings:
+    """Marcos de tempo (``time.perf_counter``) de uma requisição."""
+
+    start: float
+    endpoint_start: Optional[float] = None
+    endpoint_end: Optional[float] = None
+    response_start: Optional[float] = None
+
+    def phases(self, end: float) -> Dict[str, float]:
+        """
+        Decompõe a duração da requisição em fases, em milissegundos.
+
+        ``dependencies`` inclui o roteamento, a leitura do corpo e a
+        validação dos parâmetros; ``service`` é a execução do endpoint;
+        ``serialization`` vai do retorno do endpoint ao início da resposta;
+        ``send`` é o envio do corpo pelos middlewares. Rotas sem
+        ``TimedRoute`` têm apenas ``handler`` e ``send``.
+        """
+        if self.endpoint_start is None or self.endpoint_end is None:
+            marks = [("handler", self.start, self.response_start)]
+        else:
+            marks = [
+                ("dependencies", self.start, self.endpoint_start),
+                ("service", self.endpoint_start, self.endpoint_end),
+                ("serialization", self.endpoint_end, self.response_start),
+            ]
+        marks.append(("send", self.response_start, end))
+        return {
+            name: round((finish - begin) * 1000, 3)
+            for name, begin, finish in marks
+            if begin is not None and finish is not None
+        }
+
+
+_CURRENT_TIMINGS: contextvars.ContextVar[Optional[RequestTimings]] = (
+    contextvars.ContextVar("stockwise_request_timings", default=None)
+)
+
+
+class SlowRequestMiddleware:
+    """
+    Middleware ASGI que registra requisições lentas com o tempo de cada fase.
+
+    Os marcos do endpoint são preenchidos pelas rotas ``TimedRoute``;
+    requisições abaixo de ``threshold`` segundos não geram log.
+    """
+
+    def __init__(self, app: ASGIApp, threshold: float = 0.5):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(start=time.perf_counter())
+        token = _CURRENT_TIMINGS.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                timings.response_start = time.perf_counter()
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _CURRENT_TIMINGS.reset(token)
+            end = time.perf_counter()
+            duration = end - timings.start
+            if duration >= self.threshold:
+                phases = timings.phases(end)
+                breakdown = " ".join(
+                    f"{name}={value:.1f}ms" for name, value in phases.items()
+                )
+                logger.warning(
+                    f"[DIAGNOSTICS] Requisição lenta - {scope['method']} "
+                    f"{scope['path']} {status_code} {duration * 1000:.1f}ms "
+                    f"({breakdown})",
+                    extra={"duration_ms": duration * 1000, "phases": phases},
+                )
+
+
+def _mark(attribute: str) -> None:
+    timings = _CURRENT_TIMINGS.get()
+    if timings is not None:
+        setattr(timings, attribute, time.perf_counter())
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            _mark("endpoint_start")
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _mark("endpoint_end")
+
+        return async_endpoint
+
+    @functools.wraps(call)
+    def sync_endpoint(*args: Any, **kwargs: Any) -> Any:
+        _mark("endpoint_start")
+        try:
+            return call(*args, **kwargs)
+        finally:
+            _mark("endpoint_end")
+
+    return sync_endpoint
+
+
+class TimedRoute(APIRoute):
+    """
+    Rota que marca o início e o fim do endpoint para o log de requisições
+    lentas, separando dependências, serviço e serialização.
+
+    Sem o diagnóstico habilitado, nenhum ``RequestTimings`` está ativo e o
+    custo por requisição é uma leitura de ``ContextVar`` em cada marco.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
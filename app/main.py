@@ -1,9 +1,15 @@
 import logging
+import os
 
-from fastapi import FastAPI
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.v1 import inventory
+from app.api.v1 import inventory, webhooks
+from app.middleware.content_negotiation import ContentNegotiationMiddleware
+from app.services.health import HEALTH_MONITOR
+from app.services.single_flight import SINGLE_FLIGHT
+from app.startup import lifespan
 
 # Configuração de logging
 logging.basicConfig(
@@ -15,6 +21,7 @@ logging.basicConfig(
 app = FastAPI(
     title="StockWise API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configuração de CORS
@@ -26,8 +33,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão (gzip/brotli) e formatos binários (msgpack/CBOR) sob demanda
+app.add_middleware(ContentNegotiationMiddleware, minimum_size=1024)
+
 # Registro das rotas
 app.include_router(inventory.router, prefix="/api/v1")
+app.include_router(webhooks.router, prefix="/api/v1")
+
+# Modo sharded: roteamento por tenant entre processos (STOCKWISE_SHARD_ID/SHARDS).
+# Importado apenas quando configurado, para não pesar na inicialização padrão.
+if os.getenv("STOCKWISE_SHARD_ID"):
+    from app.sharding.setup import configure_sharding
+    from app.sharding.state import ShardSettings
+
+    shard_settings = ShardSettings.from_env()
+    if shard_settings is not None:
+        configure_sharding(app, shard_settings)
 
 
 @app.get("/", tags=["Health"])
@@ -44,3 +65,42 @@ async def root():
 async def health_check():
     """Health check endpoint para monitoramento."""
     return {"status": "healthy"}
+
+
+@app.get("/health/live", tags=["Health"])
+async def liveness_probe():
+    """Liveness probe: o processo está de pé e o event loop responde."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness_probe():
+    """
+    Readiness probe: backend de armazenamento, filas em segundo plano e
+    atraso do event loop, a partir do último resultado em cache.
+    """
+    return JSONResponse(
+        content=HEALTH_MONITOR.snapshot(),
+        status_code=(
+            status.HTTP_200_OK
+            if HEALTH_MONITOR.is_ready
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
+
+
+@app.get("/metrics/single-flight", tags=["Metrics"])
+async def single_flight_metrics():
+    """Métricas de coalescência de leituras idênticas e concorrentes."""
+    return SINGLE_FLIGHT.stats()
+
+
+# Diagnóstico opt-in (STOCKWISE_DIAGNOSTICS): atraso do event loop, requisições
+# lentas por fase e profiler por amostragem. Registrado por último para que o
+# middleware meça a requisição inteira.
+if os.getenv("STOCKWISE_DIAGNOSTICS"):
+    from app.diagnostics.setup import DiagnosticsSettings, configure_diagnostics
+
+    diagnostics_settings = DiagnosticsSettings.from_env()
+    if diagnostics_settings is not None:
+        configure_diagnostics(app, diagnostics_settings)
@@ -0,0 +1,328 @@
+import hashlib
+import importlib
+import json
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class _Compressor:
+    """Interface comum entre compressores gzip e brotli em modo streaming."""
+
+    def __init__(self, encoding: str, level: int):
+        if encoding == "br":
+            self._compressor = _load_module("brotli").Compressor(quality=level)
+            self._process = self._compressor.process
+            self._finish = self._compressor.finish
+        else:
+            # wbits=31 produz o formato gzip (cabeçalho + deflate + trailer)
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self._process = self._compressor.compress
+            self._finish = self._compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._process(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+_OPTIONAL_MODULES: Dict[str, Optional[Any]] = {}
+
+
+def _load_module(name: str) -> Optional[Any]:
+    """Importa um módulo opcional uma única vez, retornando None se ausente."""
+    if name not in _OPTIONAL_MODULES:
+        try:
+            _OPTIONAL_MODULES[name] = importlib.import_module(name)
+        except ImportError:
+            _OPTIONAL_MODULES[name] = None
+    return _OPTIONAL_MODULES[name]
+
+
+def _encode_msgpack(payload: Any) -> bytes:
+    return _load_module("msgpack").packb(payload, use_bin_type=True)
+
+
+def _encode_cbor(payload: Any) -> bytes:
+    return _load_module("cbor2").dumps(payload)
+
+
+# Formatos binários opcionais: media type -> (módulo necessário, codificador)
+BINARY_MEDIA_TYPES: Dict[str, Tuple[str, Callable[[Any], bytes]]] = {
+    "application/msgpack": ("msgpack", _encode_msgpack),
+    "application/x-msgpack": ("msgpack", _encode_msgpack),
+    "application/cbor": ("cbor2", _encode_cbor),
+}
+
+
+def _parse_quality_list(header: str) -> List[Tuple[str, float]]:
+    """Interpreta um header com valores de qualidade (ex.: ``gzip;q=0.8, br``)."""
+    values = []
+    for position, part in enumerate(header.split(",")):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        # A posição desempata valores de mesma qualidade
+        values.append((token, quality - position * 1e-6))
+    return values
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Escolhe a codificação de conteúdo suportada preferida pelo cliente.
+
+    Args:
+        accept_encoding: Valor do header Accept-Encoding
+
+    Returns:
+        ``"br"``, ``"gzip"`` ou None se nenhuma for aceita
+    """
+    supported = {"gzip": 0.0}
+    if _load_module("brotli") is not None:
+        # Brotli vence gzip em caso de empate de qualidade
+        supported["br"] = 1e-3
+
+    best, best_quality = None, 0.0
+    for token, quality in _parse_quality_list(accept_encoding):
+        if token in supported and quality > 0:
+            score = quality + supported[token]
+            if score > best_quality:
+                best, best_quality = token, score
+    return best
+
+
+def negotiate_media_type(accept: str) -> Optional[str]:
+    """
+    Escolhe um formato binário disponível preferido pelo cliente ao JSON.
+
+    Args:
+        accept: Valor do header Accept
+
+    Returns:
+        Media type binário a usar ou None para manter JSON
+    """
+    best, best_quality = None, 0.0
+    for token, quality in _parse_quality_list(accept):
+        if quality <= 0 or quality <= best_quality:
+            continue
+        if token == JSON_MEDIA_TYPE:
+            best, best_quality = None, quality
+        elif token in BINARY_MEDIA_TYPES:
+            module_name, _ = BINARY_MEDIA_TYPES[token]
+            if _load_module(module_name) is not None:
+                best, best_quality = token, quality
+    return best
+
+
+class EncodedBodyCache:
+    """
+    Cache LRU de corpos já transcodificados e comprimidos.
+
+    A entrada de cada (tenant, rota, formato, codificação) guarda o digest do
+    JSON original: enquanto o snapshot do tenant não muda, o corpo codificado
+    é reaproveitado sem comprimir os mesmos bytes novamente.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[bytes, bytes]]" = OrderedDict()
+
+    def get(self, key: Tuple, digest: bytes) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != digest:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Tuple, digest: bytes, body: bytes) -> None:
+        self._entries[key] = (digest, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class ContentNegotiationMiddleware:
+    """
+    Middleware ASGI de negociação de conteúdo para respostas JSON.
+
+    - ``Accept: application/msgpack`` ou ``application/cbor`` transcodifica o
+      JSON para o formato binário, quando a biblioteca correspondente está
+      instalada;
+    - ``Accept-Encoding: br`` ou ``gzip`` comprime corpos a partir de
+      ``minimum_size`` bytes (brotli apenas se instalado).
+
+    Respostas enviadas de uma vez usam o cache de corpos codificados;
+    respostas em streaming são comprimidas pedaço a pedaço.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compress_level: int = 6,
+        cache: Optional[EncodedBodyCache] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compress_level = compress_level
+        self.cache = cache if cache is not None else EncodedBodyCache()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""))
+        media_type = negotiate_media_type(headers.get("accept", ""))
+        if encoding is None and media_type is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _NegotiatedResponder(
+            middleware=self,
+            send=send,
+            encoding=encoding,
+            media_type=media_type,
+            cache_key=(
+                headers.get("x-tenant-id"),
+                scope["method"],
+                scope["path"],
+                scope.get("query_string", b""),
+                media_type,
+                encoding,
+            ),
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _NegotiatedResponder:
+    """Intercepta as mensagens de uma resposta para aplicar a negociação."""
+
+    def __init__(
+        self,
+        middleware: ContentNegotiationMiddleware,
+        send: Send,
+        encoding: Optional[str],
+        media_type: Optional[str],
+        cache_key: Tuple,
+    ):
+        self.middleware = middleware
+        self.downstream = send
+        self.encoding = encoding
+        self.media_type = media_type
+        self.cache_key = cache_key
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.buffer: List[bytes] = []
+        self.compressor: Optional[_Compressor] = None
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self.downstream(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            is_json = headers.get("content-type", "").startswith(JSON_MEDIA_TYPE)
+            if (
+                message["status"] != 200
+                or not is_json
+                or "content-encoding" in headers
+            ):
+                self.passthrough = True
+                await self.downstream(message)
+                return
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            await self._send_compressed_chunk(body, more_body)
+            return
+
+        if more_body and self.media_type is None:
+            # Streaming sem transcodificação: comprime pedaço a pedaço
+            await self._start_streaming()
+            await self._send_compressed_chunk(b"".join(self.buffer) + body, more_body)
+            self.buffer = []
+            return
+
+        self.buffer.append(body)
+        if more_body:
+            return
+
+        await self._send_complete(b"".join(self.buffer))
+
+    async def _send_complete(self, body: bytes) -> None:
+        middleware = self.middleware
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        # Apenas corpos comprimidos entram no cache, sempre com a codificação da chave
+        encoded = middleware.cache.get(self.cache_key, digest)
+        encoding = self.encoding
+
+        if encoded is None:
+            encoded = body
+            if self.media_type is not None:
+                _, encoder = BINARY_MEDIA_TYPES[self.media_type]
+                encoded = encoder(json.loads(body))
+            if encoding is not None and len(encoded) >= middleware.minimum_size:
+                compressor = _Compressor(encoding, middleware.compress_level)
+                encoded = compressor.compress(encoded) + compressor.finish()
+                middleware.cache.put(self.cache_key, digest, encoded)
+            else:
+                encoding = None
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers.add_vary_header("Accept")
+        headers.add_vary_header("Accept-Encoding")
+        if self.media_type is not None:
+            headers["content-type"] = self.media_type
+        if encoding is not None:
+            headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(encoded))
+
+        await self.downstream(self.start_message)
+        await self.downstream({"type": "http.response.body", "body": encoded})
+
+    async def _start_streaming(self) -> None:
+        self.compressor = _Compressor(self.encoding, self.middleware.compress_level)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers.add_vary_header("Accept")
+        headers.add_vary_header("Accept-Encoding")
+        headers["content-encoding"] = self.encoding
+        if "content-length" in headers:
+            del headers["content-length"]
+        await self.downstream(self.start_message)
+
+    async def _send_compressed_chunk(self, body: bytes, more_body: bool) -> None:
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.downstream(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
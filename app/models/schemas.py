@@ -1,5 +1,12 @@
-from pydantic import BaseModel, Field
-from typing import Optional, TypeVar
+from pydantic import (
+    AnyHttpUrl,
+    BaseModel,
+    ConfigDict,
+    Field,
+    field_validator,
+    model_validator,
+)
+from typing import Any, Dict, List, Optional, TypeVar
 from datetime import datetime
 from enum import Enum
 
@@ -17,9 +24,114 @@ class InventoryItem(BaseModel):
 
     tenant_id: str = Field(..., description="Identificador do tenant (loja)")
     product_name: str = Field(..., description="Nome do produto")
-    quantity: int = Field(..., ge=0, description="Quantidade atual em estoque")
+    category: Optional[str] = Field(None, description="Categoria do produto")
+    quantity: int = Field(
+        ..., ge=0, description="Quantidade total em estoque, somando todos os locais"
+    )
     min_stock: int = Field(..., ge=0, description="Nível mínimo de estoque")
-    needs_restock: bool = Field(..., description="Indica se precisa de reabastecimento")
+    needs_restock: bool = Field(
+        ..., description="Indica se o total em estoque está abaixo do mínimo"
+    )
+    locations: Dict[str, int] = Field(
+        default_factory=dict, description="Quantidade em estoque por local"
+    )
+    days_until_stockout: Optional[float] = Field(
+        None,
+        ge=0,
+        description="Dias estimados até a ruptura, com base na taxa de consumo",
+    )
+
+
+class AlertSeverity(str, Enum):
+    """Severidade de um alerta de estoque baixo."""
+
+    INFO = "info"
+    WARNING = "warning"
+    CRITICAL = "critical"
+
+
+class LowStockRule(BaseModel):
+    """
+    Regra de estoque baixo de um tenant.
+
+    Quando ``min_stock_ratio`` e ``max_quantity`` são informados, o produto
+    precisa atender às duas condições.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    id: str = Field(..., min_length=1, description="Identificador da regra")
+    severity: AlertSeverity = Field(
+        AlertSeverity.WARNING, description="Severidade dos alertas gerados"
+    )
+    category: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="Categoria a que a regra se aplica; todas se omitida",
+    )
+    min_stock_ratio: Optional[float] = Field(
+        None,
+        gt=0,
+        description=(
+            "Alerta quando a quantidade fica abaixo dessa fração do estoque "
+            "mínimo (ex.: 1.2 = 120%)"
+        ),
+    )
+    max_quantity: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Alerta quando a quantidade é menor ou igual a esse valor",
+    )
+
+    @model_validator(mode="after")
+    def must_have_threshold(self) -> "LowStockRule":
+        if self.min_stock_ratio is None and self.max_quantity is None:
+            raise ValueError("A regra precisa de min_stock_ratio ou max_quantity")
+        return self
+
+
+class LowStockRulesRequest(BaseModel):
+    """Modelo de requisição para substituir as regras de estoque baixo."""
+
+    rules: List[LowStockRule] = Field(
+        ..., description="Regras do tenant; a de maior severidade que casar vence"
+    )
+
+    @field_validator("rules")
+    @classmethod
+    def rule_ids_must_be_unique(cls, value: List[LowStockRule]) -> List[LowStockRule]:
+        rule_ids = [rule.id for rule in value]
+        if len(set(rule_ids)) != len(rule_ids):
+            raise ValueError("Os identificadores das regras devem ser únicos")
+        return value
+
+
+class LowStockRuleSet(BaseModel):
+    """Modelo de resposta com as regras de estoque baixo de um tenant."""
+
+    tenant_id: str = Field(..., description="Identificador do tenant")
+    version: int = Field(
+        ..., ge=0, description="Versão das regras, incrementada a cada alteração"
+    )
+    rules: List[LowStockRule] = Field(..., description="Regras em vigor")
+
+
+class LowStockAlert(InventoryItem):
+    """Modelo de resposta para produto que casou com uma regra de estoque baixo."""
+
+    severity: AlertSeverity = Field(..., description="Severidade do alerta")
+    rule_id: str = Field(..., description="Regra que gerou o alerta")
+
+
+class PredictedStockout(InventoryItem):
+    """Modelo de resposta para produto com ruptura de estoque prevista."""
+
+    daily_consumption: float = Field(
+        ..., gt=0, description="Taxa de consumo estimada (unidades por dia)"
+    )
+    days_until_stockout: float = Field(
+        ..., ge=0, description="Dias estimados até a ruptura"
+    )
 
 
 class RestockRequest(BaseModel):
@@ -42,6 +154,171 @@ class RestockResponse(BaseModel):
     )
 
 
+class RestockPolicy(BaseModel):
+    """Política de estoque-alvo usada para sugerir quantidades de reabastecimento."""
+
+    model_config = ConfigDict(frozen=True)
+
+    target_multiplier: float = Field(
+        2.0, ge=1.0, description="Estoque-alvo como múltiplo do estoque mínimo"
+    )
+    safety_stock: int = Field(
+        0, ge=0, description="Estoque de segurança somado ao estoque-alvo"
+    )
+    pack_size: int = Field(
+        1, ge=1, description="Tamanho do lote para arredondamento da sugestão"
+    )
+
+
+class RestockRecommendation(BaseModel):
+    """Modelo de resposta para sugestão de reabastecimento de um produto."""
+
+    tenant_id: str = Field(..., description="Identificador do tenant")
+    product_name: str = Field(..., description="Nome do produto")
+    quantity: int = Field(..., ge=0, description="Quantidade atual em estoque")
+    min_stock: int = Field(..., ge=0, description="Nível mínimo de estoque")
+    target_stock: int = Field(..., ge=0, description="Estoque-alvo após o pedido")
+    suggested_quantity: int = Field(
+        ..., ge=0, description="Quantidade sugerida para o pedido"
+    )
+
+
+class StockMovementRequest(BaseModel):
+    """Modelo de requisição para registrar uma movimentação de estoque."""
+
+    # Limitada ao inteiro de 32 bits gravado no histórico de movimentações
+    delta: int = Field(
+        ...,
+        ge=-(2**31 - 1),
+        le=2**31 - 1,
+        description="Variação da quantidade (positiva para entradas, negativa para saídas)",
+    )
+    location: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="Local da movimentação; padrão é o local principal do produto",
+    )
+
+    @field_validator("delta")
+    @classmethod
+    def delta_must_not_be_zero(cls, value: int) -> int:
+        if value == 0:
+            raise ValueError("A variação da quantidade não pode ser zero")
+        return value
+
+
+class StockMovement(BaseModel):
+    """Modelo de resposta para uma movimentação registrada no histórico."""
+
+    tenant_id: str = Field(..., description="Identificador do tenant")
+    product_name: str = Field(..., description="Nome do produto")
+    timestamp: datetime = Field(..., description="Data/hora da movimentação")
+    delta: int = Field(..., description="Variação da quantidade")
+    quantity: int = Field(
+        ..., ge=0, description="Quantidade total após a movimentação"
+    )
+
+
+class InventoryChanges(BaseModel):
+    """Modelo de resposta para sincronização incremental do inventário."""
+
+    tenant_id: str = Field(..., description="Identificador do tenant")
+    since: int = Field(..., ge=0, description="Versão informada pelo cliente")
+    version: int = Field(
+        ..., ge=0, description="Versão atual; usar como ``since`` na próxima consulta"
+    )
+    resync_required: bool = Field(
+        False,
+        description=(
+            "Histórico desde ``since`` indisponível; o cliente deve baixar o "
+            "inventário completo"
+        ),
+    )
+    added: List[InventoryItem] = Field(
+        default_factory=list, description="Produtos adicionados"
+    )
+    changed: List[InventoryItem] = Field(
+        default_factory=list, description="Produtos alterados"
+    )
+    removed: List[str] = Field(
+        default_factory=list, description="Nomes dos produtos removidos"
+    )
+
+
+class TenantSnapshot(BaseModel):
+    """Cópia do inventário de um tenant transferida entre shards."""
+
+    tenant_id: str = Field(..., description="Identificador do tenant")
+    version: int = Field(..., ge=0, description="Versão do inventário do tenant")
+    inventory: Dict[str, Dict[str, Any]] = Field(
+        ..., description="Produtos do tenant no formato da base de dados"
+    )
+    low_stock_rules: Optional[List[LowStockRule]] = Field(
+        None, description="Regras de estoque baixo do tenant, se personalizadas"
+    )
+
+
+class ShardAssignment(BaseModel):
+    """Atribuição de um tenant a um shard."""
+
+    shard_id: str = Field(..., min_length=1, description="Identificador do shard")
+
+
+class ShardRingStatus(BaseModel):
+    """Visão do anel de shards a partir do shard local."""
+
+    shard_id: str = Field(..., description="Shard que respondeu")
+    shards: List[str] = Field(..., description="Shards do anel")
+    pins: Dict[str, str] = Field(..., description="Atribuições fixas tenant -> shard")
+    local_tenants: List[str] = Field(..., description="Tenants carregados localmente")
+
+
+class WebhookEventType(str, Enum):
+    """Transições de estoque notificadas por webhook."""
+
+    LOW_STOCK = "inventory.low_stock"
+    RESTOCKED = "inventory.restocked"
+
+
+class WebhookSubscriptionRequest(BaseModel):
+    """Modelo de requisição para cadastro de webhook."""
+
+    url: AnyHttpUrl = Field(..., description="URL que receberá os eventos via POST")
+
+
+class WebhookSubscription(BaseModel):
+    """Modelo de resposta para webhook cadastrado."""
+
+    id: str = Field(..., description="Identificador da inscrição")
+    tenant_id: str = Field(..., description="Identificador do tenant")
+    url: str = Field(..., description="URL que recebe os eventos")
+    created_at: datetime = Field(..., description="Data e hora do cadastro")
+
+
+class WebhookEvent(BaseModel):
+    """Evento de mudança de ``needs_restock`` de um produto."""
+
+    id: str = Field(..., description="Identificador único do evento")
+    type: WebhookEventType = Field(..., description="Tipo da transição")
+    tenant_id: str = Field(..., description="Identificador do tenant")
+    product_name: str = Field(..., description="Nome do produto")
+    quantity: int = Field(..., description="Quantidade total após a movimentação")
+    min_stock: int = Field(..., description="Nível mínimo de estoque")
+    needs_restock: bool = Field(..., description="Novo valor de needs_restock")
+    occurred_at: datetime = Field(..., description="Data e hora da transição")
+
+
+class WebhookDeadLetter(BaseModel):
+    """Lote de eventos cuja entrega falhou definitivamente."""
+
+    subscription_id: str = Field(..., description="Identificador da inscrição")
+    url: str = Field(..., description="URL de destino")
+    events: List[WebhookEvent] = Field(..., description="Eventos não entregues")
+    attempts: int = Field(..., ge=0, description="Tentativas de entrega realizadas")
+    error: str = Field(..., description="Último erro de entrega")
+    failed_at: datetime = Field(..., description="Data e hora da desistência")
+
+
 class ErrorResponse(BaseModel):
     """Modelo de resposta para erros."""
 
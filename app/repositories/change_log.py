@@ -0,0 +1,147 @@
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Deque, Dict, List, Tuple
+
+
+class ChangeKind(str, Enum):
+    """Tipo de alteração registrada para um produto."""
+
+    ADDED = "added"
+    CHANGED = "changed"
+    REMOVED = "removed"
+
+
+@dataclass
+class ChangeSet:
+    """Produtos alterados entre duas versões do inventário de um tenant."""
+
+    version: int
+    resync_required: bool = False
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _TenantChanges:
+    entries: Deque[Tuple[int, str, ChangeKind]]
+    # Menor ``since`` que ainda pode ser respondido a partir do buffer
+    floor: int
+    last_version: int
+
+
+class InventoryChangeLog:
+    """
+    Buffer circular de alterações do inventário por tenant.
+
+    Cada escrita registra ``(versão, produto, tipo)``. Uma consulta desde a
+    versão N percorre apenas as entradas posteriores a N e colapsa várias
+    alterações do mesmo produto em uma só, comparando se ele existia em N e
+    se existe agora. Quando entradas posteriores a N já foram descartadas
+    pelo limite do buffer, a consulta sinaliza que o cliente precisa
+    ressincronizar com a listagem completa.
+    """
+
+    def __init__(self, capacity_per_tenant: int = 1000):
+        self.capacity_per_tenant = capacity_per_tenant
+        self._tenants: Dict[str, _TenantChanges] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, tenant_id: str, version: int, product_name: str, kind: ChangeKind
+    ) -> None:
+        """
+        Registra a alteração que levou o inventário do tenant à ``version``.
+
+        Uma versão não crescente (ex.: inventário restaurado) reinicia o
+        histórico do tenant a partir dela.
+        """
+        with self._lock:
+            changes = self._tenants.get(tenant_id)
+            if changes is None or version <= changes.last_version:
+                changes = self._reset(tenant_id, version - 1)
+
+            if len(changes.entries) == self.capacity_per_tenant:
+                evicted_version = changes.entries[0][0]
+                changes.floor = max(changes.floor, evicted_version)
+            changes.entries.append((version, product_name, kind))
+            changes.last_version = version
+
+    def reset(self, tenant_id: str, version: int) -> None:
+        """
+        Descarta o histórico do tenant (ex.: inventário importado de outro
+        shard); consultas anteriores a ``version`` passam a exigir
+        ressincronização.
+        """
+        with self._lock:
+            self._reset(tenant_id, version)
+
+    def discard(self, tenant_id: str) -> None:
+        with self._lock:
+            self._tenants.pop(tenant_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tenants.clear()
+
+    def changes_since(
+        self, tenant_id: str, since: int, current_version: int
+    ) -> ChangeSet:
+        """
+        Calcula os produtos adicionados, alterados e removidos desde ``since``.
+
+        Args:
+            tenant_id: Identificador do tenant
+            since: Versão já sincronizada pelo cliente
+            current_version: Versão atual do inventário do tenant
+
+        Returns:
+            ChangeSet com os nomes dos produtos, ou com ``resync_required``
+            quando o histórico desde ``since`` não está mais disponível
+        """
+        with self._lock:
+            changes = self._tenants.get(tenant_id)
+            floor = changes.floor if changes is not None else current_version
+            if since > current_version or since < floor:
+                return ChangeSet(version=current_version, resync_required=True)
+            if changes is None or since == current_version:
+                return ChangeSet(version=current_version)
+            # Uma escrita concluída após a leitura de ``current_version`` já
+            # aparece nas entradas; a versão retornada a inclui
+            current_version = max(current_version, changes.last_version)
+
+            # Entradas em ordem crescente de versão: varre do fim até ``since``
+            first_kind: Dict[str, ChangeKind] = {}
+            last_kind: Dict[str, ChangeKind] = {}
+            for version, product_name, kind in reversed(changes.entries):
+                if version <= since:
+                    break
+                last_kind.setdefault(product_name, kind)
+                first_kind[product_name] = kind
+
+        change_set = ChangeSet(version=current_version)
+        for product_name, kind in last_kind.items():
+            existed = first_kind[product_name] is not ChangeKind.ADDED
+            exists = kind is not ChangeKind.REMOVED
+            if existed and exists:
+                change_set.changed.append(product_name)
+            elif exists:
+                change_set.added.append(product_name)
+            elif existed:
+                change_set.removed.append(product_name)
+        return change_set
+
+    def _reset(self, tenant_id: str, version: int) -> _TenantChanges:
+        changes = _TenantChanges(
+            entries=deque(maxlen=self.capacity_per_tenant),
+            floor=version,
+            last_version=version,
+        )
+        self._tenants[tenant_id] = changes
+        return changes
+
+
+# Histórico de alterações compartilhado entre requisições do processo
+INVENTORY_CHANGES = InventoryChangeLog()
@@ -1,12 +1,69 @@
 import logging
 from typing import Dict, Any, Optional
 
+from app.repositories.change_log import ChangeKind, ChangeSet, InventoryChangeLog
+
 logger = logging.getLogger(__name__)
 
+# Local usado para produtos cadastrados sem detalhamento por local
+DEFAULT_LOCATION = "Principal"
+
+
+def get_locations(product_data: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Retorna o estoque por local de um produto.
+
+    Produtos sem detalhamento têm todo o estoque no local padrão.
+
+    Args:
+        product_data: Dados do produto no formato da base de dados
+
+    Returns:
+        Dicionário local -> quantidade
+    """
+    locations = product_data.get("locations")
+    if locations is None:
+        return {DEFAULT_LOCATION: product_data["quantity"]}
+    return locations
+
+
+def get_primary_location(product_data: Dict[str, Any]) -> str:
+    """Retorna o local usado quando uma movimentação não informa o local."""
+    return next(iter(get_locations(product_data)), DEFAULT_LOCATION)
+
 
 class InventoryRepository:
-    def __init__(self, session: Dict[str, Any]):
+    def __init__(
+        self,
+        session: Dict[str, Any],
+        versions: Optional[Dict[str, int]] = None,
+        changes: Optional[InventoryChangeLog] = None,
+    ):
         self.session = session
+        self.versions = versions if versions is not None else {}
+        self.changes = changes
+
+    def ping(self) -> bool:
+        """
+        Verifica se o backend de armazenamento responde.
+
+        Returns:
+            True se o backend está acessível
+        """
+        len(self.session)
+        return True
+
+    def get_version(self, tenant_id: str) -> int:
+        """
+        Retorna a versão atual do inventário de um tenant.
+
+        Args:
+            tenant_id: Identificador do tenant
+
+        Returns:
+            Versão do inventário, incrementada a cada alteração de estoque
+        """
+        return self.versions.get(tenant_id, 0)
 
     def get_inventory(
         self, tenant_id: str, product_name: str
@@ -36,6 +93,86 @@ class InventoryRepository:
         """
         return self.session.get(tenant_id, {})
 
+    def snapshot_inventory(self, tenant_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Copia o estoque de um tenant para leitura fora do event loop.
+
+        Cada produto e seus locais são copiados, então alterações posteriores
+        no repositório não aparecem na cópia.
+
+        Args:
+            tenant_id: Identificador do tenant
+
+        Returns:
+            Dicionário independente com todos os produtos do estoque do tenant
+        """
+        return {
+            product_name: {
+                **product_data, "locations": dict(get_locations(product_data))
+            }
+            for product_name, product_data in self.session.get(tenant_id, {}).items()
+        }
+
+    def update_quantity(
+        self,
+        tenant_id: str,
+        product_name: str,
+        quantity: int,
+        location: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atualiza a quantidade em estoque de um produto em um local,
+        incrementa a versão do inventário do tenant e registra a alteração
+        no histórico de alterações.
+
+        O total do produto é ajustado pela diferença no local, sem somar os
+        demais locais, então a leitura do total continua O(1).
+
+        Args:
+            tenant_id: Identificador do tenant
+            product_name: Nome do produto a ser atualizado
+            quantity: Nova quantidade em estoque no local
+            location: Local do estoque; padrão é o local principal do produto
+
+        Returns:
+            Dicionário com os dados atualizados do produto ou None se não encontrado
+        """
+        product_data = self.session.get(tenant_id, {}).get(product_name)
+        if product_data is None:
+            return None
+
+        locations = product_data.setdefault("locations", get_locations(product_data))
+        if location is None:
+            location = get_primary_location(product_data)
+
+        previous = locations.get(location, 0)
+        locations[location] = quantity
+        product_data["quantity"] += quantity - previous
+        version = self.get_version(tenant_id) + 1
+        self.versions[tenant_id] = version
+        if self.changes is not None:
+            self.changes.record(tenant_id, version, product_name, ChangeKind.CHANGED)
+        return product_data
+
+    def get_changes(self, tenant_id: str, since: int) -> ChangeSet:
+        """
+        Consulta os produtos alterados no inventário de um tenant desde uma
+        versão.
+
+        Args:
+            tenant_id: Identificador do tenant
+            since: Versão já sincronizada pelo cliente
+
+        Returns:
+            ChangeSet com os produtos adicionados, alterados e removidos
+        """
+        current_version = self.get_version(tenant_id)
+        if self.changes is None:
+            return ChangeSet(
+                version=current_version, resync_required=since != current_version
+            )
+        return self.changes.changes_since(tenant_id, since, current_version)
+
     def get_low_stock_items(self, tenant_id: str) -> Optional[Dict[str, Any]]:
         """
         Consulta os produtos com estoque abaixo do mínimo para um tenant.
@@ -0,0 +1,359 @@
+import atexit
+import bisect
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Registro de tamanho fixo: timestamp (ns), variação e quantidade resultante
+RECORD = struct.Struct("<qii")
+# Maior variação ou quantidade representável em um registro (int32)
+MAX_RECORD_VALUE = 2**31 - 1
+SEGMENT_SUFFIX = ".seg"
+
+
+@dataclass
+class _Stream:
+    """Estado em memória do log de um produto de um tenant."""
+
+    directory: str
+    segment_starts: List[int] = field(default_factory=list)
+    segment_paths: List[str] = field(default_factory=list)
+    current_count: int = 0
+    last_timestamp: int = 0
+    committed: Dict[str, int] = field(default_factory=dict)
+    pending: List[Tuple[str, bytes]] = field(default_factory=list)
+
+
+class StockMovementLog:
+    """
+    Log append-only de movimentações de estoque por tenant e produto.
+
+    Cada produto tem seu próprio diretório com segmentos de registros de
+    tamanho fixo, nomeados pelo timestamp do primeiro registro. A lista de
+    inícios de segmento funciona como índice temporal: consultas localizam o
+    segmento inicial por busca binária e, dentro dele, o primeiro registro por
+    busca binária sobre o arquivo mapeado em memória.
+
+    As escritas são acumuladas em memória e persistidas em group commit (uma
+    escrita e um fsync por segmento a cada ``commit_interval`` segundos), para
+    não bloquear o caminho de escrita do inventário. Consultas leem dos
+    arquivos apenas os registros já persistidos e completam o resultado com os
+    pendentes em memória, sem forçar um commit.
+
+    Durabilidade: ``append`` retorna antes do fsync. Uma queda do processo
+    perde no máximo os registros dos últimos ``commit_interval`` segundos
+    (mais a duração do commit em andamento).
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        records_per_segment: int = 4096,
+        commit_interval: float = 0.05,
+    ):
+        self.base_dir = base_dir
+        self.records_per_segment = records_per_segment
+        self.commit_interval = commit_interval
+        self._streams: Dict[Tuple[str, str], _Stream] = {}
+        self._dirty: Dict[Tuple[str, str], _Stream] = {}
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+
+    def append(
+        self,
+        tenant_id: str,
+        product_name: str,
+        delta: int,
+        quantity: int,
+        timestamp_ns: Optional[int] = None,
+    ) -> int:
+        """
+        Registra uma movimentação de estoque.
+
+        O registro fica visível imediatamente para consultas e é persistido no
+        próximo group commit; até lá, uma queda do processo o descarta.
+
+        Args:
+            tenant_id: Identificador do tenant
+            product_name: Nome do produto movimentado
+            delta: Variação da quantidade (negativa para saídas)
+            quantity: Quantidade resultante após a movimentação
+            timestamp_ns: Timestamp em nanossegundos; padrão é o relógio atual
+
+        Returns:
+            Timestamp efetivamente gravado, nunca menor que o anterior do produto
+        """
+        key = (tenant_id, product_name)
+        stream = self._get_stream(key)
+        with self._lock:
+            timestamp = max(
+                timestamp_ns if timestamp_ns is not None else time.time_ns(),
+                stream.last_timestamp,
+            )
+
+            if (
+                not stream.segment_paths
+                or stream.current_count >= self.records_per_segment
+            ):
+                path = os.path.join(
+                    stream.directory, f"{timestamp:020d}{SEGMENT_SUFFIX}"
+                )
+                stream.segment_starts.append(timestamp)
+                stream.segment_paths.append(path)
+                stream.current_count = 0
+
+            stream.pending.append(
+                (stream.segment_paths[-1], RECORD.pack(timestamp, delta, quantity))
+            )
+            stream.current_count += 1
+            stream.last_timestamp = timestamp
+            self._dirty[key] = stream
+            self._pending_total += 1
+
+        self._ensure_flusher()
+        return timestamp
+
+    def query(
+        self,
+        tenant_id: str,
+        product_name: str,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Consulta as movimentações de um produto em um intervalo de tempo.
+
+        Args:
+            tenant_id: Identificador do tenant
+            product_name: Nome do produto
+            start_ns: Início do intervalo (inclusivo), em nanossegundos
+            end_ns: Fim do intervalo (inclusivo), em nanossegundos
+
+        Returns:
+            Lista de tuplas (timestamp_ns, delta, quantidade) em ordem temporal
+        """
+        stream = self._get_stream((tenant_id, product_name))
+        with self._lock:
+            starts = list(stream.segment_starts)
+            paths = list(stream.segment_paths)
+            committed = dict(stream.committed)
+            pending = [payload for _, payload in stream.pending]
+            last_timestamp = stream.last_timestamp
+
+        if not starts:
+            return []
+
+        start_ns = start_ns if start_ns is not None else starts[0]
+        end_ns = end_ns if end_ns is not None else last_timestamp
+        if end_ns < start_ns:
+            return []
+
+        first_segment = max(bisect.bisect_left(starts, start_ns) - 1, 0)
+        records: List[Tuple[int, int, int]] = []
+        for index in range(first_segment, len(paths)):
+            if starts[index] > end_ns:
+                return records
+            limit = committed.get(paths[index], 0)
+            if self._scan_segment(paths[index], start_ns, end_ns, limit, records):
+                return records
+
+        # Registros pendentes são sempre posteriores aos já persistidos
+        for payload in pending:
+            record = RECORD.unpack(payload)
+            if record[0] > end_ns:
+                break
+            if record[0] >= start_ns:
+                records.append(record)
+        return records
+
+    def flush(self) -> None:
+        """
+        Persiste todos os registros pendentes em um único group commit.
+
+        Os registros só saem do buffer em memória depois do fsync, para que
+        consultas concorrentes continuem a enxergá-los durante o commit.
+        """
+        with self._commit_lock:
+            with self._lock:
+                dirty = list(self._dirty.items())
+                self._dirty.clear()
+                taken = [(stream, len(stream.pending)) for _, stream in dirty]
+                batches: Dict[str, List[bytes]] = {}
+                for stream, count in taken:
+                    for path, payload in stream.pending[:count]:
+                        batches.setdefault(path, []).append(payload)
+
+            written = set()
+            try:
+                for path, payloads in batches.items():
+                    with open(path, "ab") as segment:
+                        segment.write(b"".join(payloads))
+                        segment.flush()
+                        os.fsync(segment.fileno())
+                    written.add(path)
+            finally:
+                with self._lock:
+                    for (key, stream), (_, count) in zip(dirty, taken):
+                        kept = []
+                        for path, payload in stream.pending[:count]:
+                            if path in written:
+                                stream.committed[path] = (
+                                    stream.committed.get(path, 0) + 1
+                                )
+                            else:
+                                kept.append((path, payload))
+                        stream.pending[:count] = kept
+                        self._pending_total -= count - len(kept)
+                        if kept:
+                            self._dirty[key] = stream
+
+    def pending_count(self) -> int:
+        """Retorna a quantidade de registros aguardando o próximo group commit."""
+        with self._lock:
+            return self._pending_total
+
+    def close(self) -> None:
+        """Interrompe o flusher em segundo plano e persiste o que estiver pendente."""
+        self._closed = True
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        self.flush()
+
+    def _scan_segment(
+        self,
+        path: str,
+        start_ns: int,
+        end_ns: int,
+        limit: int,
+        records: List[Tuple[int, int, int]],
+    ) -> bool:
+        """
+        Lê os registros persistidos de um segmento dentro do intervalo.
+
+        Args:
+            limit: Quantidade de registros já confirmados no segmento; um
+                commit em andamento pode ter gravado mais que isso
+
+        Returns:
+            True se o fim do intervalo foi atingido dentro do segmento
+        """
+        if limit == 0:
+            return False
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return False
+        total = min(size // RECORD.size, limit)
+        if total == 0:
+            return False
+
+        with open(path, "rb") as segment:
+            with mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                low, high = 0, total
+                while low < high:
+                    middle = (low + high) // 2
+                    if RECORD.unpack_from(view, middle * RECORD.size)[0] < start_ns:
+                        low = middle + 1
+                    else:
+                        high = middle
+
+                for index in range(low, total):
+                    record = RECORD.unpack_from(view, index * RECORD.size)
+                    if record[0] > end_ns:
+                        return True
+                    records.append(record)
+        return False
+
+    def _get_stream(self, key: Tuple[str, str]) -> _Stream:
+        """
+        Retorna o estado do produto, carregando-o do disco no primeiro acesso.
+
+        A leitura do diretório acontece fora de ``_lock``, para não bloquear
+        os demais produtos; se duas threads carregarem o mesmo produto, vale o
+        estado publicado primeiro.
+        """
+        with self._lock:
+            stream = self._streams.get(key)
+        if stream is None:
+            loaded = self._load_stream(key)
+            with self._lock:
+                stream = self._streams.setdefault(key, loaded)
+        return stream
+
+    def _load_stream(self, key: Tuple[str, str]) -> _Stream:
+        tenant_id, product_name = key
+        directory = os.path.join(
+            self.base_dir, _path_component(tenant_id), _path_component(product_name)
+        )
+        os.makedirs(directory, exist_ok=True)
+        stream = _Stream(directory=directory)
+
+        segments = sorted(
+            name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX)
+        )
+        for name in segments:
+            path = os.path.join(directory, name)
+            stream.segment_starts.append(int(name[: -len(SEGMENT_SUFFIX)]))
+            stream.segment_paths.append(path)
+            stream.committed[path] = os.path.getsize(path) // RECORD.size
+
+        if segments:
+            last_path = stream.segment_paths[-1]
+            stream.current_count = stream.committed[last_path]
+            if stream.current_count:
+                with open(last_path, "rb") as segment:
+                    segment.seek((stream.current_count - 1) * RECORD.size)
+                    stream.last_timestamp = RECORD.unpack(segment.read(RECORD.size))[0]
+            else:
+                stream.last_timestamp = stream.segment_starts[-1]
+        return stream
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None or self._closed:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._run_flusher, name="movement-log-flusher", daemon=True
+                )
+                self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.commit_interval)
+            try:
+                self.flush()
+                self.last_error = None
+            except OSError as error:
+                self.last_error = str(error)
+                logger.exception("[MOVEMENT LOG] Falha no group commit")
+
+
+def _path_component(name: str) -> str:
+    """Gera um nome de diretório seguro e estável a partir de um identificador."""
+    return hashlib.blake2b(name.encode("utf-8"), digest_size=10).hexdigest()
+
+
+# Log compartilhado entre requisições do processo
+MOVEMENT_LOG = StockMovementLog(
+    base_dir=os.getenv(
+        "STOCKWISE_MOVEMENT_LOG_DIR",
+        os.path.join(tempfile.gettempdir(), "stockwise", "movements"),
+    )
+)
+atexit.register(MOVEMENT_LOG.close)
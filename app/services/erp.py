@@ -0,0 +1,437 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Deque, Dict, Optional
+
+import httpx
+
+from app.models.schemas import RestockStatus
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 425, 429}
+SUCCESS_MESSAGE = (
+    "Solicitação de reabastecimento enviada com sucesso para o sistema ERP"
+)
+
+
+class CircuitState(str, Enum):
+    """Estados do circuit breaker do ERP."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class OpenCircuitPolicy(str, Enum):
+    """O que fazer com uma solicitação quando o ERP está indisponível."""
+
+    # Responde FAILED imediatamente; o cliente decide quando repetir
+    FAIL = "fail"
+    # Enfileira e responde PENDING; a fila é reenviada quando o ERP volta
+    QUEUE = "queue"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de contagem de falhas consecutivas.
+
+    Após ``failure_threshold`` falhas seguidas o circuito abre e as chamadas
+    são recusadas sem tocar o ERP. Passados ``reset_timeout`` segundos, uma
+    única chamada de teste é liberada (meio-aberto): se ela der certo o
+    circuito fecha, se falhar ele abre novamente.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and self.clock() - self._opened_at >= self.reset_timeout
+        ):
+            return CircuitState.HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Indica se uma chamada pode ser feita agora. No estado meio-aberto,
+        apenas a primeira chamada é liberada até que seu resultado seja
+        registrado.
+        """
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.HALF_OPEN and not self._probe_in_flight:
+            self._state = CircuitState.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self._state is not CircuitState.CLOSED:
+            logger.info("[ERP] Circuito fechado, ERP respondendo novamente")
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Libera a chamada de teste interrompida antes de ter um resultado."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if (
+            self._state is CircuitState.HALF_OPEN
+            or self._failures >= self.failure_threshold
+        ):
+            if self._state is not CircuitState.OPEN:
+                logger.warning(
+                    f"[ERP] Circuito aberto após {self._failures} falhas; "
+                    f"nova tentativa em {self.reset_timeout:.0f}s"
+                )
+            self._state = CircuitState.OPEN
+            self._opened_at = self.clock()
+            self._probe_in_flight = False
+
+
+@dataclass
+class ErpResult:
+    """Resultado do envio de uma solicitação de reabastecimento ao ERP."""
+
+    status: RestockStatus
+    message: str
+
+
+@dataclass
+class _PendingRestock:
+    request_id: str
+    tenant_id: str
+    product_name: str
+    quantity: int
+    queued_at: datetime = field(default_factory=datetime.now)
+
+
+class _ErpUnavailable(Exception):
+    """Falha de rede, timeout ou resposta 5xx/408/425/429 do ERP."""
+
+
+class _ErpRejected(Exception):
+    """O ERP respondeu, mas recusou a solicitação (4xx)."""
+
+
+class ErpClient:
+    """
+    Cliente das solicitações de reabastecimento enviadas ao ERP.
+
+    Protege o worker de um ERP lento ou fora do ar:
+
+    - bulkhead por tenant: no máximo ``max_concurrency_per_tenant`` chamadas
+      simultâneas por tenant; além disso a solicitação falha na hora (FAILED,
+      sem esperar e sem enfileirar), então um tenant não consome todas as
+      conexões;
+    - timeout de conexão e prazo total ``timeout`` por chamada, incluindo o
+      envio e a leitura da resposta;
+    - circuit breaker compartilhado: com o circuito aberto nenhuma chamada
+      chega ao ERP e a resposta segue ``open_circuit_policy`` (FAILED, ou
+      PENDING com a solicitação enfileirada para reenvio em segundo plano);
+    - pool de conexões HTTP reaproveitado entre as chamadas.
+
+    Sem ``base_url`` o envio é apenas registrado em log, como antes da
+    integração.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: float = 2.0,
+        connect_timeout: float = 0.5,
+        max_concurrency_per_tenant: int = 4,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        open_circuit_policy: OpenCircuitPolicy = OpenCircuitPolicy.QUEUE,
+        max_pending: int = 10_000,
+        retry_interval: float = 5.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_concurrency_per_tenant = max_concurrency_per_tenant
+        self.open_circuit_policy = open_circuit_policy
+        self.max_pending = max_pending
+        self.retry_interval = retry_interval
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._client = client
+        self._owns_client = client is None
+        self._bulkheads: Dict[str, asyncio.Semaphore] = {}
+        self._pending: Deque[_PendingRestock] = deque()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    def from_env(cls) -> "ErpClient":
+        """
+        Cria o cliente a partir de ``STOCKWISE_ERP_URL``,
+        ``STOCKWISE_ERP_TIMEOUT`` (segundos) e ``STOCKWISE_ERP_OPEN_CIRCUIT``
+        (``queue`` ou ``fail``).
+        """
+        return cls(
+            base_url=os.getenv("STOCKWISE_ERP_URL") or None,
+            timeout=float(os.getenv("STOCKWISE_ERP_TIMEOUT", "2.0")),
+            open_circuit_policy=OpenCircuitPolicy(
+                os.getenv("STOCKWISE_ERP_OPEN_CIRCUIT", OpenCircuitPolicy.QUEUE.value)
+            ),
+        )
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            )
+        return self._client
+
+    async def request_restock(
+        self,
+        tenant_id: str,
+        product_name: str,
+        quantity: int,
+        idempotency_key: Optional[str] = None,
+    ) -> ErpResult:
+        """
+        Envia uma solicitação de reabastecimento ao ERP.
+
+        Com ``idempotency_key``, o Idempotency-Key enviado ao ERP é derivado
+        dela, do tenant e do pedido. Uma nova tentativa do cliente após um
+        FAILED ambíguo (timeout de uma chamada que pode ter chegado ao ERP)
+        reaproveita a mesma chave e não duplica o pedido.
+
+        Args:
+            tenant_id: Identificador do tenant
+            product_name: Nome do produto
+            quantity: Quantidade solicitada
+            idempotency_key: Chave de idempotência enviada pelo cliente
+
+        Returns:
+            ErpResult com SUCCESS, PENDING (enfileirada para reenvio) ou FAILED
+        """
+        if self.base_url is None:
+            logger.info(
+                f"[ERP] ERP não configurado, envio simulado - Tenant: {tenant_id}, "
+                f"Produto: {product_name}, Qtd: {quantity}",
+                extra={"tenant_id": tenant_id, "product_name": product_name},
+            )
+            return ErpResult(RestockStatus.SUCCESS, SUCCESS_MESSAGE)
+
+        restock = _PendingRestock(
+            request_id=_erp_request_id(
+                tenant_id, product_name, quantity, idempotency_key
+            ),
+            tenant_id=tenant_id,
+            product_name=product_name,
+            quantity=quantity,
+        )
+        bulkhead = self._bulkheads.setdefault(
+            tenant_id, asyncio.Semaphore(self.max_concurrency_per_tenant)
+        )
+        # Sem ``await`` entre a verificação e o acquire: a vaga não é disputada.
+        # Não enfileira: a fila é reenviada fora do bulkhead e um tenant com
+        # muitos pedidos simultâneos ocuparia o reenvio de todos os outros.
+        if bulkhead.locked():
+            logger.warning(
+                f"[ERP] Limite de chamadas simultâneas atingido - Tenant: "
+                f"{tenant_id}, Produto: {product_name}",
+                extra={"tenant_id": tenant_id},
+            )
+            return ErpResult(
+                RestockStatus.FAILED,
+                "Limite de chamadas simultâneas ao ERP atingido; "
+                "solicitação não enviada",
+            )
+        if not self.breaker.allow_request():
+            return self._unavailable(restock, "ERP indisponível (circuito aberto)")
+
+        async with bulkhead:
+            try:
+                await self._send(restock)
+            except _ErpRejected as error:
+                self.breaker.record_success()
+                return ErpResult(
+                    RestockStatus.FAILED, f"ERP recusou a solicitação ({error})"
+                )
+            except _ErpUnavailable as error:
+                self.breaker.record_failure()
+                return self._unavailable(restock, f"ERP indisponível ({error})")
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+
+        self.breaker.record_success()
+        return ErpResult(RestockStatus.SUCCESS, SUCCESS_MESSAGE)
+
+    async def start(self) -> None:
+        if self._task is None and self.base_url is not None:
+            self._task = asyncio.create_task(self._run(), name="erp-retry")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pending:
+            logger.warning(
+                f"[ERP] {len(self._pending)} solicitações pendentes não enviadas "
+                f"no desligamento"
+            )
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def flush_pending(self) -> int:
+        """
+        Reenvia as solicitações pendentes, em ordem, enquanto o circuito
+        permitir. Solicitações recusadas pelo ERP (4xx) são descartadas.
+
+        Returns:
+            Número de solicitações aceitas pelo ERP
+        """
+        sent = 0
+        while self._pending and self.breaker.allow_request():
+            restock = self._pending.popleft()
+            try:
+                await self._send(restock)
+            except _ErpRejected as error:
+                self.breaker.record_success()
+                logger.warning(
+                    f"[ERP] Solicitação pendente descartada ({error}) - "
+                    f"Tenant: {restock.tenant_id}, Produto: {restock.product_name}",
+                    extra={"tenant_id": restock.tenant_id},
+                )
+            except _ErpUnavailable:
+                self.breaker.record_failure()
+                self._pending.appendleft(restock)
+                break
+            except asyncio.CancelledError:
+                self.breaker.release()
+                self._pending.appendleft(restock)
+                raise
+            else:
+                self.breaker.record_success()
+                sent += 1
+        if sent:
+            logger.info(f"[ERP] {sent} solicitações pendentes enviadas")
+        return sent
+
+    def clear(self) -> None:
+        """Descarta as solicitações pendentes e fecha o circuito."""
+        self._pending.clear()
+        self.breaker.record_success()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.retry_interval)
+            try:
+                await self.flush_pending()
+            except Exception:
+                logger.exception("[ERP] Falha ao reenviar solicitações pendentes")
+
+    async def _send(self, restock: _PendingRestock) -> None:
+        """
+        Faz o POST do pedido. O ``request_id`` vai como Idempotency-Key, para
+        que reenvios de uma solicitação pendente não dupliquem o pedido.
+
+        Os timeouts do httpx valem para cada etapa (conexão, escrita, cada
+        leitura); ``timeout`` limita a chamada inteira, então um ERP que
+        devolve a resposta aos poucos também é interrompido.
+
+        Raises:
+            _ErpUnavailable: Falha de rede, timeout ou resposta repetível
+            _ErpRejected: Resposta 4xx não repetível
+        """
+        try:
+            async with asyncio.timeout(self.timeout):
+                response = await self.client.post(
+                    f"{self.base_url}/restock-orders",
+                    json={
+                        "tenant_id": restock.tenant_id,
+                        "product_name": restock.product_name,
+                        "quantity": restock.quantity,
+                    },
+                    headers={"Idempotency-Key": restock.request_id},
+                )
+        except TimeoutError as exc:
+            raise _ErpUnavailable("Timeout") from exc
+        except httpx.HTTPError as exc:
+            raise _ErpUnavailable(type(exc).__name__) from exc
+
+        if response.is_success:
+            return
+        status_code = response.status_code
+        if status_code >= 500 or status_code in RETRYABLE_STATUS_CODES:
+            raise _ErpUnavailable(f"HTTP {status_code}")
+        raise _ErpRejected(f"HTTP {status_code}")
+
+    def _unavailable(self, restock: _PendingRestock, reason: str) -> ErpResult:
+        """Aplica a ``open_circuit_policy`` a uma solicitação não enviada."""
+        logger.warning(
+            f"[ERP] {reason} - Tenant: {restock.tenant_id}, "
+            f"Produto: {restock.product_name}",
+            extra={"tenant_id": restock.tenant_id},
+        )
+        if (
+            self.open_circuit_policy is OpenCircuitPolicy.QUEUE
+            and len(self._pending) < self.max_pending
+        ):
+            self._pending.append(restock)
+            return ErpResult(
+                RestockStatus.PENDING,
+                f"{reason}; solicitação enfileirada para reenvio",
+            )
+        return ErpResult(RestockStatus.FAILED, f"{reason}; solicitação não enviada")
+
+
+def _erp_request_id(
+    tenant_id: str, product_name: str, quantity: int, idempotency_key: Optional[str]
+) -> str:
+    """
+    Idempotency-Key da solicitação no ERP: aleatório sem chave do cliente;
+    com ela, um hash determinístico de tenant, chave e pedido (a mesma chave
+    com outro pedido gera outro valor, em vez de receber a resposta do
+    primeiro).
+    """
+    if idempotency_key is None:
+        return uuid.uuid4().hex
+    digest = hashlib.sha256()
+    for part in (tenant_id, idempotency_key, product_name, str(quantity)):
+        digest.update(part.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+# Cliente compartilhado entre requisições do processo
+ERP_CLIENT = ErpClient.from_env()
@@ -0,0 +1,164 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+SECONDS_PER_DAY = 86_400.0
+# Menor taxa exposta (a precisão de ``daily_consumption``); abaixo dela o
+# consumo é tratado como zero
+MIN_RATE_PER_DAY = 1e-4
+
+
+@dataclass
+class _ConsumptionState:
+    """Taxa de consumo de um produto e instante da última saída observada."""
+
+    rate_per_day: float = 0.0
+    last_event_at: Optional[float] = None
+
+
+class ConsumptionForecaster:
+    """
+    Estimador incremental da taxa de consumo de cada produto.
+
+    Mantém, por tenant e produto, uma média móvel exponencialmente ponderada
+    no tempo das saídas de estoque (unidades por dia). Cada saída atualiza o
+    estado em O(1): a taxa instantânea ``amount / dt`` é combinada com a taxa
+    anterior usando ``alpha = 1 - exp(-dt / tau)``, em que ``tau`` é a janela
+    de suavização. Entradas de estoque não alteram a taxa.
+
+    A primeira saída de um produto conta como consumo distribuído na janela de
+    suavização (``amount / tau``). Nas leituras, o tempo decorrido desde a
+    última saída entra como uma observação implícita de consumo zero, então a
+    taxa de um produto que parou de sair decai com ``exp(-elapsed / tau)``,
+    até ficar abaixo de ``MIN_RATE_PER_DAY`` e passar a valer zero.
+    """
+
+    def __init__(
+        self,
+        smoothing_days: float = 7.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.tau = smoothing_days * SECONDS_PER_DAY
+        self.clock = clock
+        self._states: Dict[str, Dict[str, _ConsumptionState]] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        tenant_id: str,
+        product_name: str,
+        delta: int,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """
+        Atualiza a taxa de consumo com uma movimentação de estoque.
+
+        Args:
+            tenant_id: Identificador do tenant
+            product_name: Nome do produto movimentado
+            delta: Variação da quantidade; apenas saídas (negativas) contam
+            timestamp: Instante da movimentação em segundos; padrão é o relógio atual
+        """
+        if delta >= 0:
+            return
+
+        amount = -delta
+        now = timestamp if timestamp is not None else self.clock()
+
+        with self._lock:
+            state = self._states.setdefault(tenant_id, {}).setdefault(
+                product_name, _ConsumptionState()
+            )
+
+            elapsed = (
+                max(now - state.last_event_at, 0.0)
+                if state.last_event_at is not None
+                else 0.0
+            )
+            if elapsed == 0.0:
+                # Limite de alpha * amount / dt quando dt -> 0
+                state.rate_per_day += amount * SECONDS_PER_DAY / self.tau
+            else:
+                alpha = 1.0 - math.exp(-elapsed / self.tau)
+                instant_rate = amount * SECONDS_PER_DAY / elapsed
+                state.rate_per_day += alpha * (instant_rate - state.rate_per_day)
+
+            state.last_event_at = max(now, state.last_event_at or now)
+
+    def get_rate(self, tenant_id: str, product_name: str) -> float:
+        """
+        Retorna a taxa de consumo estimada de um produto, em unidades por dia.
+
+        Args:
+            tenant_id: Identificador do tenant
+            product_name: Nome do produto
+
+        Returns:
+            Taxa de consumo estimada, 0.0 se ainda não houver estimativa
+        """
+        now = self.clock()
+        with self._lock:
+            state = self._states.get(tenant_id, {}).get(product_name)
+            return self._decayed_rate(state, now) if state is not None else 0.0
+
+    def get_tenant_rates(self, tenant_id: str) -> Dict[str, float]:
+        """
+        Retorna as taxas de consumo positivas de todos os produtos do tenant.
+
+        Args:
+            tenant_id: Identificador do tenant
+
+        Returns:
+            Dicionário produto -> taxa de consumo (unidades por dia)
+        """
+        now = self.clock()
+        with self._lock:
+            rates = {
+                product_name: self._decayed_rate(state, now)
+                for product_name, state in self._states.get(tenant_id, {}).items()
+            }
+        return {product_name: rate for product_name, rate in rates.items() if rate > 0}
+
+    def days_until_stockout(
+        self, tenant_id: str, product_name: str, quantity: int
+    ) -> Optional[float]:
+        """
+        Estima em quantos dias o estoque atual de um produto se esgota.
+
+        Args:
+            tenant_id: Identificador do tenant
+            product_name: Nome do produto
+            quantity: Quantidade atual em estoque
+
+        Returns:
+            Dias até a ruptura ou None se não houver consumo estimado
+        """
+        return estimate_days_until_stockout(
+            quantity, self.get_rate(tenant_id, product_name)
+        )
+
+    def clear(self) -> None:
+        """Descarta todas as taxas de consumo estimadas."""
+        with self._lock:
+            self._states.clear()
+
+    def _decayed_rate(self, state: _ConsumptionState, now: float) -> float:
+        """Aplica à taxa o consumo zero observado desde a última saída."""
+        rate = state.rate_per_day
+        if state.last_event_at is not None:
+            elapsed = max(now - state.last_event_at, 0.0)
+            rate *= math.exp(-elapsed / self.tau)
+        return rate if rate >= MIN_RATE_PER_DAY else 0.0
+
+
+def estimate_days_until_stockout(quantity: int, rate_per_day: float) -> Optional[float]:
+    """Converte quantidade e taxa de consumo em dias até a ruptura."""
+    if rate_per_day <= 0:
+        return None
+    return round(quantity / rate_per_day, 2)
+
+
+# Estimador compartilhado entre requisições do processo
+CONSUMPTION_FORECASTER = ConsumptionForecaster()
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from app.database.database import MOCK_INVENTORY_DB
+from app.diagnostics.lag import EventLoopLagMonitor
+from app.repositories.inventory_repository import InventoryRepository
+from app.repositories.movement_log import MOVEMENT_LOG
+from app.services.erp import ERP_CLIENT
+from app.services.webhooks import WEBHOOK_DISPATCHER
+
+logger = logging.getLogger(__name__)
+
+# Uma verificação retorna detalhes adicionais; levantar exceção a marca como falha
+HealthCheck = Callable[[], Dict[str, Any]]
+
+
+@dataclass
+class _Queue:
+    depth: Callable[[], int]
+    max_depth: int
+
+
+class HealthMonitor:
+    """
+    Verificações de prontidão executadas em segundo plano.
+
+    A cada ``interval`` segundos, as verificações registradas rodam em uma
+    thread (com ``check_timeout``), as filas registradas são medidas e o
+    maior atraso do event loop no intervalo é lido de ``lag_monitor``, o
+    mesmo monitor usado pelo diagnóstico. O resultado fica em cache, então
+    ``snapshot`` é O(1) e os probes nunca acessam o backend.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        check_timeout: float = 2.0,
+        max_loop_lag: float = 0.5,
+        lag_monitor: Optional[EventLoopLagMonitor] = None,
+    ):
+        self.interval = interval
+        self.check_timeout = check_timeout
+        self.max_loop_lag = max_loop_lag
+        self.lag_monitor = lag_monitor or EventLoopLagMonitor(report_stalls=False)
+        self._checks: Dict[str, HealthCheck] = {}
+        self._queues: Dict[str, _Queue] = {}
+        self._snapshot: Dict[str, Any] = {"status": "starting"}
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def register_check(self, name: str, check: HealthCheck) -> None:
+        """Registra uma verificação de dependência (ex.: backend de armazenamento)."""
+        self._checks[name] = check
+
+    def register_queue(
+        self, name: str, depth: Callable[[], int], max_depth: int
+    ) -> None:
+        """
+        Registra uma fila de processamento em segundo plano.
+
+        Args:
+            name: Nome da fila no relatório de prontidão
+            depth: Função que retorna a profundidade atual da fila
+            max_depth: Profundidade a partir da qual a instância deixa de estar pronta
+        """
+        self._queues[name] = _Queue(depth=depth, max_depth=max_depth)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._snapshot["status"] == "ready"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna o último resultado calculado, sem executar verificações."""
+        return self._snapshot
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Executa todas as verificações e atualiza o resultado em cache."""
+        ready = True
+
+        checks: Dict[str, Any] = {}
+        for name, check in self._checks.items():
+            try:
+                details = await asyncio.wait_for(
+                    asyncio.to_thread(check), timeout=self.check_timeout
+                )
+                checks[name] = {"status": "ok", **details}
+            except Exception as error:
+                ready = False
+                checks[name] = {
+                    "status": "error",
+                    "detail": str(error) or type(error).__name__,
+                }
+                logger.warning(f"[HEALTH] Verificação '{name}' falhou: {error!r}")
+
+        queues: Dict[str, Any] = {}
+        for name, queue in self._queues.items():
+            depth = queue.depth()
+            saturated = depth >= queue.max_depth
+            ready = ready and not saturated
+            queues[name] = {
+                "status": "saturated" if saturated else "ok",
+                "depth": depth,
+                "max_depth": queue.max_depth,
+            }
+
+        loop_lag = self.lag_monitor.recent_max(self.interval)
+        lagging = loop_lag > self.max_loop_lag
+        ready = ready and not lagging
+
+        self._snapshot = {
+            "status": "ready" if ready else "not_ready",
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checks": checks,
+            "queues": queues,
+            "event_loop": {
+                "status": "lagging" if lagging else "ok",
+                "lag_ms": round(loop_lag * 1000, 3),
+                "max_lag_ms": round(self.max_loop_lag * 1000, 3),
+            },
+        }
+        return self._snapshot
+
+    async def start(self) -> None:
+        """Executa a primeira rodada de verificações e agenda as seguintes."""
+        if self._task is not None:
+            return
+        await self.lag_monitor.start()
+        await self.refresh()
+        self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.lag_monitor.stop()
+        self._snapshot = {"status": "starting"}
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("[HEALTH] Falha ao atualizar as verificações")
+
+
+def check_storage() -> Dict[str, Any]:
+    """
+    Verifica o backend de inventário e o log de movimentações.
+
+    Raises:
+        RuntimeError: Se o último group commit do log de movimentações falhou
+    """
+    InventoryRepository(session=MOCK_INVENTORY_DB).ping()
+    if MOVEMENT_LOG.last_error is not None:
+        raise RuntimeError(f"Log de movimentações: {MOVEMENT_LOG.last_error}")
+    return {"backend": "memory", "tenants": len(MOCK_INVENTORY_DB)}
+
+
+# Monitor compartilhado entre requisições do processo
+HEALTH_MONITOR = HealthMonitor()
+HEALTH_MONITOR.register_check("storage", check_storage)
+HEALTH_MONITOR.register_queue(
+    "movement_log", MOVEMENT_LOG.pending_count, max_depth=100_000
+)
+HEALTH_MONITOR.register_queue(
+    "webhooks",
+    WEBHOOK_DISPATCHER.queue_depth,
+    max_depth=WEBHOOK_DISPATCHER.max_queue_size,
+)
+HEALTH_MONITOR.register_queue(
+    "erp_pending", ERP_CLIENT.pending_count, max_depth=ERP_CLIENT.max_pending
+)
@@ -0,0 +1,138 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from app.services.single_flight import SingleFlight
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Chave de idempotência reutilizada com uma requisição diferente."""
+
+
+@dataclass
+class _StoredResult:
+    """Resultado concluído de uma operação idempotente."""
+
+    fingerprint: str
+    result: Any
+    expires_at: float
+
+
+class IdempotencyStore:
+    """
+    Armazém em memória de resultados de operações idempotentes.
+
+    Os resultados ficam em shards por tenant, cada um com TTL e limite de
+    tamanho. Como todas as entradas de um shard têm o mesmo TTL, a ordem de
+    inserção coincide com a ordem de expiração e a remoção das expiradas é
+    feita pela frente do shard em tempo amortizado O(1).
+
+    Requisições concorrentes com a mesma chave compartilham a mesma execução
+    (via ``SingleFlight``): apenas a primeira chama a operação e as demais
+    aguardam o seu resultado. Execuções que falham não são armazenadas,
+    permitindo uma nova tentativa; se a primeira for cancelada, uma das que
+    aguardavam executa a operação no lugar dela.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 24 * 60 * 60,
+        max_entries_per_tenant: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_tenant = max_entries_per_tenant
+        self.clock = clock
+        self._shards: Dict[str, "OrderedDict[str, _StoredResult]"] = {}
+        self._single_flight = SingleFlight()
+        # Impressão digital das execuções em andamento, por (tenant, chave)
+        self._in_flight: Dict[Tuple[str, str], str] = {}
+
+    async def execute(
+        self,
+        tenant_id: str,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, bool]:
+        """
+        Executa a operação uma única vez por chave dentro da janela de retenção.
+
+        Args:
+            tenant_id: Identificador do tenant dono da chave
+            key: Chave de idempotência enviada pelo cliente
+            fingerprint: Impressão digital do conteúdo da requisição
+            operation: Fábrica da corrotina que executa a operação
+
+        Returns:
+            Tupla (resultado, replay), em que replay indica se o resultado
+            veio de uma execução anterior ou concorrente
+
+        Raises:
+            IdempotencyKeyReusedError: Se a chave já foi usada com outro conteúdo
+        """
+        shard = self._shards.setdefault(tenant_id, OrderedDict())
+        self._evict_expired(shard)
+
+        stored = shard.get(key)
+        if stored is not None:
+            self._check_fingerprint(stored.fingerprint, fingerprint)
+            return stored.result, True
+
+        in_flight = self._in_flight.get((tenant_id, key))
+        if in_flight is not None:
+            self._check_fingerprint(in_flight, fingerprint)
+
+        executed = False
+
+        async def run() -> Any:
+            nonlocal executed
+            # Quem assume após um cancelamento pode encontrar o resultado de
+            # outra requisição que assumiu antes
+            stored = shard.get(key)
+            if stored is not None:
+                self._check_fingerprint(stored.fingerprint, fingerprint)
+                return stored.result
+
+            executed = True
+            self._in_flight[(tenant_id, key)] = fingerprint
+            try:
+                result = await operation()
+            finally:
+                del self._in_flight[(tenant_id, key)]
+
+            shard[key] = _StoredResult(
+                fingerprint=fingerprint,
+                result=result,
+                expires_at=self.clock() + self.ttl_seconds,
+            )
+            while len(shard) > self.max_entries_per_tenant:
+                shard.popitem(last=False)
+            return result
+
+        result = await self._single_flight.do((tenant_id, "idempotency", key), run)
+        return result, not executed
+
+    def clear(self) -> None:
+        """Descarta todos os resultados armazenados."""
+        self._shards.clear()
+
+    def _evict_expired(self, shard: "OrderedDict[str, _StoredResult]") -> None:
+        now = self.clock()
+        while shard:
+            oldest = next(iter(shard.values()))
+            if oldest.expires_at > now:
+                break
+            shard.popitem(last=False)
+
+    @staticmethod
+    def _check_fingerprint(expected: str, received: str) -> None:
+        if expected != received:
+            raise IdempotencyKeyReusedError(
+                "Chave de idempotência já utilizada com uma requisição diferente"
+            )
+
+
+# Armazém compartilhado entre requisições do processo
+IDEMPOTENCY_STORE = IdempotencyStore()
@@ -1,21 +1,77 @@
 import logging
+import uuid
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Callable, Dict, Optional, List, Type
 
-from app.models.schemas import InventoryItem, RestockResponse, RestockStatus
-from app.repositories.inventory_repository import InventoryRepository
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+
+from app.models.schemas import (
+    InventoryChanges,
+    InventoryItem,
+    LowStockAlert,
+    PredictedStockout,
+    RestockPolicy,
+    RestockRecommendation,
+    RestockResponse,
+    RestockStatus,
+    StockMovement,
+    WebhookEvent,
+    WebhookEventType,
+)
+from app.repositories.inventory_repository import (
+    InventoryRepository,
+    get_locations,
+    get_primary_location,
+)
+from app.repositories.movement_log import MAX_RECORD_VALUE, StockMovementLog
+from app.services.erp import SUCCESS_MESSAGE, ErpClient
+from app.services.forecasting import (
+    ConsumptionForecaster,
+    estimate_days_until_stockout,
+)
+from app.services.low_stock_rules import (
+    DEFAULT_LOW_STOCK_RULE,
+    DEFAULT_LOW_STOCK_RULE_SET,
+    LowStockRuleStore,
+)
+from app.services.restock_recommendations import (
+    RecommendationCache,
+    compute_recommendations,
+)
+from app.services.single_flight import SingleFlight
+from app.services.webhooks import WebhookDispatcher
 
 logger = logging.getLogger(__name__)
 
+_INVENTORY_ITEMS_ADAPTER = TypeAdapter(List[InventoryItem])
+_LOW_STOCK_ALERTS_ADAPTER = TypeAdapter(List[LowStockAlert])
+
 
 class InventoryService:
     def __init__(
         self,
         tenant_id: str,
         repository: InventoryRepository,
+        recommendation_cache: Optional[RecommendationCache] = None,
+        movement_log: Optional[StockMovementLog] = None,
+        forecaster: Optional[ConsumptionForecaster] = None,
+        single_flight: Optional[SingleFlight] = None,
+        webhook_dispatcher: Optional[WebhookDispatcher] = None,
+        low_stock_rules: Optional[LowStockRuleStore] = None,
+        erp_client: Optional[ErpClient] = None,
     ):
         self.tenant_id: str = tenant_id
         self.repository: InventoryRepository = repository
+        self.recommendation_cache: Optional[RecommendationCache] = (
+            recommendation_cache
+        )
+        self.movement_log: Optional[StockMovementLog] = movement_log
+        self.forecaster: Optional[ConsumptionForecaster] = forecaster
+        self.single_flight: Optional[SingleFlight] = single_flight
+        self.webhook_dispatcher: Optional[WebhookDispatcher] = webhook_dispatcher
+        self.low_stock_rules: Optional[LowStockRuleStore] = low_stock_rules
+        self.erp_client: Optional[ErpClient] = erp_client
 
     def get_inventory(self, product_name: str) -> Optional[InventoryItem]:
         """
@@ -48,27 +104,19 @@ class InventoryService:
             )
             return None
 
-        quantity = product_data.get("quantity")
-        min_stock = product_data.get("min_stock")
-        needs_restock = quantity < min_stock
+        item = self._build_item(product_name, product_data)
 
         logger.info(
             f"[INVENTORY] Estoque encontrado - Tenant: {self.tenant_id}, "
-            f"Produto: {product_name}, Qtd: {quantity}, Min: {min_stock}, "
-            f"Precisa reabastecimento: {needs_restock}",
+            f"Produto: {product_name}, Qtd: {item.quantity}, Min: {item.min_stock}, "
+            f"Precisa reabastecimento: {item.needs_restock}",
             extra={
                 "tenant_id": self.tenant_id,
                 "product_name": product_name,
             },
         )
 
-        return InventoryItem(
-            tenant_id=self.tenant_id,
-            product_name=product_name,
-            quantity=quantity,
-            min_stock=min_stock,
-            needs_restock=needs_restock,
-        )
+        return item
 
     def get_all_inventory(self) -> List[InventoryItem]:
         """
@@ -81,7 +129,12 @@ class InventoryService:
             f"[INVENTORY SERVICE] Listando todo estoque - Tenant: {self.tenant_id}",
             extra={"tenant_id": self.tenant_id},
         )
-        tenant_inventory = self.repository.get_all_inventory(self.tenant_id)
+        return self._build_items(self.repository.get_all_inventory(self.tenant_id))
+
+    def _build_items(
+        self, tenant_inventory: Optional[Dict[str, Any]]
+    ) -> List[InventoryItem]:
+        """Converte o inventário do tenant em uma lista de InventoryItem."""
         if not tenant_inventory:
             logger.warning(
                 f"[INVENTORY SERVICE] Tenant não encontrado: {self.tenant_id}",
@@ -89,20 +142,10 @@ class InventoryService:
             )
             return []
 
-        items = []
-        for product_name, product_data in tenant_inventory.items():
-            quantity = product_data.get("quantity")
-            min_stock = product_data.get("min_stock")
-
-            items.append(
-                InventoryItem(
-                    tenant_id=self.tenant_id,
-                    product_name=product_name,
-                    quantity=quantity,
-                    min_stock=min_stock,
-                    needs_restock=quantity < min_stock,
-                )
-            )
+        items = [
+            self._build_item(product_name, product_data)
+            for product_name, product_data in tenant_inventory.items()
+        ]
 
         logger.info(
             f"[INVENTORY] Retornando {len(items)} produtos para tenant {self.tenant_id}",
@@ -110,60 +153,540 @@ class InventoryService:
         )
         return items
 
-    def get_low_stock_items(self) -> List[InventoryItem]:
+    def get_low_stock_items(self) -> List[LowStockAlert]:
         """
-        Retorna apenas os itens com estoque abaixo do mínimo.
+        Retorna os itens que casam com as regras de estoque baixo do tenant,
+        com a severidade e a regra de cada alerta.
+
+        As regras já compiladas são avaliadas em uma única passada sobre o
+        inventário, e a regra que casou com cada produto fica em cache até que
+        as regras ou o inventário do tenant mudem. Sem regras configuradas, vale
+        ``DEFAULT_LOW_STOCK_RULE`` (quantidade abaixo do mínimo).
 
         Returns:
-            Lista de InventoryItem com produtos que precisam de reabastecimento
+            Lista de LowStockAlert na ordem do inventário
         """
         logger.info(
             f"[INVENTORY SERVICE] Listando itens com estoque baixo - Tenant: {self.tenant_id}",
             extra={"tenant_id": self.tenant_id},
         )
-        all_items = self.repository.get_low_stock_items(tenant_id=self.tenant_id)
+        if self.low_stock_rules is None:
+            all_items = self.repository.get_low_stock_items(tenant_id=self.tenant_id)
+            return [
+                self._build_item(
+                    product_name,
+                    data,
+                    needs_restock=True,
+                    item_type=LowStockAlert,
+                    severity=DEFAULT_LOW_STOCK_RULE.severity,
+                    rule_id=DEFAULT_LOW_STOCK_RULE.id,
+                )
+                for product_name, data in all_items.items()
+            ]
+
+        return self._evaluate_low_stock_rules(
+            self.repository.get_all_inventory(self.tenant_id) or {},
+            self.repository.get_version(self.tenant_id),
+        )
+
+    def _evaluate_low_stock_rules(
+        self, inventory: Dict[str, Dict[str, Any]], version: int
+    ) -> List[LowStockAlert]:
+        """
+        Avalia as regras de estoque baixo sobre o inventário do tenant.
+
+        O cache guarda apenas a regra que casou com cada produto. Os alertas
+        são montados a cada leitura, porque a previsão de ruptura muda com o
+        tempo mesmo sem alteração de estoque ou de regras.
+
+        Args:
+            inventory: Produtos do tenant no formato do repositório
+            version: Versão de ``inventory``
+
+        Returns:
+            Lista de LowStockAlert na ordem do inventário
+        """
+        matches = None
+        if self.low_stock_rules is None:
+            rule_set = DEFAULT_LOW_STOCK_RULE_SET
+        else:
+            rules_version, rule_set = self.low_stock_rules.get_compiled(
+                self.tenant_id
+            )
+            cache_key = (rules_version, version)
+            matches = self.low_stock_rules.get_cached_matches(
+                self.tenant_id, cache_key
+            )
+
+        if matches is None:
+            matches = [
+                (product_name, rule)
+                for product_name, _, rule in rule_set.evaluate(inventory)
+            ]
+            if self.low_stock_rules is not None:
+                self.low_stock_rules.put_cached_matches(
+                    self.tenant_id, cache_key, matches
+                )
+
         return [
-            InventoryItem(
+            self._build_item(
+                product_name,
+                inventory[product_name],
+                item_type=LowStockAlert,
+                severity=rule.severity,
+                rule_id=rule.id,
+            )
+            for product_name, rule in matches
+        ]
+
+    def get_inventory_version(self) -> int:
+        """Retorna a versão atual do inventário do tenant."""
+        return self.repository.get_version(self.tenant_id)
+
+    def get_changes(self, since: int) -> InventoryChanges:
+        """
+        Retorna os produtos adicionados, alterados e removidos desde uma
+        versão do inventário, para sincronização incremental.
+
+        Args:
+            since: Versão já sincronizada pelo cliente
+
+        Returns:
+            InventoryChanges com os produtos alterados ou com
+            ``resync_required`` quando o histórico não está mais disponível
+        """
+        logger.info(
+            f"[INVENTORY SERVICE] Listando alterações desde a versão {since} - "
+            f"Tenant: {self.tenant_id}",
+            extra={"tenant_id": self.tenant_id},
+        )
+        change_set = self.repository.get_changes(tenant_id=self.tenant_id, since=since)
+        changes = InventoryChanges(
+            tenant_id=self.tenant_id,
+            since=since,
+            version=change_set.version,
+            resync_required=change_set.resync_required,
+            removed=change_set.removed,
+        )
+
+        for product_names, items in (
+            (change_set.added, changes.added),
+            (change_set.changed, changes.changed),
+        ):
+            for product_name in product_names:
+                product_data = self.repository.get_inventory(
+                    tenant_id=self.tenant_id, product_name=product_name
+                )
+                if product_data:
+                    items.append(self._build_item(product_name, product_data))
+        return changes
+
+    async def get_all_inventory_json(self) -> bytes:
+        """
+        Retorna todo o inventário já serializado em JSON.
+
+        Leituras idênticas e concorrentes do mesmo tenant compartilham uma
+        única execução e os mesmos bytes de resposta.
+
+        Returns:
+            Lista de InventoryItem serializada em JSON
+        """
+        return await self._coalesce(
+            "get_all_inventory",
+            lambda inventory, version: _INVENTORY_ITEMS_ADAPTER.dump_json(
+                self._build_items(inventory)
+            ),
+        )
+
+    async def get_low_stock_items_json(self) -> bytes:
+        """
+        Retorna os itens com estoque baixo já serializados em JSON.
+
+        Leituras idênticas e concorrentes do mesmo tenant e da mesma versão
+        das regras compartilham uma única execução e os mesmos bytes de
+        resposta.
+
+        Returns:
+            Lista de LowStockAlert serializada em JSON
+        """
+        rules_version = (
+            self.low_stock_rules.get_version(self.tenant_id)
+            if self.low_stock_rules is not None
+            else 0
+        )
+        return await self._coalesce(
+            "get_low_stock_items",
+            lambda inventory, version: _LOW_STOCK_ALERTS_ADAPTER.dump_json(
+                self._evaluate_low_stock_rules(inventory, version)
+            ),
+            rules_version,
+        )
+
+    async def _coalesce(
+        self,
+        operation: str,
+        compute: Callable[[Dict[str, Any], int], bytes],
+        *args: Any,
+    ) -> bytes:
+        """
+        Executa uma leitura em thread separada, coalescendo chamadas idênticas.
+
+        O inventário do tenant é copiado no event loop, que é quem o altera, e
+        ``compute`` recebe a cópia e a versão correspondente; a thread nunca
+        percorre os dicionários do repositório. A versão do inventário faz
+        parte da chave, então leituras iniciadas após uma alteração de estoque
+        nunca recebem um resultado anterior a ela.
+        """
+
+        async def run() -> bytes:
+            version = self.repository.get_version(self.tenant_id)
+            inventory = self.repository.snapshot_inventory(self.tenant_id)
+            return await run_in_threadpool(compute, inventory, version)
+
+        if self.single_flight is None:
+            return await run()
+
+        key = (
+            self.tenant_id,
+            operation,
+            args,
+            self.repository.get_version(self.tenant_id),
+        )
+        return await self.single_flight.do(key, run)
+
+    def get_predicted_stockouts(
+        self, horizon_days: Optional[float] = None
+    ) -> List[PredictedStockout]:
+        """
+        Retorna os produtos com ruptura prevista, ordenados por urgência.
+
+        Apenas produtos com taxa de consumo estimada entram na lista; a
+        estimativa é mantida incrementalmente a cada saída de estoque.
+
+        Args:
+            horizon_days: Se informado, limita aos produtos que se esgotam
+                dentro desse número de dias
+
+        Returns:
+            Lista de PredictedStockout do mais urgente para o menos urgente
+        """
+        logger.info(
+            f"[INVENTORY SERVICE] Listando previsões de ruptura - Tenant: {self.tenant_id}",
+            extra={"tenant_id": self.tenant_id},
+        )
+        if self.forecaster is None:
+            return []
+
+        predictions = []
+        for product_name, rate in self.forecaster.get_tenant_rates(
+            self.tenant_id
+        ).items():
+            product_data = self.repository.get_inventory(
+                tenant_id=self.tenant_id, product_name=product_name
+            )
+            if not product_data:
+                continue
+
+            quantity = product_data["quantity"]
+            days = estimate_days_until_stockout(quantity, rate)
+            if horizon_days is not None and days > horizon_days:
+                continue
+
+            predictions.append(
+                PredictedStockout(
+                    tenant_id=self.tenant_id,
+                    product_name=product_name,
+                    category=product_data.get("category"),
+                    quantity=quantity,
+                    min_stock=product_data["min_stock"],
+                    needs_restock=quantity < product_data["min_stock"],
+                    locations=get_locations(product_data),
+                    daily_consumption=round(rate, 4),
+                    days_until_stockout=days,
+                )
+            )
+
+        predictions.sort(key=lambda prediction: prediction.days_until_stockout)
+        return predictions
+
+    def record_movement(
+        self, product_name: str, delta: int, location: Optional[str] = None
+    ) -> Optional[InventoryItem]:
+        """
+        Aplica uma movimentação de estoque a um produto em um local e a
+        registra no histórico de movimentações. Se o produto cruzar o nível
+        mínimo, um evento é enviado aos webhooks do tenant.
+
+        Args:
+            product_name: Nome do produto movimentado
+            delta: Variação da quantidade (negativa para saídas)
+            location: Local da movimentação; padrão é o local principal do produto
+
+        Returns:
+            InventoryItem com o estoque atualizado ou None se não encontrado
+
+        Raises:
+            ValueError: Se a movimentação deixar o estoque do local negativo ou
+                o estoque total acima do que o histórico consegue registrar
+        """
+        product_data = self.repository.get_inventory(
+            tenant_id=self.tenant_id, product_name=product_name
+        )
+        if not product_data:
+            logger.warning(
+                f"[INVENTORY SERVICE] Produto não encontrado - Tenant: {self.tenant_id}, Produto: {product_name}",
+                extra={"tenant_id": self.tenant_id, "product_name": product_name},
+            )
+            return None
+
+        if location is None:
+            location = get_primary_location(product_data)
+        location_quantity = get_locations(product_data).get(location, 0) + delta
+        if location_quantity < 0:
+            raise ValueError(
+                f"Movimentação de {delta} deixaria o estoque de '{product_name}' "
+                f"em '{location}' negativo"
+            )
+        if product_data["quantity"] + delta > MAX_RECORD_VALUE:
+            raise ValueError(
+                f"Movimentação de {delta} deixaria o estoque de '{product_name}' "
+                f"acima do máximo de {MAX_RECORD_VALUE}"
+            )
+
+        needed_restock = product_data["quantity"] < product_data["min_stock"]
+        product_data = self.repository.update_quantity(
+            tenant_id=self.tenant_id,
+            product_name=product_name,
+            quantity=location_quantity,
+            location=location,
+        )
+        quantity = product_data["quantity"]
+        if self.movement_log is not None:
+            self.movement_log.append(
                 tenant_id=self.tenant_id,
                 product_name=product_name,
-                quantity=data.get("quantity"),
-                min_stock=data.get("min_stock"),
-                needs_restock=True,
+                delta=delta,
+                quantity=quantity,
+            )
+        if self.forecaster is not None:
+            self.forecaster.observe(
+                tenant_id=self.tenant_id, product_name=product_name, delta=delta
+            )
+        needs_restock = quantity < product_data["min_stock"]
+        if self.webhook_dispatcher is not None and needs_restock != needed_restock:
+            self.webhook_dispatcher.publish(
+                WebhookEvent(
+                    id=uuid.uuid4().hex,
+                    type=(
+                        WebhookEventType.LOW_STOCK
+                        if needs_restock
+                        else WebhookEventType.RESTOCKED
+                    ),
+                    tenant_id=self.tenant_id,
+                    product_name=product_name,
+                    quantity=quantity,
+                    min_stock=product_data["min_stock"],
+                    needs_restock=needs_restock,
+                    occurred_at=datetime.now(),
+                )
             )
-            for product_name, data in all_items.items()
+
+        logger.info(
+            f"[INVENTORY SERVICE] Movimentação registrada - Tenant: {self.tenant_id}, "
+            f"Produto: {product_name}, Local: {location}, Variação: {delta}, "
+            f"Qtd: {quantity}",
+            extra={"tenant_id": self.tenant_id, "product_name": product_name},
+        )
+
+        return self._build_item(product_name, product_data)
+
+    async def get_movement_history(
+        self,
+        product_name: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Optional[List[StockMovement]]:
+        """
+        Consulta o histórico de movimentações de um produto.
+
+        A leitura dos segmentos (abertura dos arquivos e busca no mmap) roda
+        em thread separada, fora do event loop.
+
+        Args:
+            product_name: Nome do produto
+            start: Início do intervalo (inclusivo)
+            end: Fim do intervalo (inclusivo)
+
+        Returns:
+            Lista de StockMovement em ordem temporal ou None se o produto não existir
+        """
+        if not self.repository.get_inventory(
+            tenant_id=self.tenant_id, product_name=product_name
+        ):
+            return None
+        if self.movement_log is None:
+            return []
+
+        records = await run_in_threadpool(
+            self.movement_log.query,
+            tenant_id=self.tenant_id,
+            product_name=product_name,
+            start_ns=_to_timestamp_ns(start),
+            end_ns=_to_timestamp_ns(end, inclusive=True),
+        )
+        return [
+            StockMovement(
+                tenant_id=self.tenant_id,
+                product_name=product_name,
+                timestamp=_from_timestamp_ns(timestamp_ns),
+                delta=delta,
+                quantity=quantity,
+            )
+            for timestamp_ns, delta, quantity in records
         ]
 
-    def request_restock(self, product_name: str, quantity: int) -> RestockResponse:
+    def get_restock_recommendations(
+        self, policy: RestockPolicy
+    ) -> List[RestockRecommendation]:
         """
-        Dispara de uma ação de reabastecimento, logando a ação
-        e retornando um status de sucesso.
+        Calcula a quantidade sugerida de reabastecimento para todos os
+        produtos com estoque baixo do tenant.
+
+        O resultado é mantido em cache até que o inventário do tenant mude.
 
         Args:
-            product_name: Nome do produto a reabastecer
-            quantity: Quantidade a ser solicitada
+            policy: Política de estoque-alvo a aplicar
 
         Returns:
-            RestockResponse com o status da solicitação
+            Lista de RestockRecommendation com as quantidades sugeridas
         """
-        # Log da ação de reabastecimento (simulando integração com ERP)
         logger.info(
-            f"[INVENTORY SERVICE] {self.tenant_id} solicitou reabastecimento de "
-            f"{quantity} unidades de {product_name}.",
-            extra={"tenant_id": self.tenant_id, "product_name": product_name},
+            f"[INVENTORY SERVICE] Calculando recomendações de reabastecimento - Tenant: {self.tenant_id}",
+            extra={"tenant_id": self.tenant_id},
+        )
+        cache_key = (
+            self.tenant_id,
+            self.repository.get_version(self.tenant_id),
+            policy,
         )
 
-        # Simula envio para sistema externo
+        if self.recommendation_cache is not None:
+            cached = self.recommendation_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        low_stock_items = self.repository.get_low_stock_items(tenant_id=self.tenant_id)
+        recommendations = compute_recommendations(
+            tenant_id=self.tenant_id,
+            low_stock_items=low_stock_items or {},
+            policy=policy,
+        )
+
+        if self.recommendation_cache is not None:
+            self.recommendation_cache.put(cache_key, recommendations)
+        return recommendations
+
+    def _build_item(
+        self,
+        product_name: str,
+        product_data: Dict[str, Any],
+        needs_restock: Optional[bool] = None,
+        item_type: Type[InventoryItem] = InventoryItem,
+        **fields: Any,
+    ) -> InventoryItem:
+        """
+        Monta o InventoryItem de um produto a partir dos dados do repositório.
+
+        Args:
+            product_name: Nome do produto
+            product_data: Dados do produto no formato do repositório
+            needs_restock: Valor já conhecido; se omitido, é calculado
+            item_type: Modelo de resposta, InventoryItem ou uma subclasse
+            **fields: Campos adicionais do modelo de resposta
+
+        Returns:
+            InventoryItem com a previsão de ruptura, quando disponível
+        """
+        quantity = product_data.get("quantity")
+        min_stock = product_data.get("min_stock")
+        days_until_stockout = None
+        if self.forecaster is not None:
+            days_until_stockout = self.forecaster.days_until_stockout(
+                self.tenant_id, product_name, quantity
+            )
+
+        return item_type(
+            tenant_id=self.tenant_id,
+            product_name=product_name,
+            category=product_data.get("category"),
+            quantity=quantity,
+            min_stock=min_stock,
+            needs_restock=(
+                needs_restock if needs_restock is not None else quantity < min_stock
+            ),
+            locations=get_locations(product_data),
+            days_until_stockout=days_until_stockout,
+            **fields,
+        )
+
+    async def request_restock(
+        self, product_name: str, quantity: int, idempotency_key: Optional[str] = None
+    ) -> RestockResponse:
+        """
+        Dispara uma ação de reabastecimento no sistema ERP.
+
+        Args:
+            product_name: Nome do produto a reabastecer
+            quantity: Quantidade a ser solicitada
+            idempotency_key: Chave de idempotência do cliente, repassada ao ERP
+
+        Returns:
+            RestockResponse com SUCCESS, PENDING (ERP indisponível, solicitação
+            enfileirada) ou FAILED
+        """
         logger.info(
             f"[INVENTORY SERVICE] {self.tenant_id} solicitou reabastecimento de "
             f"{quantity} unidades de {product_name}.",
             extra={"tenant_id": self.tenant_id, "product_name": product_name},
         )
 
+        if self.erp_client is not None:
+            result = await self.erp_client.request_restock(
+                tenant_id=self.tenant_id,
+                product_name=product_name,
+                quantity=quantity,
+                idempotency_key=idempotency_key,
+            )
+            status, message = result.status, result.message
+        else:
+            status, message = RestockStatus.SUCCESS, SUCCESS_MESSAGE
+
         return RestockResponse(
-            status=RestockStatus.SUCCESS,
-            message="Solicitação de reabastecimento enviada com sucesso para o sistema ERP",
+            status=status,
+            message=message,
             tenant_id=self.tenant_id,
             product_name=product_name,
             quantity_requested=quantity,
             timestamp=datetime.now(),
         )
+
+
+def _to_timestamp_ns(
+    value: Optional[datetime], inclusive: bool = False
+) -> Optional[int]:
+    """
+    Converte um datetime em timestamp Unix em nanossegundos.
+
+    Com ``inclusive=True`` retorna o último nanossegundo do microssegundo
+    informado, para que limites finais incluam os registros desse instante.
+    """
+    if value is None:
+        return None
+    timestamp_ns = int(value.timestamp()) * 1_000_000_000 + value.microsecond * 1_000
+    return timestamp_ns + 999 if inclusive else timestamp_ns
+
+
+def _from_timestamp_ns(timestamp_ns: int) -> datetime:
+    """Converte um timestamp Unix em nanossegundos em datetime local."""
+    seconds, remainder = divmod(timestamp_ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=remainder // 1_000)
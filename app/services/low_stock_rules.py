@@ -0,0 +1,221 @@
+import logging
+import threading
+from fractions import Fraction
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.models.schemas import AlertSeverity, LowStockRule
+
+logger = logging.getLogger(__name__)
+
+# Predicado compilado: (quantidade, estoque mínimo) -> casou
+Predicate = Callable[[int, int], bool]
+
+# Regra aplicada a tenants sem regras próprias: quantidade abaixo do mínimo
+DEFAULT_LOW_STOCK_RULE = LowStockRule(
+    id="below-min-stock", severity=AlertSeverity.WARNING, min_stock_ratio=1.0
+)
+
+_SEVERITY_RANK = {
+    AlertSeverity.CRITICAL: 0,
+    AlertSeverity.WARNING: 1,
+    AlertSeverity.INFO: 2,
+}
+
+
+def compile_rule(rule: LowStockRule) -> Predicate:
+    """
+    Compila as condições de uma regra em um predicado sobre quantidade e
+    estoque mínimo.
+
+    A fração do mínimo é convertida em razão de inteiros a partir do valor
+    decimal informado, então ``1.2`` compara exatamente com 120% do mínimo,
+    sem erro de arredondamento de ponto flutuante.
+
+    Args:
+        rule: Regra de estoque baixo
+
+    Returns:
+        Função que indica se um produto casa com a regra
+    """
+    max_quantity = rule.max_quantity
+    if rule.min_stock_ratio is None:
+        return lambda quantity, min_stock: quantity <= max_quantity
+
+    ratio = Fraction(str(rule.min_stock_ratio))
+    numerator, denominator = ratio.numerator, ratio.denominator
+    if max_quantity is None:
+        return lambda quantity, min_stock: (
+            quantity * denominator < min_stock * numerator
+        )
+    return lambda quantity, min_stock: (
+        quantity <= max_quantity and quantity * denominator < min_stock * numerator
+    )
+
+
+class CompiledRuleSet:
+    """
+    Regras de um tenant compiladas em predicados, da maior para a menor
+    severidade (empates mantêm a ordem de cadastro).
+
+    As listas de regras aplicáveis são montadas na compilação: uma para cada
+    categoria citada nas regras e uma, só com as regras gerais, para as demais
+    categorias. O conjunto é imutável depois de criado, então pode ser lido
+    por várias threads sem lock. A avaliação percorre o inventário em uma
+    passada e para na primeira regra que casar com cada produto.
+    """
+
+    def __init__(self, rules: List[LowStockRule]):
+        self.rules = list(rules)
+        ordered = sorted(self.rules, key=lambda rule: _SEVERITY_RANK[rule.severity])
+        compiled = [(rule, compile_rule(rule)) for rule in ordered]
+        self._general = tuple(
+            (rule, predicate) for rule, predicate in compiled if rule.category is None
+        )
+        self._by_category: Dict[str, Tuple[Tuple[LowStockRule, Predicate], ...]] = {
+            category: tuple(
+                (rule, predicate)
+                for rule, predicate in compiled
+                if rule.category is None or rule.category == category
+            )
+            for category in {rule.category for rule in self.rules}
+            if category is not None
+        }
+
+    def rules_for(
+        self, category: Optional[str]
+    ) -> Tuple[Tuple[LowStockRule, Predicate], ...]:
+        """Retorna as regras aplicáveis a uma categoria, em ordem de prioridade."""
+        return self._by_category.get(category, self._general)
+
+    def evaluate(
+        self, inventory: Dict[str, Dict[str, Any]]
+    ) -> List[Tuple[str, Dict[str, Any], LowStockRule]]:
+        """
+        Avalia as regras sobre todo o inventário de um tenant.
+
+        Args:
+            inventory: Produtos do tenant no formato do repositório
+
+        Returns:
+            Lista de (nome do produto, dados, regra que casou), na ordem do
+            inventário
+        """
+        rules_for = self.rules_for
+        matches = []
+        for product_name, data in inventory.items():
+            quantity = data["quantity"]
+            min_stock = data["min_stock"]
+            for rule, predicate in rules_for(data.get("category")):
+                if predicate(quantity, min_stock):
+                    matches.append((product_name, data, rule))
+                    break
+        return matches
+
+
+# Regra padrão já compilada, compartilhada por todos os tenants sem regras
+DEFAULT_LOW_STOCK_RULE_SET = CompiledRuleSet([DEFAULT_LOW_STOCK_RULE])
+
+
+# Resultado de uma avaliação: (nome do produto, regra que casou)
+RuleMatch = Tuple[str, LowStockRule]
+
+
+class LowStockRuleStore:
+    """
+    Regras de estoque baixo de cada tenant, já compiladas, e o último
+    resultado da avaliação.
+
+    O resultado (a regra que casou com cada produto) é guardado com a chave
+    ``(versão das regras, versão do inventário)``; qualquer alteração de
+    estoque ou de regras faz a próxima leitura reavaliar o inventário.
+    """
+
+    def __init__(self):
+        self._rule_sets: Dict[str, CompiledRuleSet] = {}
+        self._versions: Dict[str, int] = {}
+        self._results: Dict[str, Tuple[Hashable, List[RuleMatch]]] = {}
+        self._lock = threading.Lock()
+
+    def get_version(self, tenant_id: str) -> int:
+        with self._lock:
+            return self._versions.get(tenant_id, 0)
+
+    def get_rules(self, tenant_id: str) -> Tuple[int, List[LowStockRule]]:
+        """
+        Retorna a versão e as regras em vigor para o tenant.
+
+        Tenants sem regras próprias usam ``DEFAULT_LOW_STOCK_RULE``.
+        """
+        version, rule_set = self.get_compiled(tenant_id)
+        return version, list(rule_set.rules)
+
+    def get_compiled(self, tenant_id: str) -> Tuple[int, CompiledRuleSet]:
+        """Retorna a versão e as regras compiladas do tenant."""
+        with self._lock:
+            return (
+                self._versions.get(tenant_id, 0),
+                self._rule_sets.get(tenant_id, DEFAULT_LOW_STOCK_RULE_SET),
+            )
+
+    def set_rules(self, tenant_id: str, rules: List[LowStockRule]) -> int:
+        """
+        Substitui as regras do tenant, compilando-as antes de publicá-las.
+
+        Args:
+            tenant_id: Identificador do tenant
+            rules: Novas regras
+
+        Returns:
+            Nova versão das regras do tenant
+        """
+        rule_set = CompiledRuleSet(rules)
+        with self._lock:
+            version = self._versions.get(tenant_id, 0) + 1
+            self._rule_sets[tenant_id] = rule_set
+            self._versions[tenant_id] = version
+            self._results.pop(tenant_id, None)
+        logger.info(
+            f"[LOW STOCK RULES] Regras atualizadas - Tenant: {tenant_id}, "
+            f"Versão: {version}, Regras: {len(rule_set.rules)}",
+            extra={"tenant_id": tenant_id},
+        )
+        return version
+
+    def get_custom_rules(self, tenant_id: str) -> Optional[List[LowStockRule]]:
+        """Retorna as regras cadastradas pelo tenant ou None se usa a padrão."""
+        with self._lock:
+            rule_set = self._rule_sets.get(tenant_id)
+        return list(rule_set.rules) if rule_set is not None else None
+
+    def get_cached_matches(
+        self, tenant_id: str, key: Hashable
+    ) -> Optional[List[RuleMatch]]:
+        with self._lock:
+            entry = self._results.get(tenant_id)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        return None
+
+    def put_cached_matches(
+        self, tenant_id: str, key: Hashable, matches: List[RuleMatch]
+    ) -> None:
+        with self._lock:
+            self._results[tenant_id] = (key, matches)
+
+    def discard(self, tenant_id: str) -> None:
+        """Remove as regras e o resultado de um tenant migrado para outro shard."""
+        with self._lock:
+            self._rule_sets.pop(tenant_id, None)
+            self._versions.pop(tenant_id, None)
+            self._results.pop(tenant_id, None)
+
+    def clear(self) -> None:
+        """Remove as regras e os resultados de todos os tenants."""
+        with self._lock:
+            self._rule_sets.clear()
+            self._versions.clear()
+            self._results.clear()
+
+
+# Regras compartilhadas entre requisições do processo
+LOW_STOCK_RULES = LowStockRuleStore()
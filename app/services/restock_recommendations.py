@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from fractions import Fraction
+from typing import Any, Dict, Hashable, List, Optional
+
+from app.models.schemas import RestockPolicy, RestockRecommendation
+
+
+class RecommendationCache:
+    """
+    Cache LRU das recomendações calculadas por tenant.
+
+    A chave inclui a versão do inventário do tenant, então qualquer alteração
+    de estoque invalida naturalmente as entradas antigas.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, List[RestockRecommendation]]" = (
+            OrderedDict()
+        )
+
+    def get(self, key: Hashable) -> Optional[List[RestockRecommendation]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, value: List[RestockRecommendation]) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def compute_recommendations(
+    tenant_id: str,
+    low_stock_items: Dict[str, Dict[str, Any]],
+    policy: RestockPolicy,
+) -> List[RestockRecommendation]:
+    """
+    Calcula, em uma única passada, a quantidade sugerida para cada produto
+    com estoque baixo do tenant.
+
+    O estoque-alvo é ``ceil(min_stock * target_multiplier) + safety_stock`` e a
+    sugestão é a diferença para a quantidade atual, arredondada para cima até
+    um múltiplo de ``pack_size``. O multiplicador é convertido em fração exata
+    a partir do valor decimal informado, então ``50 * 1.1`` resulta em 55 e
+    não em 56 por erro de ponto flutuante.
+
+    Args:
+        tenant_id: Identificador do tenant
+        low_stock_items: Produtos com estoque baixo, no formato do repositório
+        policy: Política de estoque-alvo a aplicar
+
+    Returns:
+        Lista de RestockRecommendation, uma por produto
+    """
+    ratio = Fraction(str(policy.target_multiplier))
+    numerator, denominator = ratio.numerator, ratio.denominator
+    safety_stock = policy.safety_stock
+    pack_size = policy.pack_size
+
+    recommendations = []
+    for product_name, data in low_stock_items.items():
+        quantity = data["quantity"]
+        min_stock = data["min_stock"]
+        target_stock = -(-min_stock * numerator // denominator) + safety_stock
+        shortfall = max(target_stock - quantity, 0)
+        suggested = -(-shortfall // pack_size) * pack_size
+
+        recommendations.append(
+            RestockRecommendation(
+                tenant_id=tenant_id,
+                product_name=product_name,
+                quantity=quantity,
+                min_stock=min_stock,
+                target_stock=target_stock,
+                suggested_quantity=suggested,
+            )
+        )
+    return recommendations
+
+
+# Cache compartilhado entre requisições do processo
+RECOMMENDATION_CACHE = RecommendationCache()
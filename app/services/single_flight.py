@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SingleFlightStats:
+    """Contadores de uma operação coalescida."""
+
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+
+
+class SingleFlight:
+    """
+    Coalescência de chamadas idênticas e concorrentes (single-flight).
+
+    Enquanto uma execução para uma chave está em andamento, novas chamadas com
+    a mesma chave aguardam o mesmo resultado em vez de executar a operação
+    novamente. A chave tem o formato ``(tenant, operação, argumentos, ...)``;
+    o segundo elemento identifica a operação nas métricas.
+
+    Erros da execução são repassados a todos que aguardam. Se a chamada que
+    executa a operação for cancelada, as demais não são: a primeira a retomar
+    executa a operação de novo e as outras passam a aguardá-la.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._stats: Dict[str, SingleFlightStats] = {}
+
+    async def do(
+        self, key: Tuple[Hashable, ...], operation: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Executa a operação ou aguarda a execução em andamento para a chave.
+
+        Args:
+            key: Chave que identifica chamadas idênticas
+            operation: Fábrica da corrotina que calcula o resultado
+
+        Returns:
+            Resultado compartilhado entre todas as chamadas coalescidas
+        """
+        stats = self._stats.setdefault(str(key[1]), SingleFlightStats())
+        stats.calls += 1
+
+        while (in_flight := self._in_flight.get(key)) is not None:
+            # ``wait`` só levanta CancelledError se esta chamada for cancelada
+            await asyncio.wait([in_flight])
+            if not in_flight.cancelled():
+                stats.coalesced += 1
+                logger.debug(f"[SINGLE FLIGHT] Chamada coalescida - Chave: {key}")
+                return in_flight.result()
+            logger.debug(
+                f"[SINGLE FLIGHT] Execução cancelada, repetindo - Chave: {key}"
+            )
+
+        stats.executions += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await operation()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Marca a exceção como consumida quando não há outros aguardando
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        future.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Retorna os contadores de chamadas, execuções e coalescências por operação."""
+        return {operation: asdict(stats) for operation, stats in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        """Zera os contadores de todas as operações."""
+        self._stats.clear()
+
+
+# Grupo compartilhado entre requisições do processo
+SINGLE_FLIGHT = SingleFlight()
@@ -0,0 +1,447 @@
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import random
+import socket
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Set
+
+import httpx
+
+from app.models.schemas import WebhookDeadLetter, WebhookEvent, WebhookSubscription
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_HEADER = "X-StockWise-Delivery"
+RETRYABLE_STATUS_CODES = {408, 425, 429}
+
+
+class WebhookDestinationError(ValueError):
+    """URL de webhook que aponta para um endereço não permitido."""
+
+
+class WebhookDispatcher:
+    """
+    Entrega de eventos de estoque baixo aos webhooks de cada tenant.
+
+    ``publish`` coloca o evento em uma fila limitada e retorna imediatamente;
+    uma tarefa assíncrona agrupa os eventos que chegam dentro de
+    ``batch_window`` segundos e envia, por inscrição, um único POST com o
+    lote. Falhas de rede, respostas 5xx, 408, 425 e 429 são repetidas com
+    backoff exponencial e jitter; lotes que esgotam as tentativas (ou são
+    recusados com outro 4xx) vão para a lista de dead letters do tenant.
+
+    Para evitar SSRF, o host de cada webhook é resolvido no cadastro e antes
+    de cada tentativa de entrega; endereços que não são públicos (loopback,
+    redes privadas, link-local, o que inclui os metadados de nuvem em
+    169.254.169.254, multicast e reservados) são recusados, exceto hosts em
+    ``allowed_hosts``. A entrega se conecta ao endereço validado, com o
+    ``Host`` e o SNI do host original, então um DNS que muda de resposta entre
+    a verificação e a conexão (DNS rebinding) não desvia a requisição.
+    Redirecionamentos não são seguidos.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10_000,
+        max_batch_size: int = 100,
+        batch_window: float = 0.05,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        timeout: float = 5.0,
+        max_concurrency: int = 20,
+        dead_letter_size: int = 1000,
+        allowed_hosts: Iterable[str] = (),
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.dead_letter_size = dead_letter_size
+        self.allowed_hosts = frozenset(host.lower() for host in allowed_hosts)
+        self.dropped = 0
+        self._client = client
+        self._owns_client = client is None
+        self._subscriptions: Dict[str, Dict[str, WebhookSubscription]] = {}
+        self._dead_letters: Dict[str, Deque[WebhookDeadLetter]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional["asyncio.Queue[WebhookEvent]"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._deliveries: Set["asyncio.Task[None]"] = set()
+
+    @classmethod
+    def from_env(cls) -> "WebhookDispatcher":
+        """
+        Cria o dispatcher a partir de ``STOCKWISE_WEBHOOK_ALLOWED_HOSTS``
+        (hosts separados por vírgula liberados da verificação de endereço).
+        """
+        allowed_hosts = os.getenv("STOCKWISE_WEBHOOK_ALLOWED_HOSTS", "")
+        return cls(
+            allowed_hosts=[
+                host.strip() for host in allowed_hosts.split(",") if host.strip()
+            ]
+        )
+
+    async def subscribe(self, tenant_id: str, url: str) -> WebhookSubscription:
+        """
+        Cadastra um webhook para o tenant. Cadastrar a mesma URL novamente
+        retorna a inscrição existente.
+
+        Args:
+            tenant_id: Identificador do tenant
+            url: URL que receberá os eventos
+
+        Returns:
+            Inscrição do webhook
+
+        Raises:
+            WebhookDestinationError: Se a URL apontar para um endereço não
+                permitido
+        """
+        await self.check_destination(url)
+        subscriptions = self._subscriptions.setdefault(tenant_id, {})
+        for subscription in subscriptions.values():
+            if subscription.url == url:
+                return subscription
+
+        subscription = WebhookSubscription(
+            id=uuid.uuid4().hex,
+            tenant_id=tenant_id,
+            url=url,
+            created_at=datetime.now(),
+        )
+        subscriptions[subscription.id] = subscription
+        logger.info(
+            f"[WEBHOOKS] Webhook cadastrado - Tenant: {tenant_id}, URL: {url}",
+            extra={"tenant_id": tenant_id},
+        )
+        return subscription
+
+    async def check_destination(self, url: str) -> Optional[str]:
+        """
+        Resolve o host da URL e verifica se todos os endereços são públicos.
+
+        Args:
+            url: URL do webhook
+
+        Returns:
+            Endereço validado ao qual a entrega deve se conectar, ou None para
+            hosts em ``allowed_hosts``
+
+        Raises:
+            WebhookDestinationError: Se o host não resolver ou algum endereço
+                não for público
+        """
+        parsed = httpx.URL(url)
+        host = parsed.host.lower()
+        if not host:
+            raise WebhookDestinationError("URL de webhook sem host")
+        if host in self.allowed_hosts:
+            return None
+
+        try:
+            addresses = [ipaddress.ip_address(host)]
+        except ValueError:
+            try:
+                infos = await asyncio.get_running_loop().getaddrinfo(
+                    host, parsed.port, type=socket.SOCK_STREAM
+                )
+            except OSError as error:
+                raise WebhookDestinationError(
+                    f"Host do webhook não resolvido: {host}"
+                ) from error
+            addresses = [
+                ipaddress.ip_address(info[4][0].split("%", 1)[0]) for info in infos
+            ]
+
+        for address in addresses:
+            if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+                address = address.ipv4_mapped
+            if not address.is_global or address.is_multicast:
+                raise WebhookDestinationError(
+                    f"Endereço não permitido para webhooks: {host} ({address})"
+                )
+        return str(addresses[0])
+
+    def unsubscribe(self, tenant_id: str, subscription_id: str) -> bool:
+        """
+        Remove um webhook do tenant.
+
+        Returns:
+            True se a inscrição existia
+        """
+        subscriptions = self._subscriptions.get(tenant_id, {})
+        return subscriptions.pop(subscription_id, None) is not None
+
+    def list_subscriptions(self, tenant_id: str) -> List[WebhookSubscription]:
+        return list(self._subscriptions.get(tenant_id, {}).values())
+
+    def get_dead_letters(self, tenant_id: str) -> List[WebhookDeadLetter]:
+        return list(self._dead_letters.get(tenant_id, ()))
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def publish(self, event: WebhookEvent) -> bool:
+        """
+        Enfileira um evento para entrega. Pode ser chamado de qualquer thread.
+
+        Args:
+            event: Evento de transição de estoque
+
+        Returns:
+            False se o tenant não tem webhooks ou o dispatcher não está ativo
+        """
+        if not self._subscriptions.get(event.tenant_id):
+            return False
+
+        loop = self._loop
+        if loop is None:
+            self.dropped += 1
+            logger.warning(
+                f"[WEBHOOKS] Dispatcher inativo, evento descartado - "
+                f"Tenant: {event.tenant_id}, Produto: {event.product_name}",
+                extra={"tenant_id": event.tenant_id},
+            )
+            return False
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            self._enqueue(event)
+        else:
+            loop.call_soon_threadsafe(self._enqueue, event)
+        return True
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._task = asyncio.create_task(self._run(), name="webhook-dispatcher")
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Interrompe o dispatcher, aguardando até ``timeout`` segundos que a
+        fila seja esvaziada e as entregas em andamento terminem.
+        """
+        if self._task is None:
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._queue.qsize() and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        if self._deliveries:
+            _, pending = await asyncio.wait(
+                self._deliveries, timeout=max(deadline - loop.time(), 0)
+            )
+            for delivery in pending:
+                delivery.cancel()
+        if self._queue is not None and self._queue.qsize():
+            logger.warning(
+                f"[WEBHOOKS] {self._queue.qsize()} eventos não entregues "
+                f"no desligamento"
+            )
+
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._task = None
+        self._loop = None
+        self._queue = None
+
+    def clear(self) -> None:
+        """Remove inscrições e dead letters."""
+        self._subscriptions.clear()
+        self._dead_letters.clear()
+        self.dropped = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            )
+        return self._client
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Espera antes da próxima tentativa: exponencial no número da tentativa,
+        limitada a ``max_delay``, com jitter entre metade e o valor cheio.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    def _enqueue(self, event: WebhookEvent) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(
+                f"[WEBHOOKS] Fila cheia, evento descartado - Tenant: {event.tenant_id}",
+                extra={"tenant_id": event.tenant_id},
+            )
+            for subscription in self.list_subscriptions(event.tenant_id):
+                self._dead_letter(subscription, [event], 0, "Fila de eventos cheia")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            try:
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self._queue.get(), remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+            finally:
+                # Um lote já retirado da fila é entregue mesmo no desligamento
+                self._dispatch(batch)
+
+    def _dispatch(self, batch: List[WebhookEvent]) -> None:
+        """Agrupa o lote por inscrição e agenda uma entrega para cada uma."""
+        per_subscription: Dict[str, List[WebhookEvent]] = {}
+        subscriptions: Dict[str, WebhookSubscription] = {}
+        for event in batch:
+            for subscription in self.list_subscriptions(event.tenant_id):
+                subscriptions[subscription.id] = subscription
+                per_subscription.setdefault(subscription.id, []).append(event)
+
+        for subscription_id, events in per_subscription.items():
+            delivery = asyncio.create_task(
+                self._deliver(subscriptions[subscription_id], events)
+            )
+            self._deliveries.add(delivery)
+            delivery.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(
+        self, subscription: WebhookSubscription, events: List[WebhookEvent]
+    ) -> None:
+        body = json.dumps(
+            {
+                "subscription_id": subscription.id,
+                "tenant_id": subscription.tenant_id,
+                "events": [event.model_dump(mode="json") for event in events],
+            }
+        ).encode("utf-8")
+        headers = {
+            "content-type": "application/json",
+            DELIVERY_HEADER: uuid.uuid4().hex,
+        }
+
+        error = ""
+        attempt = 0
+        while attempt < self.max_attempts:
+            attempt += 1
+            try:
+                # O DNS pode ter mudado desde o cadastro
+                address = await self.check_destination(subscription.url)
+            except WebhookDestinationError as exc:
+                error = str(exc)
+                break
+            request = self._build_request(subscription.url, address, body, headers)
+            try:
+                async with self._semaphore:
+                    response = await self.client.send(request)
+            except httpx.HTTPError as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            else:
+                if response.is_success:
+                    return
+                error = f"HTTP {response.status_code}"
+                if not _is_retryable(response.status_code):
+                    break
+
+            if attempt < self.max_attempts:
+                logger.info(
+                    f"[WEBHOOKS] Falha na entrega ({error}), tentativa "
+                    f"{attempt}/{self.max_attempts} - URL: {subscription.url}",
+                    extra={"tenant_id": subscription.tenant_id},
+                )
+                await asyncio.sleep(self.backoff(attempt))
+
+        self._dead_letter(subscription, events, attempt, error)
+
+    def _build_request(
+        self,
+        url: str,
+        address: Optional[str],
+        body: bytes,
+        headers: Dict[str, str],
+    ) -> httpx.Request:
+        """
+        Monta o POST da entrega. Com ``address``, a conexão vai direto ao
+        endereço validado, sem nova resolução de DNS, mantendo o ``Host`` e,
+        em HTTPS, o SNI e a verificação do certificado pelo host original.
+        """
+        target = httpx.URL(url)
+        extensions = {}
+        if address is not None:
+            headers = {**headers, "host": target.netloc.decode("ascii")}
+            if target.scheme == "https":
+                extensions["sni_hostname"] = target.host
+            target = target.copy_with(host=address)
+        return self.client.build_request(
+            "POST", target, content=body, headers=headers, extensions=extensions
+        )
+
+    def _dead_letter(
+        self,
+        subscription: WebhookSubscription,
+        events: List[WebhookEvent],
+        attempts: int,
+        error: str,
+    ) -> None:
+        logger.warning(
+            f"[WEBHOOKS] Entrega abandonada após {attempts} tentativas ({error}) - "
+            f"Tenant: {subscription.tenant_id}, URL: {subscription.url}",
+            extra={"tenant_id": subscription.tenant_id},
+        )
+        dead_letters = self._dead_letters.setdefault(
+            subscription.tenant_id, deque(maxlen=self.dead_letter_size)
+        )
+        dead_letters.append(
+            WebhookDeadLetter(
+                subscription_id=subscription.id,
+                url=subscription.url,
+                events=events,
+                attempts=attempts,
+                error=error,
+                failed_at=datetime.now(),
+            )
+        )
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code >= 500 or status_code in RETRYABLE_STATUS_CODES
+
+
+# Dispatcher compartilhado entre requisições do processo
+WEBHOOK_DISPATCHER = WebhookDispatcher.from_env()
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.sharding.state import ShardState
+
+logger = logging.getLogger(__name__)
+
+FORWARDED_HEADER = "x-stockwise-forwarded-by"
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-connection",
+    "transfer-encoding",
+    "upgrade",
+    "te",
+    "trailer",
+    "host",
+}
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ShardRoutingMiddleware:
+    """
+    Middleware ASGI que encaminha cada requisição ao shard dono do tenant.
+
+    Requisições com ``X-Tenant-ID`` de um tenant de outro shard são repassadas
+    por um ``httpx.AsyncClient`` com pool de conexões. Requisições já
+    encaminhadas não são repassadas novamente, evitando ciclos durante
+    mudanças no anel. Escritas de um tenant em migração aguardam o fim da
+    transferência e seguem para o novo dono, mesmo que já tenham sido
+    encaminhadas por outro shard: esse salto extra só acontece uma vez, ao
+    sair do congelamento.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        state: ShardState,
+        freeze_timeout: float = 10.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.app = app
+        self.state = state
+        self.freeze_timeout = freeze_timeout
+        self._client = client
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/internal/"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        tenant_id = headers.get("x-tenant-id")
+        if tenant_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        held = False
+        frozen = self.state.frozen.get(tenant_id)
+        if frozen is not None and scope["method"] not in READ_METHODS:
+            try:
+                await asyncio.wait_for(frozen.wait(), timeout=self.freeze_timeout)
+            except asyncio.TimeoutError:
+                await _send_error(send, 503, b"Tenant em migracao, tente novamente")
+                return
+            held = True
+
+        owner = self.state.owner_of(tenant_id)
+        if owner == self.state.shard_id:
+            if scope["method"] in READ_METHODS:
+                await self.app(scope, receive, send)
+                return
+
+            active_writes = self.state.active_writes
+            active_writes[tenant_id] = active_writes.get(tenant_id, 0) + 1
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                active_writes[tenant_id] -= 1
+                if not active_writes[tenant_id]:
+                    del active_writes[tenant_id]
+            return
+
+        if FORWARDED_HEADER in headers and not held:
+            await _send_error(send, 421, b"Tenant nao pertence a este shard")
+            return
+
+        await self._forward(scope, receive, send, owner)
+
+    async def _forward(
+        self, scope: Scope, receive: Receive, send: Send, owner: str
+    ) -> None:
+        body = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            body.extend(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+        headers = [
+            (name.decode("latin-1"), value.decode("latin-1"))
+            for name, value in scope["headers"]
+            if name.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+        ]
+        headers.append((FORWARDED_HEADER, self.state.shard_id))
+
+        url = self.state.url_of(owner) + scope.get("root_path", "") + scope["path"]
+        request = self.client.build_request(
+            scope["method"],
+            url,
+            params=scope.get("query_string", b"").decode("latin-1") or None,
+            headers=headers,
+            content=bytes(body),
+        )
+
+        try:
+            response = await self.client.send(request, stream=True)
+        except httpx.HTTPError as error:
+            logger.warning(
+                f"[SHARD ROUTER] Falha ao encaminhar para {owner}: {error}",
+                extra={"shard_id": owner},
+            )
+            await _send_error(send, 502, b"Shard responsavel indisponivel")
+            return
+
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [
+                        (name, value)
+                        for name, value in response.headers.raw
+                        if name.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+                    ],
+                }
+            )
+            async for chunk in response.aiter_raw():
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            await response.aclose()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0),
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=200),
+            )
+        return self._client
+
+
+async def _send_error(send: Send, status_code: int, detail: bytes) -> None:
+    body = b'{"detail": "' + detail + b'"}'
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
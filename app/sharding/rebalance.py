@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import logging
+from typing import Dict, List
+
+import httpx
+
+from app.sharding.state import ShardSettings
+
+logger = logging.getLogger(__name__)
+
+
+async def move_tenant(
+    tenant_id: str,
+    target_shard: str,
+    shard_urls: Dict[str, str],
+    client: httpx.AsyncClient,
+    token: str,
+) -> str:
+    """
+    Move o inventário de um tenant para outro shard sem indisponibilidade.
+
+    1. O shard de origem congela as escritas do tenant e exporta uma cópia
+       consistente do inventário (leituras continuam sendo atendidas);
+    2. o shard de destino importa a cópia;
+    3. todos os shards fixam o tenant no destino, passando a encaminhar as
+       requisições para ele;
+    4. a origem descarta sua cópia e libera as escritas retidas, que seguem
+       para o novo dono.
+
+    Em caso de falha antes da troca de dono, a migração é abortada (veja
+    ``_abort_move``): os shards voltam a apontar para a origem, a cópia do
+    destino é descartada e só então a origem volta a aceitar escritas.
+
+    Args:
+        tenant_id: Tenant a mover
+        target_shard: Shard de destino
+        shard_urls: URLs de todos os shards do anel
+        client: Cliente HTTP usado para falar com os shards
+        token: Token interno dos shards (X-Shard-Token)
+
+    Returns:
+        Shard de origem do tenant
+    """
+    headers = {"X-Shard-Token": token}
+    any_url = next(iter(shard_urls.values()))
+
+    response = await client.get(
+        f"{any_url}/internal/shards/tenants/{tenant_id}/owner", headers=headers
+    )
+    response.raise_for_status()
+    source_shard = response.json()["shard_id"]
+    if source_shard == target_shard:
+        return source_shard
+
+    source_url = shard_urls[source_shard]
+    target_url = shard_urls[target_shard]
+
+    response = await client.post(
+        f"{source_url}/internal/shards/tenants/{tenant_id}/freeze", headers=headers
+    )
+    response.raise_for_status()
+    snapshot = response.json()
+
+    # Shards que podem já estar apontando para o destino
+    pinned: List[str] = []
+    try:
+        response = await client.put(
+            f"{target_url}/internal/shards/tenants/{tenant_id}",
+            json=snapshot,
+            headers=headers,
+        )
+        response.raise_for_status()
+
+        # O destino assume primeiro, para que nunca haja um dono sem os dados
+        for shard_id in sorted(shard_urls, key=lambda name: name == source_shard):
+            pinned.append(shard_id)
+            response = await client.put(
+                f"{shard_urls[shard_id]}/internal/shards/assignments/{tenant_id}",
+                json={"shard_id": target_shard},
+                headers=headers,
+            )
+            response.raise_for_status()
+    except httpx.HTTPError:
+        logger.exception(
+            f"[REBALANCE] Falha ao mover {tenant_id}; abortando migração",
+            extra={"tenant_id": tenant_id},
+        )
+        await _abort_move(
+            tenant_id, source_shard, target_shard, shard_urls, client, headers, pinned
+        )
+        raise
+
+    response = await client.post(
+        f"{source_url}/internal/shards/tenants/{tenant_id}/release",
+        params={"drop": "true"},
+        headers=headers,
+    )
+    response.raise_for_status()
+
+    logger.info(
+        f"[REBALANCE] Tenant {tenant_id} movido de {source_shard} para {target_shard}",
+        extra={"tenant_id": tenant_id},
+    )
+    return source_shard
+
+
+async def _abort_move(
+    tenant_id: str,
+    source_shard: str,
+    target_shard: str,
+    shard_urls: Dict[str, str],
+    client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    pinned: List[str],
+) -> None:
+    """
+    Desfaz uma migração interrompida sem deixar duas cópias aceitando escritas.
+
+    Se o destino já assumiu o tenant, ele é congelado e sua cópia, que pode
+    ter recebido escritas, volta para a origem. Os shards fixados no destino
+    voltam a apontar para a origem (o destino primeiro), a cópia do destino é
+    descartada e só então a origem é liberada. Se algum passo falhar com
+    shards apontando para o destino, a origem permanece congelada: as escritas
+    recebem 503 até que a migração seja repetida.
+    """
+    source_url = shard_urls[source_shard]
+    target_url = shard_urls[target_shard]
+    try:
+        if target_shard in pinned:
+            response = await client.post(
+                f"{target_url}/internal/shards/tenants/{tenant_id}/freeze",
+                headers=headers,
+            )
+            response.raise_for_status()
+            response = await client.put(
+                f"{source_url}/internal/shards/tenants/{tenant_id}",
+                json=response.json(),
+                headers=headers,
+            )
+            response.raise_for_status()
+
+        for shard_id in sorted(pinned, key=lambda name: name != target_shard):
+            response = await client.put(
+                f"{shard_urls[shard_id]}/internal/shards/assignments/{tenant_id}",
+                json={"shard_id": source_shard},
+                headers=headers,
+            )
+            response.raise_for_status()
+    except httpx.HTTPError:
+        logger.exception(
+            f"[REBALANCE] Falha ao abortar a migração de {tenant_id}; escritas "
+            f"permanecem congeladas até uma nova tentativa",
+            extra={"tenant_id": tenant_id},
+        )
+        return
+
+    try:
+        response = await client.post(
+            f"{target_url}/internal/shards/tenants/{tenant_id}/release",
+            params={"drop": "true"},
+            headers=headers,
+        )
+        response.raise_for_status()
+    except httpx.HTTPError:
+        # Nenhum shard aponta mais para o destino: a cópia restante não recebe
+        # escritas e é sobrescrita por uma próxima migração
+        logger.warning(
+            f"[REBALANCE] Cópia de {tenant_id} não descartada em {target_shard}",
+            extra={"tenant_id": tenant_id},
+        )
+
+    try:
+        response = await client.post(
+            f"{source_url}/internal/shards/tenants/{tenant_id}/release",
+            params={"drop": "false"},
+            headers=headers,
+        )
+        response.raise_for_status()
+    except httpx.HTTPError:
+        logger.exception(
+            f"[REBALANCE] Falha ao liberar {tenant_id} em {source_shard}",
+            extra={"tenant_id": tenant_id},
+        )
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Move um tenant entre shards.")
+    parser.add_argument("--tenant", required=True, help="Tenant a mover")
+    parser.add_argument("--to", required=True, help="Shard de destino")
+    args = parser.parse_args()
+
+    settings = ShardSettings.from_env()
+    if settings is None:
+        parser.error("Defina STOCKWISE_SHARD_ID e STOCKWISE_SHARDS")
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        source = await move_tenant(
+            args.tenant, args.to, settings.shard_urls, client, settings.token
+        )
+    print(f"{args.tenant}: {source} -> {args.to}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
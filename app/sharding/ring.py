@@ -0,0 +1,84 @@
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Set
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class ConsistentHashRing:
+    """
+    Anel de hash consistente que atribui tenants a shards.
+
+    Cada shard ocupa ``virtual_nodes`` posições no anel; um tenant pertence ao
+    primeiro shard encontrado a partir do hash do seu identificador. Ao
+    adicionar ou remover um shard, apenas os tenants das posições afetadas
+    mudam de dono.
+
+    Atribuições fixas (``pins``) têm precedência sobre o anel e são usadas
+    pelo rebalanceamento para mover um tenant específico.
+    """
+
+    def __init__(self, shards: Iterable[str] = (), virtual_nodes: int = 128):
+        self.virtual_nodes = virtual_nodes
+        self.pins: Dict[str, str] = {}
+        self._shards: Set[str] = set()
+        self._hashes: List[int] = []
+        self._owners: List[str] = []
+        for shard_id in shards:
+            self._shards.add(shard_id)
+        self._rebuild()
+
+    @property
+    def shards(self) -> List[str]:
+        return sorted(self._shards)
+
+    def add_shard(self, shard_id: str) -> None:
+        self._shards.add(shard_id)
+        self._rebuild()
+
+    def remove_shard(self, shard_id: str) -> None:
+        self._shards.discard(shard_id)
+        self.pins = {
+            tenant_id: owner
+            for tenant_id, owner in self.pins.items()
+            if owner != shard_id
+        }
+        self._rebuild()
+
+    def pin(self, tenant_id: str, shard_id: str) -> None:
+        """Fixa o tenant em um shard, ignorando a posição no anel."""
+        if shard_id not in self._shards:
+            raise ValueError(f"Shard '{shard_id}' não pertence ao anel")
+        self.pins[tenant_id] = shard_id
+
+    def get_shard(self, tenant_id: str) -> str:
+        """
+        Retorna o shard dono de um tenant.
+
+        Args:
+            tenant_id: Identificador do tenant
+
+        Returns:
+            Identificador do shard responsável pelo tenant
+        """
+        pinned = self.pins.get(tenant_id)
+        if pinned is not None:
+            return pinned
+        if not self._hashes:
+            raise LookupError("Anel de shards vazio")
+
+        index = bisect.bisect_right(self._hashes, _hash(tenant_id))
+        return self._owners[index % len(self._owners)]
+
+    def _rebuild(self) -> None:
+        points = sorted(
+            (_hash(f"{shard_id}#{replica}"), shard_id)
+            for shard_id in self._shards
+            for replica in range(self.virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard_id for _, shard_id in points]
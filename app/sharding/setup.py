@@ -0,0 +1,35 @@
+from fastapi import FastAPI
+
+from app.api.internal import shards
+from app.database.database import MOCK_INVENTORY_DB, MOCK_INVENTORY_VERSIONS
+from app.sharding import state as sharding_state
+from app.sharding.middleware import ShardRoutingMiddleware
+from app.sharding.ring import ConsistentHashRing
+from app.sharding.state import ShardSettings, ShardState, load_local_tenants
+
+
+def configure_sharding(app: FastAPI, settings: ShardSettings) -> ShardState:
+    """
+    Habilita o modo sharded no processo.
+
+    Monta o anel com os shards configurados, mantém apenas os tenants deste
+    shard na base local, registra as rotas internas de migração e o
+    middleware de roteamento.
+
+    Args:
+        app: Aplicação FastAPI
+        settings: Configuração do shard local e dos pares
+
+    Returns:
+        Estado do shard local
+    """
+    shard_state = ShardState(
+        settings=settings,
+        ring=ConsistentHashRing(shards=settings.shard_urls),
+    )
+    load_local_tenants(MOCK_INVENTORY_DB, MOCK_INVENTORY_VERSIONS, shard_state)
+    sharding_state.SHARD_STATE = shard_state
+
+    app.include_router(shards.router)
+    app.add_middleware(ShardRoutingMiddleware, state=shard_state)
+    return shard_state
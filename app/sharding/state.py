@@ -0,0 +1,109 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.sharding.ring import ConsistentHashRing
+
+
+@dataclass
+class ShardSettings:
+    """Configuração do modo sharded, lida das variáveis de ambiente."""
+
+    shard_id: str
+    shard_urls: Dict[str, str]
+    token: str
+
+    @classmethod
+    def from_env(cls) -> Optional["ShardSettings"]:
+        """
+        Lê ``STOCKWISE_SHARD_ID``, ``STOCKWISE_SHARDS``
+        (``shard-a=http://host:8001,shard-b=http://host:8002``) e
+        ``STOCKWISE_SHARD_TOKEN``.
+
+        Returns:
+            ShardSettings ou None quando o modo sharded não está configurado
+
+        Raises:
+            ValueError: Se o shard local não estiver na lista ou se o token
+                interno não estiver definido
+        """
+        shard_id = os.getenv("STOCKWISE_SHARD_ID")
+        shards = os.getenv("STOCKWISE_SHARDS")
+        if not shard_id or not shards:
+            return None
+
+        shard_urls = {}
+        for entry in shards.split(","):
+            name, _, url = entry.strip().partition("=")
+            if name and url:
+                shard_urls[name.strip()] = url.strip().rstrip("/")
+        if shard_id not in shard_urls:
+            raise ValueError(
+                f"STOCKWISE_SHARD_ID '{shard_id}' não está em STOCKWISE_SHARDS"
+            )
+        # As rotas internas exportam e sobrescrevem inventários: sem token, não sobe
+        token = os.getenv("STOCKWISE_SHARD_TOKEN")
+        if not token:
+            raise ValueError("STOCKWISE_SHARD_TOKEN é obrigatório no modo sharded")
+        return cls(shard_id=shard_id, shard_urls=shard_urls, token=token)
+
+
+@dataclass
+class ShardState:
+    """Estado do shard local: anel, URLs dos pares e tenants em migração."""
+
+    settings: ShardSettings
+    ring: ConsistentHashRing
+    frozen: Dict[str, asyncio.Event] = field(default_factory=dict)
+    active_writes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def shard_id(self) -> str:
+        return self.settings.shard_id
+
+    def owner_of(self, tenant_id: str) -> str:
+        return self.ring.get_shard(tenant_id)
+
+    def owns(self, tenant_id: str) -> bool:
+        return self.owner_of(tenant_id) == self.shard_id
+
+    def url_of(self, shard_id: str) -> str:
+        return self.settings.shard_urls[shard_id]
+
+    def freeze(self, tenant_id: str) -> None:
+        """Suspende as escritas do tenant até ``unfreeze``."""
+        self.frozen.setdefault(tenant_id, asyncio.Event())
+
+    async def wait_writes_drained(
+        self, tenant_id: str, poll_interval: float = 0.005
+    ) -> None:
+        """Aguarda o término das escritas do tenant iniciadas antes do congelamento."""
+        while self.active_writes.get(tenant_id):
+            await asyncio.sleep(poll_interval)
+
+    def unfreeze(self, tenant_id: str) -> None:
+        event = self.frozen.pop(tenant_id, None)
+        if event is not None:
+            event.set()
+
+
+def load_local_tenants(
+    inventory_db: Dict[str, Any], versions: Dict[str, int], state: ShardState
+) -> None:
+    """
+    Mantém na base local apenas os tenants pertencentes a este shard.
+
+    Args:
+        inventory_db: Base de inventário do processo, alterada no lugar
+        versions: Versões do inventário de cada tenant, alteradas no lugar
+        state: Estado do shard local
+    """
+    for tenant_id in list(inventory_db):
+        if not state.owns(tenant_id):
+            del inventory_db[tenant_id]
+            versions.pop(tenant_id, None)
+
+
+# Estado do shard deste processo; None quando o modo sharded está desligado
+SHARD_STATE: Optional[ShardState] = None
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator
+
+import fastapi
+import pydantic
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from app.models.schemas import (
+    InventoryItem,
+    RestockRequest,
+    RestockResponse,
+    RestockStatus,
+)
+from app.services.erp import ERP_CLIENT
+from app.services.health import HEALTH_MONITOR
+from app.services.webhooks import WEBHOOK_DISPATCHER
+
+logger = logging.getLogger(__name__)
+
+# Modo de inicialização rápida (autoscaling e ciclos de --reload)
+FAST_STARTUP = os.getenv("STOCKWISE_FAST_STARTUP", "").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+
+# Documento OpenAPI pré-computado no build
+OPENAPI_CACHE_PATH = os.getenv(
+    "STOCKWISE_OPENAPI_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "openapi.json"),
+)
+
+FINGERPRINT_KEY = "x-routes-fingerprint"
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Código que define o documento OpenAPI: modelos, rotas e a aplicação
+SCHEMA_SOURCES = [
+    os.path.join(_APP_DIR, "models"),
+    os.path.join(_APP_DIR, "api"),
+    os.path.join(_APP_DIR, "main.py"),
+]
+
+
+def _iter_schema_sources() -> Iterator[str]:
+    for source in SCHEMA_SOURCES:
+        if os.path.isfile(source):
+            yield source
+            continue
+        for directory, subdirectories, files in os.walk(source):
+            subdirectories.sort()
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    yield os.path.join(directory, name)
+
+
+def routes_fingerprint(app: FastAPI) -> str:
+    """
+    Calcula uma impressão digital das rotas, da versão da aplicação e do
+    código dos modelos e rotas, usada para descartar um documento OpenAPI
+    pré-computado desatualizado.
+
+    Hashear o código-fonte evita gerar os JSON Schemas dos modelos no fast
+    startup: qualquer alteração em um modelo (ou nas versões de FastAPI e
+    Pydantic, que influenciam os schemas gerados) invalida o documento.
+    """
+    routes = sorted(
+        f"{','.join(sorted(route.methods))} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+    )
+    digest = hashlib.sha256()
+    for part in [
+        app.title,
+        app.version,
+        fastapi.__version__,
+        pydantic.VERSION,
+        *routes,
+    ]:
+        digest.update(part.encode("utf-8") + b"\n")
+    for path in _iter_schema_sources():
+        digest.update(os.path.relpath(path, _APP_DIR).encode("utf-8") + b"\n")
+        with open(path, "rb") as source_file:
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+def build_openapi_cache(app: FastAPI, path: str = OPENAPI_CACHE_PATH) -> str:
+    """
+    Gera o documento OpenAPI e o grava em disco para uso no fast startup.
+
+    Args:
+        app: Aplicação FastAPI
+        path: Caminho do arquivo gerado
+
+    Returns:
+        Caminho do arquivo gerado
+    """
+    schema = app.openapi()
+    schema["info"][FINGERPRINT_KEY] = routes_fingerprint(app)
+    with open(path, "w", encoding="utf-8") as openapi_file:
+        json.dump(schema, openapi_file, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+def install_precomputed_openapi(
+    app: FastAPI, path: str = OPENAPI_CACHE_PATH
+) -> bool:
+    """
+    Carrega o documento OpenAPI pré-computado, se existir e corresponder às
+    rotas atuais, evitando gerá-lo no primeiro acesso a ``/docs``.
+
+    O documento é instalado substituindo ``app.openapi``, a extensão prevista
+    pelo FastAPI: preencher apenas ``app.openapi_schema`` não basta, porque
+    ``FastAPI.openapi()`` também compara uma versão interna das rotas e
+    regeraria o documento no primeiro acesso.
+
+    Returns:
+        True se o documento pré-computado foi instalado
+    """
+    try:
+        with open(path, encoding="utf-8") as openapi_file:
+            schema = json.load(openapi_file)
+    except (OSError, ValueError):
+        return False
+
+    if schema.get("info", {}).get(FINGERPRINT_KEY) != routes_fingerprint(app):
+        logger.warning(
+            f"[STARTUP] Documento OpenAPI pré-computado desatualizado: {path}"
+        )
+        return False
+
+    def precomputed_openapi() -> Dict[str, Any]:
+        return schema
+
+    app.openapi_schema = schema
+    app.openapi = precomputed_openapi
+    return True
+
+
+def prewarm_models() -> None:
+    """
+    Exercita validação e serialização dos modelos do caminho crítico, para
+    que o primeiro request não pague a preparação dos validadores.
+    """
+    item = InventoryItem.model_validate(
+        {
+            "tenant_id": "warmup",
+            "product_name": "warmup",
+            "quantity": 1,
+            "min_stock": 1,
+            "needs_restock": False,
+            "locations": {"warmup": 1},
+        }
+    )
+    item.model_dump_json()
+
+    RestockRequest.model_validate_json('{"product_name": "warmup", "quantity": 1}')
+
+    RestockResponse(
+        status=RestockStatus.SUCCESS,
+        message="warmup",
+        tenant_id="warmup",
+        product_name="warmup",
+        quantity_requested=1,
+        timestamp=datetime.now(),
+    ).model_dump_json()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Ciclo de vida da aplicação. No fast startup, instala o OpenAPI
+    pré-computado (ou o gera agora) e aquece os validadores antes de o
+    worker ser marcado como pronto. Em seguida, inicia o dispatcher de
+    webhooks, o reenvio de pedidos pendentes ao ERP e as verificações de
+    prontidão, que também medem o atraso do event loop usado pelo
+    diagnóstico.
+    """
+    if FAST_STARTUP:
+        if not install_precomputed_openapi(app, OPENAPI_CACHE_PATH):
+            app.openapi()
+        prewarm_models()
+        logger.info("[STARTUP] Fast startup concluído")
+
+    await WEBHOOK_DISPATCHER.start()
+    await ERP_CLIENT.start()
+    await HEALTH_MONITOR.start()
+    try:
+        yield
+    finally:
+        await HEALTH_MONITOR.stop()
+        await ERP_CLIENT.stop()
+        await WEBHOOK_DISPATCHER.stop()
+
+
+if __name__ == "__main__":
+    from app.main import app
+
+    output = sys.argv[1] if len(sys.argv) > 1 else OPENAPI_CACHE_PATH
+    print(f"Documento OpenAPI gerado em {build_openapi_cache(app, output)}")
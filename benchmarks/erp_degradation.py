@@ -0,0 +1,174 @@
+"""
+Benchmark de isolamento entre leituras de inventário e um ERP degradado.
+
+Sobe a API com uvicorn apontando para o ERP falso e, em cada fase, mede a
+latência de ``GET /api/v1/inventory`` enquanto ``POST
+/api/v1/inventory/restock`` chegam a uma taxa fixa, sem esperar as
+respostas anteriores (um ERP lento acumula pedidos em andamento):
+
+- sem carga: apenas leituras;
+- ERP saudável: leituras + pedidos;
+- ERP lento: cada pedido leva mais que o timeout do cliente;
+- ERP com erros: todas as respostas são 503.
+
+A comparação que interessa é entre as fases com a mesma taxa de pedidos: com
+bulkhead, timeout e circuit breaker, as leituras com o ERP lento ou com erros
+não devem ficar mais lentas que com o ERP saudável. A diferença para a fase
+sem carga é o custo de processar os pedidos no mesmo worker (validação,
+idempotência, log de requisições e a chamada HTTP ao ERP), não espera pelo
+ERP. Com o circuito aberto os pedidos nem chegam ao ERP, por isso as fases
+degradadas costumam ficar abaixo da fase saudável. O ERP falso roda em
+threads deste processo e disputa o GIL com o medidor, o que infla a fase
+saudável.
+
+Uso:
+    python -m benchmarks.erp_degradation [--seconds 5] [--rate 100]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.fake_erp import FakeErp
+from benchmarks.startup_time import ROOT, _free_port
+
+TENANTS = ["LojaA", "LojaB", "LojaC"]
+
+
+def start_api(erp_url: str, erp_timeout: float) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "STOCKWISE_ERP_URL": erp_url,
+        "STOCKWISE_ERP_TIMEOUT": str(erp_timeout),
+        "STOCKWISE_MOVEMENT_LOG_DIR": tempfile.mkdtemp(),
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "error",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/health/live", timeout=1.0).raise_for_status()
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.05)
+    process.terminate()
+    raise TimeoutError("Servidor não respondeu a tempo")
+
+
+async def run_phase(
+    base_url: str, seconds: float, rate: float
+) -> Tuple[List[float], Counter]:
+    """Mede as leituras por ``seconds`` com ``rate`` pedidos por segundo."""
+    statuses: Counter = Counter()
+    stop = asyncio.Event()
+
+    async def restock(client: httpx.AsyncClient, tenant_id: str) -> None:
+        try:
+            response = await client.post(
+                f"{base_url}/api/v1/inventory/restock",
+                headers={"X-Tenant-ID": tenant_id},
+                json={"product_name": "Parafuso M8", "quantity": 10},
+            )
+            statuses[response.json()["status"]] += 1
+        except httpx.HTTPError as exc:
+            statuses[type(exc).__name__] += 1
+
+    async def writer(client: httpx.AsyncClient) -> None:
+        requests = []
+        index = 0
+        while rate and not stop.is_set():
+            tenant_id = TENANTS[index % len(TENANTS)]
+            requests.append(asyncio.create_task(restock(client, tenant_id)))
+            index += 1
+            await asyncio.sleep(1 / rate)
+        await asyncio.gather(*requests)
+
+    async def reader(client: httpx.AsyncClient) -> List[float]:
+        latencies = []
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = await client.get(
+                f"{base_url}/api/v1/inventory", headers={"X-Tenant-ID": "LojaA"}
+            )
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+        return latencies
+
+    limits = httpx.Limits(max_connections=1000)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        writing = asyncio.create_task(writer(client))
+        latencies = await reader(client)
+        stop.set()
+        await writing
+    return latencies, statuses
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate", type=float, default=100.0)
+    parser.add_argument("--erp-timeout", type=float, default=0.5)
+    args = parser.parse_args()
+
+    erp = FakeErp().start()
+    process, base_url = start_api(erp.url, args.erp_timeout)
+    phases: Dict[str, Tuple[float, float, float]] = {
+        # fase: (latência do ERP, taxa de erros, pedidos por segundo)
+        "sem carga": (0.0, 0.0, 0.0),
+        "ERP saudável": (0.01, 0.0, args.rate),
+        "ERP lento": (args.erp_timeout * 10, 0.0, args.rate),
+        "ERP com erros": (0.0, 1.0, args.rate),
+    }
+    try:
+        print(
+            f"{'fase':<16}{'p50 (ms)':>10}{'p99 (ms)':>10}{'máx (ms)':>10}"
+            f"{'leituras':>10}  pedidos"
+        )
+        for name, (latency, error_rate, rate) in phases.items():
+            erp.degrade(latency=latency, error_rate=error_rate)
+            latencies, statuses = asyncio.run(run_phase(base_url, args.seconds, rate))
+            print(
+                f"{name:<16}{statistics.median(latencies):>10.1f}"
+                f"{_percentile(latencies, 0.99):>10.1f}{max(latencies):>10.1f}"
+                f"{len(latencies):>10}  {dict(statuses)}"
+            )
+    finally:
+        process.terminate()
+        process.wait()
+        erp.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+ERP falso para testes de caos do cliente de reabastecimento.
+
+Aceita ``POST /restock-orders`` e permite injetar, inclusive com o servidor
+rodando, latência fixa e uma taxa de erros. Pedidos repetidos com o mesmo
+``Idempotency-Key`` são registrados uma única vez.
+
+Uso:
+    python -m benchmarks.fake_erp [--port 9100] [--latency 0.5] [--error-rate 0.2]
+
+    STOCKWISE_ERP_URL=http://127.0.0.1:9100 uv run uvicorn app.main:app
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+class FakeErp:
+    """Servidor HTTP local que simula o ERP, com latência e erros injetáveis."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.orders: List[Dict[str, Any]] = []
+        self.calls = 0
+        self._keys: set = set()
+        self._lock = threading.Lock()
+        erp = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status = erp._handle(
+                    self.path, self.headers.get("Idempotency-Key"), body
+                )
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.01,), daemon=True
+        )
+
+    def start(self) -> "FakeErp":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def degrade(self, latency: float = 0.0, error_rate: float = 0.0) -> None:
+        """Altera a latência e a taxa de erros das próximas requisições."""
+        self.latency = latency
+        self.error_rate = error_rate
+
+    def _handle(self, path: str, key: str, body: bytes) -> int:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if path != "/restock-orders":
+            return 404
+        if random.random() < self.error_rate:
+            return self.error_status
+
+        with self._lock:
+            if key is None or key not in self._keys:
+                self._keys.add(key)
+                self.orders.append(json.loads(body))
+        return 201
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    erp = FakeErp(
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    print(
+        f"ERP falso em {erp.url} (latência {args.latency}s, "
+        f"erros {args.error_rate:.0%} com HTTP {args.error_status})"
+    )
+    try:
+        erp.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        erp.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark de cold start da StockWise API.
+
+Mede, em processos novos, o tempo de importação de ``app.main`` e o tempo
+até a primeira resposta do uvicorn (spawn do processo até o primeiro
+``GET /api/v1/inventory`` e ``GET /openapi.json`` respondidos), com e sem
+``STOCKWISE_FAST_STARTUP``.
+
+Uso:
+    python -m benchmarks.startup_time [--runs 5]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=env, text=True
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_request(env: dict, timeout: float = 30.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        while time.perf_counter() - start < timeout:
+            try:
+                httpx.get(
+                    f"{base_url}/api/v1/inventory",
+                    headers={"X-Tenant-ID": "LojaA"},
+                    timeout=5.0,
+                ).raise_for_status()
+                break
+            except httpx.TransportError:
+                time.sleep(0.005)
+        else:
+            raise TimeoutError("Servidor não respondeu a tempo")
+        httpx.get(f"{base_url}/openapi.json", timeout=5.0).raise_for_status()
+        return time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    base_env = dict(os.environ)
+    base_env.pop("STOCKWISE_FAST_STARTUP", None)
+    base_env.setdefault("STOCKWISE_MOVEMENT_LOG_DIR", tempfile.mkdtemp())
+
+    openapi_path = os.path.join(tempfile.mkdtemp(), "openapi.json")
+    subprocess.check_call(
+        [sys.executable, "-m", "app.startup", openapi_path],
+        cwd=ROOT,
+        env=base_env,
+        stdout=subprocess.DEVNULL,
+    )
+
+    modes = {
+        "padrão": base_env,
+        "fast startup": {
+            **base_env,
+            "STOCKWISE_FAST_STARTUP": "1",
+            "STOCKWISE_OPENAPI_PATH": openapi_path,
+        },
+    }
+
+    print(f"{'modo':<14}{'import (ms)':>14}{'1º request (ms)':>18}")
+    for name, env in modes.items():
+        imports = [measure_import(env) for _ in range(args.runs)]
+        first_requests = [measure_first_request(env) for _ in range(args.runs)]
+        print(
+            f"{name:<14}{statistics.median(imports) * 1000:>14.1f}"
+            f"{statistics.median(first_requests) * 1000:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,44 @@
+import copy
+
 import pytest
 
+from app.database.database import MOCK_INVENTORY_DB, MOCK_INVENTORY_VERSIONS
+from app.repositories.change_log import INVENTORY_CHANGES
+from app.repositories.movement_log import MOVEMENT_LOG
+from app.services.forecasting import CONSUMPTION_FORECASTER
+from app.services.idempotency import IDEMPOTENCY_STORE
+from app.services.low_stock_rules import LOW_STOCK_RULES
+from app.services.restock_recommendations import RECOMMENDATION_CACHE
+from app.services.webhooks import WEBHOOK_DISPATCHER
+
+
+@pytest.fixture(autouse=True, scope="session")
+def movement_log_dir(tmp_path_factory):
+    """Mantém os arquivos gerados pela aplicação fora do diretório padrão."""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(
+            MOVEMENT_LOG, "base_dir", str(tmp_path_factory.mktemp("movements"))
+        )
+        yield MOVEMENT_LOG.base_dir
+
+
+@pytest.fixture(autouse=True)
+def restore_app_state():
+    """Restaura a base mock e limpa o estado compartilhado entre requisições."""
+    inventory = copy.deepcopy(MOCK_INVENTORY_DB)
+    versions = dict(MOCK_INVENTORY_VERSIONS)
+    yield
+    MOCK_INVENTORY_DB.clear()
+    MOCK_INVENTORY_DB.update(inventory)
+    MOCK_INVENTORY_VERSIONS.clear()
+    MOCK_INVENTORY_VERSIONS.update(versions)
+    CONSUMPTION_FORECASTER.clear()
+    INVENTORY_CHANGES.clear()
+    IDEMPOTENCY_STORE.clear()
+    LOW_STOCK_RULES.clear()
+    RECOMMENDATION_CACHE.clear()
+    WEBHOOK_DISPATCHER.clear()
+
 
 @pytest.fixture
 def sample_product_data():
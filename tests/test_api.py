@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.repositories.change_log import INVENTORY_CHANGES
 
 
 @pytest.fixture
@@ -110,6 +111,61 @@ def test_low_stock_returns_only_items_needing_restock(client, valid_headers):
     data = response.json()
     assert all(item["needs_restock"] is True for item in data)
     assert all(item["quantity"] < item["min_stock"] for item in data)
+    assert all(item["rule_id"] == "below-min-stock" for item in data)
+    assert all(item["severity"] == "warning" for item in data)
+
+
+def test_low_stock_alerts_follow_tenant_rules(client, valid_headers):
+    rules = {
+        "rules": [
+            {"id": "fixadores", "category": "Fixadores", "min_stock_ratio": 1.2},
+            {"id": "zerado", "severity": "critical", "max_quantity": 0},
+        ]
+    }
+    client.post(
+        "/api/v1/inventory/Arruela de Pressão/movements",
+        headers=valid_headers,
+        json={"delta": -5},
+    )
+
+    updated = client.put(
+        "/api/v1/inventory/alerts/rules", headers=valid_headers, json=rules
+    )
+    response = client.get("/api/v1/inventory/alerts/low-stock", headers=valid_headers)
+
+    assert updated.status_code == 200
+    assert updated.json()["version"] == 1
+    alerts = {item["product_name"]: item for item in response.json()}
+    assert set(alerts) == {"Parafuso M8", "Arruela de Pressão"}
+    assert alerts["Arruela de Pressão"]["severity"] == "critical"
+    assert alerts["Arruela de Pressão"]["rule_id"] == "zerado"
+    assert alerts["Parafuso M8"]["category"] == "Fixadores"
+    assert alerts["Parafuso M8"]["rule_id"] == "fixadores"
+
+
+def test_low_stock_rules_are_isolated_per_tenant(client, valid_headers):
+    client.put(
+        "/api/v1/inventory/alerts/rules",
+        headers=valid_headers,
+        json={"rules": [{"id": "zerado", "max_quantity": 0}]},
+    )
+
+    response = client.get(
+        "/api/v1/inventory/alerts/rules", headers={"X-Tenant-ID": "LojaB"}
+    )
+
+    assert response.json()["version"] == 0
+    assert [rule["id"] for rule in response.json()["rules"]] == ["below-min-stock"]
+
+
+def test_invalid_low_stock_rule_returns_422(client, valid_headers):
+    response = client.put(
+        "/api/v1/inventory/alerts/rules",
+        headers=valid_headers,
+        json={"rules": [{"id": "sem-limite", "category": "Fixadores"}]},
+    )
+
+    assert response.status_code == 422
 
 
 # --- POST /inventory/restock ---
@@ -170,6 +226,59 @@ def test_request_restock_returns_422_for_empty_product_name(client, valid_header
     assert response.status_code == 422
 
 
+def test_request_restock_replays_response_for_same_idempotency_key(
+    client, valid_headers
+):
+    headers = {**valid_headers, "Idempotency-Key": "pedido-123"}
+    payload = {"product_name": "Parafuso M8", "quantity": 35}
+
+    first = client.post("/api/v1/inventory/restock", headers=headers, json=payload)
+    second = client.post("/api/v1/inventory/restock", headers=headers, json=payload)
+
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json()
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+
+
+def test_request_restock_idempotency_key_is_scoped_by_tenant(client):
+    payload = {"product_name": "Parafuso M8", "quantity": 35}
+
+    response_a = client.post(
+        "/api/v1/inventory/restock",
+        headers={"X-Tenant-ID": "LojaA", "Idempotency-Key": "pedido-123"},
+        json=payload,
+    )
+    response_b = client.post(
+        "/api/v1/inventory/restock",
+        headers={"X-Tenant-ID": "LojaB", "Idempotency-Key": "pedido-123"},
+        json=payload,
+    )
+
+    assert response_a.json()["tenant_id"] == "LojaA"
+    assert response_b.json()["tenant_id"] == "LojaB"
+    assert "Idempotent-Replayed" not in response_b.headers
+
+
+def test_request_restock_returns_422_when_idempotency_key_is_reused(
+    client, valid_headers
+):
+    headers = {**valid_headers, "Idempotency-Key": "pedido-123"}
+
+    client.post(
+        "/api/v1/inventory/restock",
+        headers=headers,
+        json={"product_name": "Parafuso M8", "quantity": 35},
+    )
+    response = client.post(
+        "/api/v1/inventory/restock",
+        headers=headers,
+        json={"product_name": "Parafuso M8", "quantity": 40},
+    )
+
+    assert response.status_code == 422
+
+
 # --- Multi-tenancy ---
 
 
@@ -201,6 +310,20 @@ def test_tenant_cannot_access_other_tenant_exclusive_product(client):
     assert response_b.status_code == 200
 
 
+# --- Métricas ---
+
+
+def test_single_flight_metrics_count_inventory_reads(client, valid_headers):
+    client.get("/api/v1/inventory", headers=valid_headers)
+
+    response = client.get("/metrics/single-flight")
+
+    assert response.status_code == 200
+    stats = response.json()["get_all_inventory"]
+    assert stats["calls"] >= 1
+    assert stats["calls"] == stats["executions"] + stats["coalesced"]
+
+
 # --- Health endpoints ---
 
 
@@ -217,4 +340,263 @@ def test_health_endpoint_returns_healthy(client):
     response = client.get("/health")
 
     assert response.status_code == 200
-    assert response.json()["status"] == "healthy"
\ No newline at end of file
+    assert response.json()["status"] == "healthy"
+
+# --- GET /inventory/alerts/recommendations ---
+
+
+def test_recommendations_cover_all_low_stock_items(client, valid_headers):
+    response = client.get(
+        "/api/v1/inventory/alerts/recommendations", headers=valid_headers
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert {item["product_name"] for item in data} == {
+        "Parafuso M8",
+        "Arruela de Pressão",
+        "Chave de Fenda",
+    }
+    assert all(item["suggested_quantity"] > 0 for item in data)
+
+
+def test_recommendations_apply_policy_from_query(client, valid_headers):
+    response = client.get(
+        "/api/v1/inventory/alerts/recommendations",
+        headers=valid_headers,
+        params={"target_multiplier": 1.0, "safety_stock": 5, "pack_size": 10},
+    )
+
+    data = {item["product_name"]: item for item in response.json()}
+    # Parafuso M8: alvo 50 + 5 = 55, faltam 40 -> lote de 10
+    assert data["Parafuso M8"]["target_stock"] == 55
+    assert data["Parafuso M8"]["suggested_quantity"] == 40
+
+
+def test_recommendations_returns_422_for_invalid_pack_size(client, valid_headers):
+    response = client.get(
+        "/api/v1/inventory/alerts/recommendations",
+        headers=valid_headers,
+        params={"pack_size": 0},
+    )
+
+    assert response.status_code == 422
+
+
+# --- POST /inventory/{product_name}/movements e GET /history ---
+
+
+def test_record_movement_updates_quantity(client, valid_headers):
+    response = client.post(
+        "/api/v1/inventory/Broca 6mm/movements",
+        headers=valid_headers,
+        json={"delta": -30},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["quantity"] == 15
+    assert data["needs_restock"] is True
+
+
+def test_record_movement_updates_location_and_total(client, valid_headers):
+    response = client.post(
+        "/api/v1/inventory/Broca 6mm/movements",
+        headers=valid_headers,
+        json={"delta": -5, "location": "Prateleira"},
+    )
+
+    data = response.json()
+    assert data["locations"] == {"Depósito": 30, "Prateleira": 10}
+    assert data["quantity"] == 40
+
+
+def test_get_inventory_reports_stock_per_location(client, valid_headers):
+    response = client.get("/api/v1/inventory/Parafuso M8", headers=valid_headers)
+
+    data = response.json()
+    assert data["locations"] == {"Depósito": 10, "Prateleira": 5}
+    assert data["quantity"] == sum(data["locations"].values())
+
+
+def test_record_movement_returns_422_when_stock_would_be_negative(
+    client, valid_headers
+):
+    response = client.post(
+        "/api/v1/inventory/Parafuso M8/movements",
+        headers=valid_headers,
+        json={"delta": -16},
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("delta", [3_000_000_000, 2_147_483_640])
+def test_record_movement_returns_422_when_stock_would_overflow_history(
+    client, valid_headers, delta
+):
+    response = client.post(
+        "/api/v1/inventory/Broca 6mm/movements",
+        headers=valid_headers,
+        json={"delta": delta},
+    )
+
+    assert response.status_code == 422
+    item = client.get("/api/v1/inventory/Broca 6mm", headers=valid_headers).json()
+    assert item["quantity"] == 45
+
+
+def test_record_movement_returns_404_for_nonexistent_product(client, valid_headers):
+    response = client.post(
+        "/api/v1/inventory/ProdutoInexistente/movements",
+        headers=valid_headers,
+        json={"delta": 5},
+    )
+
+    assert response.status_code == 404
+
+
+def test_history_returns_movements_in_time_range(client):
+    headers = {"X-Tenant-ID": "LojaC"}
+    for delta in (-3, 7):
+        client.post(
+            "/api/v1/inventory/Alicate/movements",
+            headers=headers,
+            json={"delta": delta},
+        )
+
+    response = client.get("/api/v1/inventory/Alicate/history", headers=headers)
+
+    assert response.status_code == 200
+    history = response.json()
+    assert [movement["delta"] for movement in history[-2:]] == [-3, 7]
+    assert history[-1]["quantity"] == 22
+
+    since_last = client.get(
+        "/api/v1/inventory/Alicate/history",
+        headers=headers,
+        params={"from": history[-1]["timestamp"]},
+    )
+    assert [movement["delta"] for movement in since_last.json()] == [7]
+
+
+def test_history_returns_404_for_nonexistent_product(client, valid_headers):
+    response = client.get(
+        "/api/v1/inventory/ProdutoInexistente/history", headers=valid_headers
+    )
+
+    assert response.status_code == 404
+
+
+# --- GET /inventory/alerts/predicted-stockout ---
+
+
+def test_predicted_stockout_is_sorted_by_urgency(client):
+    headers = {"X-Tenant-ID": "LojaB"}
+    for product_name, delta in [
+        ("Martelo", -1),
+        ("Arruela de Pressão", -10),
+        ("Martelo", -1),
+        ("Arruela de Pressão", -10),
+    ]:
+        client.post(
+            f"/api/v1/inventory/{product_name}/movements",
+            headers=headers,
+            json={"delta": delta},
+        )
+
+    response = client.get(
+        "/api/v1/inventory/alerts/predicted-stockout", headers=headers
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["product_name"] for item in data] == [
+        "Martelo",
+        "Arruela de Pressão",
+    ]
+    days = [item["days_until_stockout"] for item in data]
+    assert days == sorted(days)
+
+
+def test_inventory_item_has_no_stockout_estimate_without_consumption(
+    client, valid_headers
+):
+    response = client.get("/api/v1/inventory/Parafuso M8", headers=valid_headers)
+
+    assert response.json()["days_until_stockout"] is None
+
+
+# --- GET /inventory/changes ---
+
+
+def test_changes_since_listed_version_returns_only_changed_products(
+    client, valid_headers
+):
+    listing = client.get("/api/v1/inventory", headers=valid_headers)
+    version = int(listing.headers["X-Inventory-Version"])
+    client.post(
+        "/api/v1/inventory/Broca 6mm/movements",
+        headers=valid_headers,
+        json={"delta": -5},
+    )
+    client.post(
+        "/api/v1/inventory/Broca 6mm/movements",
+        headers=valid_headers,
+        json={"delta": -5},
+    )
+
+    response = client.get(
+        "/api/v1/inventory/changes", params={"since": version}, headers=valid_headers
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["resync_required"] is False
+    assert data["version"] == version + 2
+    assert [item["product_name"] for item in data["changed"]] == ["Broca 6mm"]
+    assert data["changed"][0]["quantity"] == 35
+    assert data["added"] == []
+    assert data["removed"] == []
+
+
+def test_changes_at_current_version_are_empty(client, valid_headers):
+    response = client.get(
+        "/api/v1/inventory/changes", params={"since": 0}, headers=valid_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["changed"] == []
+    assert response.json()["resync_required"] is False
+
+
+def test_changes_require_resync_when_version_was_evicted(
+    client, valid_headers, monkeypatch
+):
+    monkeypatch.setattr(INVENTORY_CHANGES, "capacity_per_tenant", 2)
+    for _ in range(3):
+        client.post(
+            "/api/v1/inventory/Broca 6mm/movements",
+            headers=valid_headers,
+            json={"delta": -1},
+        )
+
+    evicted = client.get(
+        "/api/v1/inventory/changes", params={"since": 0}, headers=valid_headers
+    )
+    retained = client.get(
+        "/api/v1/inventory/changes", params={"since": 1}, headers=valid_headers
+    )
+
+    assert evicted.json()["resync_required"] is True
+    assert evicted.json()["version"] == 3
+    assert retained.json()["resync_required"] is False
+    assert len(retained.json()["changed"]) == 1
+
+
+def test_changes_ahead_of_current_version_require_resync(client, valid_headers):
+    response = client.get(
+        "/api/v1/inventory/changes", params={"since": 99}, headers=valid_headers
+    )
+
+    assert response.json()["resync_required"] is True
@@ -0,0 +1,81 @@
+from app.repositories.change_log import ChangeKind, InventoryChangeLog
+
+
+def test_changes_are_collapsed_per_product():
+    change_log = InventoryChangeLog()
+    change_log.record("tenant_1", 1, "Produto A", ChangeKind.CHANGED)
+    change_log.record("tenant_1", 2, "Produto A", ChangeKind.CHANGED)
+    change_log.record("tenant_1", 3, "Produto B", ChangeKind.ADDED)
+    change_log.record("tenant_1", 4, "Produto B", ChangeKind.CHANGED)
+    change_log.record("tenant_1", 5, "Produto C", ChangeKind.REMOVED)
+
+    change_set = change_log.changes_since("tenant_1", 0, 5)
+
+    assert change_set.changed == ["Produto A"]
+    assert change_set.added == ["Produto B"]
+    assert change_set.removed == ["Produto C"]
+    assert change_set.version == 5
+
+
+def test_product_added_and_removed_after_since_is_omitted():
+    change_log = InventoryChangeLog()
+    change_log.record("tenant_1", 1, "Produto A", ChangeKind.ADDED)
+    change_log.record("tenant_1", 2, "Produto A", ChangeKind.REMOVED)
+
+    change_set = change_log.changes_since("tenant_1", 0, 2)
+
+    assert (change_set.added, change_set.changed, change_set.removed) == ([], [], [])
+
+
+def test_product_removed_and_readded_is_changed():
+    change_log = InventoryChangeLog()
+    change_log.record("tenant_1", 1, "Produto A", ChangeKind.REMOVED)
+    change_log.record("tenant_1", 2, "Produto A", ChangeKind.ADDED)
+
+    assert change_log.changes_since("tenant_1", 0, 2).changed == ["Produto A"]
+
+
+def test_only_changes_after_since_are_returned():
+    change_log = InventoryChangeLog()
+    change_log.record("tenant_1", 1, "Produto A", ChangeKind.CHANGED)
+    change_log.record("tenant_1", 2, "Produto B", ChangeKind.CHANGED)
+
+    assert change_log.changes_since("tenant_1", 1, 2).changed == ["Produto B"]
+
+
+def test_evicted_versions_require_resync():
+    change_log = InventoryChangeLog(capacity_per_tenant=2)
+    for version in range(1, 5):
+        change_log.record("tenant_1", version, "Produto A", ChangeKind.CHANGED)
+
+    assert change_log.changes_since("tenant_1", 1, 4).resync_required is True
+    assert change_log.changes_since("tenant_1", 2, 4).resync_required is False
+
+
+def test_tenants_are_isolated():
+    change_log = InventoryChangeLog()
+    change_log.record("tenant_1", 1, "Produto A", ChangeKind.CHANGED)
+
+    change_set = change_log.changes_since("tenant_2", 0, 0)
+
+    assert change_set.changed == []
+    assert change_set.resync_required is False
+
+
+def test_reset_requires_resync_before_imported_version():
+    change_log = InventoryChangeLog()
+    change_log.record("tenant_1", 1, "Produto A", ChangeKind.CHANGED)
+
+    change_log.reset("tenant_1", 7)
+
+    assert change_log.changes_since("tenant_1", 1, 7).resync_required is True
+    assert change_log.changes_since("tenant_1", 7, 7).resync_required is False
+
+
+def test_non_increasing_version_restarts_history():
+    change_log = InventoryChangeLog()
+    change_log.record("tenant_1", 3, "Produto A", ChangeKind.CHANGED)
+
+    change_log.record("tenant_1", 1, "Produto B", ChangeKind.CHANGED)
+
+    assert change_log.changes_since("tenant_1", 0, 1).changed == ["Produto B"]
@@ -0,0 +1,133 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import content_negotiation
+from app.middleware.content_negotiation import (
+    ContentNegotiationMiddleware,
+    EncodedBodyCache,
+    negotiate_encoding,
+    negotiate_media_type,
+)
+
+CATALOG = [
+    {"product_name": f"Produto {index}", "quantity": index} for index in range(200)
+]
+
+
+class CountingCache(EncodedBodyCache):
+    def __init__(self):
+        super().__init__()
+        self.puts = 0
+
+    def put(self, key, digest, body):
+        self.puts += 1
+        super().put(key, digest, body)
+
+
+@pytest.fixture
+def cache():
+    return CountingCache()
+
+
+@pytest.fixture
+def client(cache):
+    app = FastAPI()
+    app.add_middleware(ContentNegotiationMiddleware, minimum_size=500, cache=cache)
+
+    @app.get("/catalog")
+    async def catalog():
+        return CATALOG
+
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"["
+            yield b",".join(json.dumps(item).encode() for item in CATALOG)
+            yield b"]"
+
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def fake_msgpack(monkeypatch):
+    class FakeMsgpack:
+        @staticmethod
+        def packb(payload, use_bin_type=True):
+            return b"MSGPACK" + json.dumps(payload).encode()
+
+    monkeypatch.setitem(content_negotiation._OPTIONAL_MODULES, "msgpack", FakeMsgpack)
+
+
+def test_negotiate_encoding_respects_quality_values():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+
+
+def test_negotiate_media_type_falls_back_to_json_when_library_is_missing(
+    monkeypatch,
+):
+    monkeypatch.setitem(content_negotiation._OPTIONAL_MODULES, "cbor2", None)
+
+    assert negotiate_media_type("application/cbor") is None
+
+
+def test_negotiate_media_type_prefers_highest_quality(fake_msgpack):
+    assert negotiate_media_type("application/msgpack") == "application/msgpack"
+    assert (
+        negotiate_media_type("application/json, application/msgpack;q=0.5") is None
+    )
+
+
+def test_large_json_response_is_gzipped(client):
+    response = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(json.dumps(CATALOG))
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == CATALOG
+
+
+def test_small_response_is_not_compressed(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"status": "ok"}
+
+
+def test_unchanged_body_is_served_from_cache(client, cache):
+    first = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+
+    assert cache.puts == 1
+    assert first.content == second.content
+
+
+def test_streaming_response_is_compressed_incrementally(client):
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert json.loads(gzip.decompress(raw)) == CATALOG
+
+
+def test_msgpack_is_served_when_accepted(client, fake_msgpack):
+    response = client.get(
+        "/catalog",
+        headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"},
+    )
+
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.content.startswith(b"MSGPACK")
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.diagnostics.lag import EventLoopLagMonitor
+from app.diagnostics.profiler import sample_stacks
+from app.diagnostics.setup import DiagnosticsSettings, configure_diagnostics
+from app.diagnostics.timing import TimedRoute
+from app.main import app as main_app
+from app.services.health import HEALTH_MONITOR
+from app.startup import lifespan
+
+
+@pytest.fixture
+def diagnostics_app(monkeypatch):
+    """Aplicação mínima com o diagnóstico habilitado."""
+    # Restaura a configuração do monitor de atraso compartilhado ao final
+    lag_monitor = HEALTH_MONITOR.lag_monitor
+    monkeypatch.setattr(lag_monitor, "threshold", lag_monitor.threshold)
+    monkeypatch.setattr(lag_monitor, "report_stalls", lag_monitor.report_stalls)
+    app = FastAPI(lifespan=lifespan)
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/slow")
+    def slow_endpoint():
+        time.sleep(0.05)
+        return {"status": "ok"}
+
+    @router.get("/fast")
+    async def fast_endpoint():
+        return {"status": "ok"}
+
+    app.include_router(router)
+    configure_diagnostics(
+        app, DiagnosticsSettings(slow_request_ms=30, token="segredo")
+    )
+    with TestClient(app) as client:
+        yield client
+
+
+def test_slow_request_is_logged_with_phases(diagnostics_app, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.diagnostics.timing"):
+        response = diagnostics_app.get("/slow")
+
+    assert response.status_code == 200
+    record = next(r for r in caplog.records if "Requisição lenta" in r.message)
+    assert "GET /slow 200" in record.message
+    assert set(record.phases) >= {"dependencies", "service", "serialization"}
+    assert record.phases["service"] >= 50
+
+
+def test_fast_request_is_not_logged(diagnostics_app, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.diagnostics.timing"):
+        diagnostics_app.get("/fast")
+
+    assert not [r for r in caplog.records if "Requisição lenta" in r.message]
+
+
+def test_profile_returns_collapsed_stacks(diagnostics_app):
+    response = diagnostics_app.get(
+        "/diagnostics/profile",
+        params={"seconds": 0.2, "interval_ms": 5},
+        headers={"X-Diagnostics-Token": "segredo"},
+    )
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines
+    for line in lines:
+        stack, _, count = line.rpartition(" ")
+        assert ";" in stack
+        assert int(count) > 0
+
+
+def test_event_loop_endpoint_requires_token(diagnostics_app):
+    assert diagnostics_app.get("/diagnostics/event-loop").status_code == 403
+
+    response = diagnostics_app.get(
+        "/diagnostics/event-loop", headers={"X-Diagnostics-Token": "segredo"}
+    )
+    assert response.status_code == 200
+    assert response.json()["threshold_ms"] == 100
+
+
+def test_diagnostics_share_the_readiness_lag_monitor(diagnostics_app):
+    diagnostics = diagnostics_app.app.state.diagnostics
+
+    assert diagnostics.lag_monitor is HEALTH_MONITOR.lag_monitor
+    assert diagnostics.lag_monitor.report_stalls is True
+
+
+def test_diagnostics_require_token(monkeypatch):
+    monkeypatch.setenv("STOCKWISE_DIAGNOSTICS", "1")
+    monkeypatch.delenv("STOCKWISE_DIAGNOSTICS_TOKEN", raising=False)
+
+    with pytest.raises(ValueError, match="STOCKWISE_DIAGNOSTICS_TOKEN"):
+        DiagnosticsSettings.from_env()
+
+    monkeypatch.setenv("STOCKWISE_DIAGNOSTICS_TOKEN", "segredo")
+    assert DiagnosticsSettings.from_env().token == "segredo"
+
+
+def test_diagnostics_disabled_by_default():
+    client = TestClient(main_app)
+
+    assert client.get("/diagnostics/event-loop").status_code == 404
+    assert not hasattr(main_app.state, "diagnostics")
+
+
+def test_lag_monitor_detects_blocking_call(caplog):
+    def blocking_service_call():
+        time.sleep(0.15)
+
+    async def scenario():
+        monitor = EventLoopLagMonitor(interval=0.01, threshold=0.05)
+        await monitor.start()
+        await asyncio.sleep(0.03)
+        blocking_service_call()
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        return monitor.stats()
+
+    with caplog.at_level(logging.WARNING, logger="app.diagnostics.lag"):
+        stats = asyncio.run(scenario())
+
+    assert stats["stalls"] >= 1
+    assert stats["max_ms"] >= 100
+    assert any("blocking_service_call" in r.message for r in caplog.records)
+
+
+def test_sample_stacks_captures_other_threads():
+    stop = threading.Event()
+
+    def busy_worker():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_worker, name="busy")
+    worker.start()
+    try:
+        collapsed = sample_stacks(0.1, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert any(
+        line.startswith("busy;") and "busy_worker" in line
+        for line in collapsed.splitlines()
+    )
@@ -0,0 +1,266 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import app.dependencies.inventory_dependencies as inventory_dependencies
+import app.startup as startup
+from app.main import app
+from app.models.schemas import RestockStatus
+from app.services.erp import (
+    CircuitBreaker,
+    CircuitState,
+    ErpClient,
+    OpenCircuitPolicy,
+)
+from benchmarks.fake_erp import FakeErp
+
+
+@pytest.fixture
+def erp():
+    fake = FakeErp().start()
+    yield fake
+    fake.close()
+
+
+def run(erp_client, *requests):
+    """Executa as solicitações em paralelo e fecha o cliente."""
+
+    async def scenario():
+        try:
+            return await asyncio.gather(
+                *[erp_client.request_restock(*request) for request in requests]
+            )
+        finally:
+            await erp_client.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_restock_is_sent_to_erp(erp):
+    [result] = run(ErpClient(base_url=erp.url), ("LojaA", "Parafuso M8", 10))
+
+    assert result.status == RestockStatus.SUCCESS
+    assert erp.orders == [
+        {"tenant_id": "LojaA", "product_name": "Parafuso M8", "quantity": 10}
+    ]
+
+
+def test_without_erp_url_restock_is_simulated():
+    [result] = run(ErpClient(), ("LojaA", "Parafuso M8", 10))
+
+    assert result.status == RestockStatus.SUCCESS
+
+
+def test_slow_erp_times_out(erp):
+    erp.degrade(latency=0.5)
+    erp_client = ErpClient(
+        base_url=erp.url, timeout=0.05, open_circuit_policy=OpenCircuitPolicy.FAIL
+    )
+
+    start = time.perf_counter()
+    [result] = run(erp_client, ("LojaA", "Parafuso M8", 10))
+
+    assert result.status == RestockStatus.FAILED
+    assert "Timeout" in result.message
+    assert time.perf_counter() - start < 0.4
+
+
+def test_timeout_limits_the_whole_call():
+    async def trickle():
+        for _ in range(10):
+            await asyncio.sleep(0.03)
+            yield b" "
+
+    def handler(request):
+        return httpx.Response(201, content=trickle())
+
+    erp_client = ErpClient(
+        base_url="http://erp.test",
+        timeout=0.1,
+        open_circuit_policy=OpenCircuitPolicy.FAIL,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    start = time.perf_counter()
+    [result] = run(erp_client, ("LojaA", "Parafuso M8", 10))
+
+    assert result.status == RestockStatus.FAILED
+    assert "Timeout" in result.message
+    assert time.perf_counter() - start < 0.25
+
+
+def test_open_circuit_fails_fast_without_calling_erp(erp):
+    erp.degrade(error_rate=1.0)
+    erp_client = ErpClient(
+        base_url=erp.url,
+        failure_threshold=2,
+        open_circuit_policy=OpenCircuitPolicy.FAIL,
+    )
+
+    results = [run(erp_client, ("LojaA", "Parafuso M8", 10))[0] for _ in range(4)]
+
+    assert [result.status for result in results] == [RestockStatus.FAILED] * 4
+    assert erp.calls == 2
+    assert erp_client.breaker.state is CircuitState.OPEN
+    assert "circuito aberto" in results[-1].message
+
+
+def test_open_circuit_queues_and_flushes_when_erp_recovers(erp):
+    erp.degrade(error_rate=1.0)
+    erp_client = ErpClient(base_url=erp.url, failure_threshold=1, reset_timeout=0.05)
+
+    first, second = run(
+        erp_client, ("LojaA", "Parafuso M8", 10), ("LojaB", "Martelo", 2)
+    )
+    assert (first.status, second.status) == (RestockStatus.PENDING,) * 2
+    assert erp_client.pending_count() == 2
+
+    erp.degrade(error_rate=0.0)
+    time.sleep(0.05)
+
+    async def flush():
+        try:
+            return await erp_client.flush_pending()
+        finally:
+            await erp_client.stop()
+
+    assert asyncio.run(flush()) == 2
+
+    assert erp_client.pending_count() == 0
+    assert erp_client.breaker.state is CircuitState.CLOSED
+    assert [order["product_name"] for order in erp.orders] == [
+        "Parafuso M8",
+        "Martelo",
+    ]
+
+
+def test_bulkhead_limits_concurrent_calls_per_tenant(erp):
+    erp.degrade(latency=0.2)
+    erp_client = ErpClient(base_url=erp.url, max_concurrency_per_tenant=1)
+
+    first, second, other_tenant = run(
+        erp_client,
+        ("LojaA", "Parafuso M8", 10),
+        ("LojaA", "Martelo", 1),
+        ("LojaB", "Parafuso M8", 10),
+    )
+
+    assert first.status == RestockStatus.SUCCESS
+    assert second.status == RestockStatus.FAILED
+    assert "simultâneas" in second.message
+    assert erp_client.pending_count() == 0
+    assert other_tenant.status == RestockStatus.SUCCESS
+    assert erp_client.breaker.state is CircuitState.CLOSED
+
+
+def test_rejected_request_does_not_open_circuit(erp):
+    erp.degrade(error_rate=1.0)
+    erp.error_status = 422
+    erp_client = ErpClient(base_url=erp.url, failure_threshold=1)
+
+    [result] = run(erp_client, ("LojaA", "Parafuso M8", 10))
+
+    assert result.status == RestockStatus.FAILED
+    assert "HTTP 422" in result.message
+    assert erp_client.breaker.state is CircuitState.CLOSED
+    assert erp_client.pending_count() == 0
+
+
+def test_half_open_circuit_allows_a_single_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=10, clock=lambda: now[0]
+    )
+    breaker.record_failure()
+    assert breaker.allow_request() is False
+
+    now[0] = 10.0
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    now[0] = 20.0
+    assert breaker.allow_request() is True
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.fixture
+def api_erp_client(erp, monkeypatch):
+    """Aponta a API para o ERP falso, recusando na hora com o ERP fora do ar."""
+    erp_client = ErpClient(
+        base_url=erp.url,
+        failure_threshold=1,
+        reset_timeout=0,
+        open_circuit_policy=OpenCircuitPolicy.FAIL,
+    )
+    monkeypatch.setattr(inventory_dependencies, "ERP_CLIENT", erp_client)
+    monkeypatch.setattr(startup, "ERP_CLIENT", erp_client)
+    return erp_client
+
+
+def test_failed_restock_returns_503_and_can_be_retried(erp, api_erp_client):
+    headers = {"X-Tenant-ID": "LojaA", "Idempotency-Key": "pedido-1"}
+    payload = {"product_name": "Parafuso M8", "quantity": 10}
+
+    with TestClient(app) as client:
+        erp.degrade(error_rate=1.0)
+        failed = client.post(
+            "/api/v1/inventory/restock", json=payload, headers=headers
+        )
+        erp.degrade(error_rate=0.0)
+        retried = client.post(
+            "/api/v1/inventory/restock", json=payload, headers=headers
+        )
+
+    assert failed.status_code == 503
+    assert failed.json()["status"] == "failed"
+    assert retried.status_code == 201
+    assert retried.json()["status"] == "success"
+    assert "Idempotent-Replayed" not in retried.headers
+    assert len(erp.orders) == 1
+
+
+def test_retry_after_timeout_does_not_duplicate_erp_order(erp, api_erp_client):
+    api_erp_client.timeout = 0.05
+    headers = {"X-Tenant-ID": "LojaA", "Idempotency-Key": "pedido-lento"}
+    payload = {"product_name": "Parafuso M8", "quantity": 10}
+
+    with TestClient(app) as client:
+        # O ERP registra o pedido, mas responde depois do timeout do cliente
+        erp.degrade(latency=0.2)
+        failed = client.post(
+            "/api/v1/inventory/restock", json=payload, headers=headers
+        )
+        time.sleep(0.3)
+        erp.degrade(latency=0.0)
+        retried = client.post(
+            "/api/v1/inventory/restock", json=payload, headers=headers
+        )
+
+    assert failed.status_code == 503
+    assert "Timeout" in failed.json()["message"]
+    assert retried.status_code == 201
+    assert erp.calls == 2
+    assert len(erp.orders) == 1
+
+
+def test_pending_restock_returns_202(erp, api_erp_client):
+    api_erp_client.open_circuit_policy = OpenCircuitPolicy.QUEUE
+    erp.degrade(error_rate=1.0)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/inventory/restock",
+            json={"product_name": "Parafuso M8", "quantity": 10},
+            headers={"X-Tenant-ID": "LojaA"},
+        )
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+    assert api_erp_client.pending_count() == 1
@@ -0,0 +1,91 @@
+import pytest
+
+from app.services.forecasting import SECONDS_PER_DAY, ConsumptionForecaster
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def forecaster(clock):
+    return ConsumptionForecaster(smoothing_days=1.0, clock=clock)
+
+
+def test_first_consumption_event_is_spread_over_smoothing_window(forecaster):
+    forecaster.observe("tenant_1", "Produto A", -10, timestamp=0.0)
+
+    assert forecaster.get_rate("tenant_1", "Produto A") == pytest.approx(10.0)
+    assert forecaster.days_until_stockout("tenant_1", "Produto A", 100) == 10.0
+
+
+def test_rate_is_zero_without_consumption_events(forecaster):
+    forecaster.observe("tenant_1", "Produto A", 10, timestamp=0.0)
+
+    assert forecaster.get_rate("tenant_1", "Produto A") == 0.0
+    assert forecaster.days_until_stockout("tenant_1", "Produto A", 100) is None
+
+
+def test_rate_converges_to_steady_consumption(forecaster, clock):
+    for day in range(30):
+        forecaster.observe(
+            "tenant_1", "Produto A", -10, timestamp=day * SECONDS_PER_DAY
+        )
+    clock.now = 29 * SECONDS_PER_DAY
+
+    assert forecaster.get_rate("tenant_1", "Produto A") == pytest.approx(10, rel=0.01)
+    assert forecaster.days_until_stockout("tenant_1", "Produto A", 50) == pytest.approx(
+        5, rel=0.01
+    )
+
+
+def test_rate_decays_while_product_has_no_consumption(forecaster, clock):
+    for day in range(30):
+        forecaster.observe(
+            "tenant_1", "Produto A", -10, timestamp=day * SECONDS_PER_DAY
+        )
+
+    clock.now = 30 * SECONDS_PER_DAY
+    assert forecaster.get_rate("tenant_1", "Produto A") == pytest.approx(
+        10 * 0.3679, rel=0.01
+    )
+
+    clock.now = 60 * SECONDS_PER_DAY
+    assert forecaster.get_rate("tenant_1", "Produto A") == 0.0
+    assert forecaster.get_tenant_rates("tenant_1") == {}
+    assert forecaster.days_until_stockout("tenant_1", "Produto A", 100) is None
+
+
+def test_stock_increases_do_not_change_rate(forecaster):
+    forecaster.observe("tenant_1", "Produto A", -5, timestamp=0.0)
+    forecaster.observe("tenant_1", "Produto A", -5, timestamp=SECONDS_PER_DAY)
+    rate = forecaster.get_rate("tenant_1", "Produto A")
+
+    forecaster.observe("tenant_1", "Produto A", 100, timestamp=2 * SECONDS_PER_DAY)
+
+    assert forecaster.get_rate("tenant_1", "Produto A") == rate
+
+
+def test_simultaneous_events_do_not_divide_by_zero(forecaster, clock):
+    forecaster.observe("tenant_1", "Produto A", -5, timestamp=10.0)
+    forecaster.observe("tenant_1", "Produto A", -5, timestamp=10.0)
+    clock.now = 10.0
+
+    assert forecaster.get_rate("tenant_1", "Produto A") == pytest.approx(10.0)
+
+
+def test_get_tenant_rates_only_returns_products_with_consumption(forecaster):
+    forecaster.observe("tenant_1", "Produto A", -5, timestamp=0.0)
+    forecaster.observe("tenant_1", "Produto B", 5, timestamp=0.0)
+    forecaster.observe("tenant_2", "Produto C", -5, timestamp=0.0)
+
+    assert set(forecaster.get_tenant_rates("tenant_1")) == {"Produto A"}
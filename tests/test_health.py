@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.diagnostics.lag import EventLoopLagMonitor
+from app.main import app
+from app.services.health import HealthMonitor
+
+
+def test_refresh_reports_checks_and_queues():
+    monitor = HealthMonitor()
+    monitor.register_check("storage", lambda: {"backend": "memory"})
+    monitor.register_queue("restock", lambda: 3, max_depth=10)
+
+    snapshot = asyncio.run(monitor.refresh())
+
+    assert snapshot["status"] == "ready"
+    assert snapshot["checks"]["storage"] == {"status": "ok", "backend": "memory"}
+    assert snapshot["queues"]["restock"] == {
+        "status": "ok",
+        "depth": 3,
+        "max_depth": 10,
+    }
+    assert snapshot["event_loop"]["status"] == "ok"
+
+
+def test_failing_check_marks_not_ready():
+    def unreachable():
+        raise ConnectionError("backend indisponível")
+
+    monitor = HealthMonitor()
+    monitor.register_check("storage", unreachable)
+
+    snapshot = asyncio.run(monitor.refresh())
+
+    assert snapshot["status"] == "not_ready"
+    assert snapshot["checks"]["storage"] == {
+        "status": "error",
+        "detail": "backend indisponível",
+    }
+
+
+def test_saturated_queue_marks_not_ready():
+    monitor = HealthMonitor()
+    monitor.register_queue("restock", lambda: 10, max_depth=10)
+
+    snapshot = asyncio.run(monitor.refresh())
+
+    assert snapshot["status"] == "not_ready"
+    assert snapshot["queues"]["restock"]["status"] == "saturated"
+
+
+def test_slow_check_times_out():
+    def hanging():
+        time.sleep(0.5)
+        return {}
+
+    monitor = HealthMonitor(check_timeout=0.05)
+    monitor.register_check("storage", hanging)
+
+    snapshot = asyncio.run(monitor.refresh())
+
+    assert snapshot["checks"]["storage"]["status"] == "error"
+
+
+def test_recent_event_loop_lag_marks_not_ready():
+    lag_monitor = EventLoopLagMonitor(interval=0.1, report_stalls=False)
+    monitor = HealthMonitor(interval=1.0, lag_monitor=lag_monitor)
+    lag_monitor.samples.extend([0.0, 0.8] + [0.0] * 5)
+
+    snapshot = asyncio.run(monitor.refresh())
+    assert snapshot["status"] == "not_ready"
+    assert snapshot["event_loop"] == {
+        "status": "lagging",
+        "lag_ms": 800.0,
+        "max_lag_ms": 500.0,
+    }
+
+    lag_monitor.samples.extend([0.0] * 10)
+    assert asyncio.run(monitor.refresh())["event_loop"]["status"] == "ok"
+
+
+def test_snapshot_does_not_run_checks():
+    calls = []
+    monitor = HealthMonitor()
+    monitor.register_check("storage", lambda: calls.append(1) or {})
+
+    assert monitor.snapshot() == {"status": "starting"}
+    asyncio.run(monitor.refresh())
+    for _ in range(100):
+        monitor.snapshot()
+
+    assert len(calls) == 1
+
+
+def test_readiness_and_liveness_probes():
+    with TestClient(app) as client:
+        live = client.get("/health/live")
+        ready = client.get("/health/ready")
+
+    assert live.status_code == 200
+    assert live.json() == {"status": "alive"}
+    assert ready.status_code == 200
+    body = ready.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["storage"]["status"] == "ok"
+    assert "movement_log" in body["queues"]
+    assert "lag_ms" in body["event_loop"]
+
+
+def test_readiness_is_unavailable_before_startup():
+    client = TestClient(app)
+
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "starting"}
@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from app.services.idempotency import IdempotencyKeyReusedError, IdempotencyStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store(clock):
+    return IdempotencyStore(ttl_seconds=60, max_entries_per_tenant=2, clock=clock)
+
+
+def make_operation(calls, result="ok", delay=0.0):
+    async def operation():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        return result
+
+    return operation
+
+
+def test_replay_returns_stored_result_without_running_again(store):
+    calls = []
+
+    async def scenario():
+        first = await store.execute("tenant_1", "key", "fp", make_operation(calls))
+        second = await store.execute("tenant_1", "key", "fp", make_operation(calls))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == ("ok", False)
+    assert second == ("ok", True)
+    assert len(calls) == 1
+
+
+def test_concurrent_duplicates_share_a_single_execution(store):
+    calls = []
+
+    async def scenario():
+        return await asyncio.gather(
+            *[
+                store.execute(
+                    "tenant_1", "key", "fp", make_operation(calls, delay=0.01)
+                )
+                for _ in range(5)
+            ]
+        )
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert [replayed for _, replayed in results].count(False) == 1
+
+
+def test_keys_are_scoped_by_tenant(store):
+    calls = []
+
+    async def scenario():
+        await store.execute("tenant_1", "key", "fp", make_operation(calls))
+        await store.execute("tenant_2", "key", "fp", make_operation(calls))
+
+    asyncio.run(scenario())
+
+    assert len(calls) == 2
+
+
+def test_expired_results_are_evicted(store, clock):
+    calls = []
+
+    async def scenario():
+        await store.execute("tenant_1", "key", "fp", make_operation(calls))
+        clock.now = 61
+        return await store.execute("tenant_1", "key", "fp", make_operation(calls))
+
+    _, replayed = asyncio.run(scenario())
+
+    assert replayed is False
+    assert len(calls) == 2
+
+
+def test_size_cap_evicts_oldest_entries(store):
+    calls = []
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await store.execute("tenant_1", key, "fp", make_operation(calls))
+        return await store.execute("tenant_1", "a", "fp", make_operation(calls))
+
+    _, replayed = asyncio.run(scenario())
+
+    assert replayed is False
+    assert len(calls) == 4
+
+
+def test_reusing_key_with_different_payload_raises(store):
+    async def scenario():
+        await store.execute("tenant_1", "key", "fp-1", make_operation([]))
+        await store.execute("tenant_1", "key", "fp-2", make_operation([]))
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        asyncio.run(scenario())
+
+
+def test_failed_executions_are_not_stored(store):
+    calls = []
+
+    async def failing():
+        calls.append("fail")
+        raise RuntimeError("ERP indisponível")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.execute("tenant_1", "key", "fp", failing)
+        return await store.execute("tenant_1", "key", "fp", make_operation(calls))
+
+    result, replayed = asyncio.run(scenario())
+
+    assert (result, replayed) == ("ok", False)
+    assert calls == ["fail", "ok"]
+
+
+def test_cancelled_leader_hands_execution_to_a_waiting_duplicate(store):
+    calls = []
+
+    async def scenario():
+        leader = asyncio.create_task(
+            store.execute("tenant_1", "key", "fp", make_operation(calls, delay=0.05))
+        )
+        await asyncio.sleep(0)
+        duplicate = asyncio.create_task(
+            store.execute("tenant_1", "key", "fp", make_operation(calls, delay=0.01))
+        )
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await duplicate
+
+    result, replayed = asyncio.run(scenario())
+
+    assert (result, replayed) == ("ok", False)
+    assert len(calls) == 2
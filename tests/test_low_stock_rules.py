@@ -0,0 +1,139 @@
+import pytest
+from pydantic import ValidationError
+
+from app.models.schemas import AlertSeverity, LowStockRule, LowStockRulesRequest
+from app.services.low_stock_rules import (
+    DEFAULT_LOW_STOCK_RULE,
+    CompiledRuleSet,
+    LowStockRuleStore,
+    compile_rule,
+)
+
+INVENTORY = {
+    "Parafuso M8": {"category": "Fixadores", "quantity": 60, "min_stock": 50},
+    "Porca Sextavada": {"category": "Fixadores", "quantity": 61, "min_stock": 50},
+    "Broca 6mm": {"category": "Ferramentas", "quantity": 0, "min_stock": 20},
+    "Martelo": {"category": "Ferramentas", "quantity": 9, "min_stock": 10},
+    "Fita Isolante": {"quantity": 100, "min_stock": 40},
+}
+
+
+def test_ratio_is_compared_exactly():
+    # 50 * 1.2 em ponto flutuante é 60.00000000000001
+    predicate = compile_rule(LowStockRule(id="r", min_stock_ratio=1.2))
+
+    assert predicate(59, 50) is True
+    assert predicate(60, 50) is False
+
+
+def test_rule_with_both_conditions_requires_both():
+    predicate = compile_rule(LowStockRule(id="r", min_stock_ratio=1.0, max_quantity=5))
+
+    assert predicate(5, 10) is True
+    assert predicate(6, 10) is False
+    assert predicate(5, 5) is False
+
+
+def test_rule_without_threshold_is_rejected():
+    with pytest.raises(ValidationError):
+        LowStockRule(id="r", category="Fixadores")
+
+
+def test_duplicated_rule_ids_are_rejected():
+    rule = LowStockRule(id="r", max_quantity=0)
+
+    with pytest.raises(ValidationError):
+        LowStockRulesRequest(rules=[rule, rule])
+
+
+def test_highest_severity_match_wins_and_category_scopes_rules():
+    rule_set = CompiledRuleSet(
+        [
+            LowStockRule(id="baixo", min_stock_ratio=1.0),
+            LowStockRule(
+                id="fixadores",
+                severity=AlertSeverity.INFO,
+                category="Fixadores",
+                min_stock_ratio=1.25,
+            ),
+            LowStockRule(id="zerado", severity=AlertSeverity.CRITICAL, max_quantity=0),
+        ]
+    )
+
+    matches = {
+        product_name: rule.id for product_name, _, rule in rule_set.evaluate(INVENTORY)
+    }
+
+    assert matches == {
+        "Parafuso M8": "fixadores",
+        "Porca Sextavada": "fixadores",
+        "Broca 6mm": "zerado",
+        "Martelo": "baixo",
+    }
+
+
+def test_ties_follow_declaration_order():
+    rule_set = CompiledRuleSet(
+        [
+            LowStockRule(id="primeira", max_quantity=10),
+            LowStockRule(id="segunda", min_stock_ratio=1.0),
+        ]
+    )
+
+    [(_, _, rule)] = rule_set.evaluate({"Martelo": INVENTORY["Martelo"]})
+
+    assert rule.id == "primeira"
+
+
+def test_store_uses_default_rule_until_tenant_sets_rules():
+    store = LowStockRuleStore()
+
+    assert store.get_rules("LojaA") == (0, [DEFAULT_LOW_STOCK_RULE])
+
+    rules = [LowStockRule(id="zerado", max_quantity=0)]
+    assert store.set_rules("LojaA", rules) == 1
+    assert store.get_rules("LojaA") == (1, rules)
+    assert store.get_rules("LojaB") == (0, [DEFAULT_LOW_STOCK_RULE])
+
+
+def test_setting_rules_discards_cached_matches():
+    store = LowStockRuleStore()
+    store.put_cached_matches("LojaA", (0, 3), [])
+
+    assert store.get_cached_matches("LojaA", (0, 3)) == []
+    assert store.get_cached_matches("LojaA", (0, 4)) is None
+
+    store.set_rules("LojaA", [DEFAULT_LOW_STOCK_RULE])
+    assert store.get_cached_matches("LojaA", (0, 3)) is None
+
+
+def test_rules_per_category_are_built_at_compile_time():
+    general = LowStockRule(id="geral", max_quantity=0)
+    fixadores = LowStockRule(
+        id="fixadores",
+        category="Fixadores",
+        severity=AlertSeverity.CRITICAL,
+        min_stock_ratio=1.0,
+    )
+    rule_set = CompiledRuleSet([general, fixadores])
+
+    assert [rule.id for rule, _ in rule_set.rules_for("Fixadores")] == [
+        "fixadores",
+        "geral",
+    ]
+    assert [rule.id for rule, _ in rule_set.rules_for("Ferramentas")] == ["geral"]
+    assert [rule.id for rule, _ in rule_set.rules_for(None)] == ["geral"]
+    assert set(rule_set._by_category) == {"Fixadores"}
+
+
+def test_custom_rules_can_be_exported_and_discarded():
+    store = LowStockRuleStore()
+    rules = [LowStockRule(id="zerado", max_quantity=0)]
+
+    assert store.get_custom_rules("LojaA") is None
+    store.set_rules("LojaA", rules)
+    assert store.get_custom_rules("LojaA") == rules
+
+    store.discard("LojaA")
+    assert store.get_custom_rules("LojaA") is None
+    assert store.get_rules("LojaA") == (0, [DEFAULT_LOW_STOCK_RULE])
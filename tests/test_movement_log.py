@@ -0,0 +1,102 @@
+import pytest
+
+from app.repositories.movement_log import StockMovementLog
+
+
+@pytest.fixture
+def movement_log(tmp_path):
+    log = StockMovementLog(base_dir=str(tmp_path), records_per_segment=4)
+    yield log
+    log.close()
+
+
+def test_query_returns_records_in_time_range_across_segments(movement_log):
+    for timestamp in range(10):
+        movement_log.append("tenant_1", "Produto A", -1, 100 - timestamp, timestamp)
+
+    result = movement_log.query("tenant_1", "Produto A", start_ns=3, end_ns=8)
+
+    assert [record[0] for record in result] == [3, 4, 5, 6, 7, 8]
+    assert result[0] == (3, -1, 97)
+
+
+def test_query_without_bounds_returns_full_history(movement_log):
+    for timestamp in range(6):
+        movement_log.append("tenant_1", "Produto A", 1, timestamp, timestamp)
+
+    assert len(movement_log.query("tenant_1", "Produto A")) == 6
+
+
+def test_timestamps_never_go_backwards(movement_log):
+    movement_log.append("tenant_1", "Produto A", 1, 1, 100)
+    recorded = movement_log.append("tenant_1", "Produto A", 1, 2, 50)
+
+    assert recorded == 100
+    assert len(movement_log.query("tenant_1", "Produto A", start_ns=100)) == 2
+
+
+def test_flush_groups_pending_records_into_segments(movement_log, tmp_path):
+    for timestamp in range(6):
+        movement_log.append("tenant_1", "Produto A", 1, timestamp, timestamp)
+
+    movement_log.flush()
+
+    segments = list(tmp_path.rglob("*.seg"))
+    assert len(segments) == 2
+    assert sum(segment.stat().st_size for segment in segments) == 6 * 16
+
+
+def test_log_is_reloaded_from_disk(tmp_path):
+    log = StockMovementLog(base_dir=str(tmp_path), records_per_segment=4)
+    for timestamp in range(5):
+        log.append("tenant_1", "Produto A", -1, 10 - timestamp, timestamp)
+    log.close()
+
+    reloaded = StockMovementLog(base_dir=str(tmp_path), records_per_segment=4)
+    reloaded.append("tenant_1", "Produto A", 2, 7, 2)
+
+    result = reloaded.query("tenant_1", "Produto A", start_ns=4)
+    reloaded.close()
+    assert result == [(4, -1, 6), (4, 2, 7)]
+
+
+def test_streams_are_isolated_by_tenant_and_product(movement_log):
+    movement_log.append("tenant_1", "Produto A", 1, 1, 1)
+    movement_log.append("tenant_2", "Produto A", 2, 2, 1)
+
+    assert movement_log.query("tenant_1", "Produto B") == []
+    assert movement_log.query("tenant_2", "Produto A") == [(1, 2, 2)]
+
+
+def test_query_reads_pending_records_without_committing(tmp_path):
+    log = StockMovementLog(
+        base_dir=str(tmp_path), records_per_segment=4, commit_interval=60
+    )
+    for timestamp in range(6):
+        log.append("tenant_1", "Produto A", 1, timestamp, timestamp)
+
+    result = log.query("tenant_1", "Produto A", start_ns=2, end_ns=4)
+    pending = log.pending_count()
+    segments = list(tmp_path.rglob("*.seg"))
+    log.close()
+
+    assert result == [(2, 1, 2), (3, 1, 3), (4, 1, 4)]
+    assert pending == 6
+    assert segments == []
+
+
+def test_query_merges_committed_and_pending_records(tmp_path):
+    log = StockMovementLog(
+        base_dir=str(tmp_path), records_per_segment=4, commit_interval=60
+    )
+    for timestamp in range(5):
+        log.append("tenant_1", "Produto A", 1, timestamp, timestamp)
+    log.flush()
+    log.append("tenant_1", "Produto A", -1, 3, 5)
+
+    result = log.query("tenant_1", "Produto A", start_ns=3)
+    pending = log.pending_count()
+    log.close()
+
+    assert result == [(3, 1, 3), (4, 1, 4), (5, -1, 3)]
+    assert pending == 1
@@ -1,6 +1,6 @@
 import pytest
 
-from app.repositories.inventory_repository import InventoryRepository
+from app.repositories.inventory_repository import DEFAULT_LOCATION, InventoryRepository
 
 
 @pytest.fixture
@@ -81,4 +81,70 @@ def test_repository_isolates_data_between_tenants(repository):
     result_tenant_2 = repository.get_inventory("tenant_2", "Produto A")
 
     assert result_tenant_1 is not None
-    assert result_tenant_2 is None
\ No newline at end of file
+    assert result_tenant_2 is None
+
+
+def test_get_version_defaults_to_zero_for_unknown_tenant(repository):
+    assert repository.get_version("tenant_1") == 0
+
+
+def test_update_quantity_changes_product_and_bumps_version(repository):
+    result = repository.update_quantity("tenant_1", "Produto A", 42)
+
+    assert result["quantity"] == 42
+    assert repository.get_inventory("tenant_1", "Produto A")["quantity"] == 42
+    assert repository.get_version("tenant_1") == 1
+    assert repository.get_version("tenant_2") == 0
+
+
+def test_update_quantity_returns_none_for_nonexistent_product(repository):
+    assert repository.update_quantity("tenant_1", "Produto Inexistente", 1) is None
+    assert repository.get_version("tenant_1") == 0
+
+
+def test_update_quantity_adjusts_total_incrementally_per_location():
+    repository = InventoryRepository(
+        session={
+            "tenant_1": {
+                "Produto A": {
+                    "quantity": 15,
+                    "min_stock": 20,
+                    "locations": {"Depósito": 10, "Prateleira": 5},
+                },
+            },
+        }
+    )
+
+    repository.update_quantity("tenant_1", "Produto A", 2, location="Prateleira")
+    result = repository.update_quantity("tenant_1", "Produto A", 7, location="Vitrine")
+
+    assert result["locations"] == {"Depósito": 10, "Prateleira": 2, "Vitrine": 7}
+    assert result["quantity"] == 19
+
+
+def test_update_quantity_without_location_uses_primary_location():
+    repository = InventoryRepository(
+        session={
+            "tenant_1": {
+                "Produto A": {
+                    "quantity": 15,
+                    "min_stock": 20,
+                    "locations": {"Depósito": 10, "Prateleira": 5},
+                },
+            },
+        }
+    )
+
+    result = repository.update_quantity("tenant_1", "Produto A", 12)
+
+    assert result["locations"] == {"Depósito": 12, "Prateleira": 5}
+    assert result["quantity"] == 17
+
+
+def test_snapshot_inventory_is_not_affected_by_later_updates(repository):
+    snapshot = repository.snapshot_inventory("tenant_1")
+
+    repository.update_quantity("tenant_1", "Produto A", 99)
+
+    assert snapshot["Produto A"]["quantity"] == 10
+    assert snapshot["Produto A"]["locations"] == {DEFAULT_LOCATION: 10}
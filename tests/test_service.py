@@ -1,9 +1,22 @@
+import asyncio
+import json
+import threading
 from unittest.mock import Mock
 
 import pytest
 
-from app.models.schemas import RestockStatus
+from app.models.schemas import (
+    AlertSeverity,
+    LowStockRule,
+    RestockPolicy,
+    RestockStatus,
+    WebhookEventType,
+)
+from app.services.forecasting import SECONDS_PER_DAY, ConsumptionForecaster
 from app.services.inventory import InventoryService
+from app.services.low_stock_rules import CompiledRuleSet, LowStockRuleStore
+from app.services.restock_recommendations import RecommendationCache
+from app.services.single_flight import SingleFlight
 
 
 @pytest.fixture
@@ -102,8 +115,84 @@ def test_get_low_stock_items_returns_empty_list_when_no_low_stock(
     assert result == []
 
 
+def test_low_stock_rules_are_evaluated_once_per_version(
+    mock_repository, monkeypatch
+):
+    evaluations = []
+    evaluate = CompiledRuleSet.evaluate
+
+    def spy_evaluate(rule_set, inventory):
+        evaluations.append(inventory)
+        return evaluate(rule_set, inventory)
+
+    monkeypatch.setattr(CompiledRuleSet, "evaluate", spy_evaluate)
+    rule_store = LowStockRuleStore()
+    service = InventoryService(
+        tenant_id="tenant_1", repository=mock_repository, low_stock_rules=rule_store
+    )
+    mock_repository.get_version.return_value = 1
+    mock_repository.get_all_inventory.return_value = {
+        "Produto A": {"quantity": 0, "min_stock": 10},
+        "Produto B": {"category": "Frágeis", "quantity": 11, "min_stock": 10},
+        "Produto C": {"quantity": 20, "min_stock": 10},
+    }
+
+    result = service.get_low_stock_items()
+    assert [(item.product_name, item.rule_id) for item in result] == [
+        ("Produto A", "below-min-stock")
+    ]
+    assert service.get_low_stock_items() == result
+    assert len(evaluations) == 1
+
+    rule_store.set_rules(
+        "tenant_1",
+        [
+            LowStockRule(id="zerado", severity=AlertSeverity.CRITICAL, max_quantity=0),
+            LowStockRule(id="frageis", category="Frágeis", min_stock_ratio=1.5),
+        ],
+    )
+    result = service.get_low_stock_items()
+    assert [
+        (item.product_name, item.severity, item.needs_restock) for item in result
+    ] == [
+        ("Produto A", AlertSeverity.CRITICAL, True),
+        ("Produto B", AlertSeverity.WARNING, False),
+    ]
+    assert result[1].category == "Frágeis"
+    assert len(evaluations) == 2
+
+    mock_repository.get_version.return_value = 2
+    service.get_low_stock_items()
+    assert len(evaluations) == 3
+
+
+def test_cached_low_stock_alerts_report_current_stockout_forecast(mock_repository):
+    now = [0.0]
+    forecaster = ConsumptionForecaster(clock=lambda: now[0])
+    forecaster.observe("tenant_1", "Produto A", -10, timestamp=0.0)
+    service = InventoryService(
+        tenant_id="tenant_1",
+        repository=mock_repository,
+        forecaster=forecaster,
+        low_stock_rules=LowStockRuleStore(),
+    )
+    mock_repository.get_version.return_value = 1
+    mock_repository.get_all_inventory.return_value = {
+        "Produto A": {"quantity": 5, "min_stock": 10},
+    }
+
+    [before] = service.get_low_stock_items()
+    now[0] = 7 * SECONDS_PER_DAY
+    [after] = service.get_low_stock_items()
+
+    assert after.days_until_stockout > before.days_until_stockout
+    assert after.days_until_stockout == forecaster.days_until_stockout(
+        "tenant_1", "Produto A", 5
+    )
+
+
 def test_request_restock_returns_success_response(service):
-    result = service.request_restock("Produto A", 50)
+    result = asyncio.run(service.request_restock("Produto A", 50))
 
     assert result.status == RestockStatus.SUCCESS
     assert result.tenant_id == "tenant_1"
@@ -113,6 +202,240 @@ def test_request_restock_returns_success_response(service):
 
 
 def test_request_restock_includes_descriptive_message(service):
-    result = service.request_restock("Produto A", 50)
+    result = asyncio.run(service.request_restock("Produto A", 50))
+
+    assert "reabastecimento" in result.message.lower()
+
+
+def test_get_restock_recommendations_rounds_up_to_pack_size(service, mock_repository):
+    mock_repository.get_low_stock_items.return_value = {
+        "Produto B": {"quantity": 3, "min_stock": 10},
+    }
+
+    result = service.get_restock_recommendations(
+        RestockPolicy(target_multiplier=2.0, safety_stock=0, pack_size=6)
+    )
+
+    assert len(result) == 1
+    assert result[0].target_stock == 20
+    assert result[0].suggested_quantity == 18
+
+
+def test_get_restock_recommendations_uses_exact_multiplier(service, mock_repository):
+    mock_repository.get_low_stock_items.return_value = {
+        "Produto B": {"quantity": 40, "min_stock": 50},
+    }
+
+    result = service.get_restock_recommendations(
+        RestockPolicy(target_multiplier=1.1, safety_stock=0, pack_size=1)
+    )
+
+    assert result[0].target_stock == 55
+    assert result[0].suggested_quantity == 15
+
+
+def test_get_restock_recommendations_uses_cache_until_version_changes(
+    mock_repository,
+):
+    cache = RecommendationCache()
+    service = InventoryService(
+        tenant_id="tenant_1",
+        repository=mock_repository,
+        recommendation_cache=cache,
+    )
+    mock_repository.get_version.return_value = 1
+    mock_repository.get_low_stock_items.return_value = {
+        "Produto B": {"quantity": 3, "min_stock": 10},
+    }
+
+    service.get_restock_recommendations(RestockPolicy())
+    service.get_restock_recommendations(RestockPolicy())
+    assert mock_repository.get_low_stock_items.call_count == 1
+
+    mock_repository.get_version.return_value = 2
+    service.get_restock_recommendations(RestockPolicy())
+    assert mock_repository.get_low_stock_items.call_count == 2
+
+
+def test_record_movement_updates_repository_and_movement_log(mock_repository):
+    movement_log = Mock()
+    service = InventoryService(
+        tenant_id="tenant_1", repository=mock_repository, movement_log=movement_log
+    )
+    mock_repository.get_inventory.return_value = {"quantity": 10, "min_stock": 5}
+    mock_repository.update_quantity.return_value = {"quantity": 4, "min_stock": 5}
+
+    result = service.record_movement("Produto A", -6)
+
+    assert result.quantity == 4
+    assert result.needs_restock is True
+    mock_repository.update_quantity.assert_called_once_with(
+        tenant_id="tenant_1",
+        product_name="Produto A",
+        quantity=4,
+        location="Principal",
+    )
+    movement_log.append.assert_called_once_with(
+        tenant_id="tenant_1", product_name="Produto A", delta=-6, quantity=4
+    )
+
+
+def test_get_movement_history_queries_log_outside_event_loop(mock_repository):
+    threads = []
+    movement_log = Mock()
+    movement_log.query.side_effect = lambda **kwargs: (
+        threads.append(threading.get_ident()) or [(1_000_000_000, -6, 4)]
+    )
+    service = InventoryService(
+        tenant_id="tenant_1", repository=mock_repository, movement_log=movement_log
+    )
+    mock_repository.get_inventory.return_value = {"quantity": 4, "min_stock": 5}
+
+    [movement] = asyncio.run(service.get_movement_history("Produto A"))
+
+    assert movement.delta == -6
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_record_movement_raises_when_stock_would_be_negative(
+    service, mock_repository
+):
+    mock_repository.get_inventory.return_value = {"quantity": 3, "min_stock": 5}
+
+    with pytest.raises(ValueError):
+        service.record_movement("Produto A", -4)
+
+    mock_repository.update_quantity.assert_not_called()
+
+
+def test_record_movement_publishes_event_when_crossing_min_stock(mock_repository):
+    dispatcher = Mock()
+    service = InventoryService(
+        tenant_id="tenant_1",
+        repository=mock_repository,
+        webhook_dispatcher=dispatcher,
+    )
+    mock_repository.get_inventory.return_value = {"quantity": 6, "min_stock": 5}
+    mock_repository.update_quantity.return_value = {"quantity": 4, "min_stock": 5}
+
+    service.record_movement("Produto A", -2)
+
+    event = dispatcher.publish.call_args.args[0]
+    assert event.type == WebhookEventType.LOW_STOCK
+    assert event.tenant_id == "tenant_1"
+    assert event.quantity == 4
+    assert event.needs_restock is True
+
+
+def test_record_movement_without_crossing_publishes_nothing(mock_repository):
+    dispatcher = Mock()
+    service = InventoryService(
+        tenant_id="tenant_1",
+        repository=mock_repository,
+        webhook_dispatcher=dispatcher,
+    )
+    mock_repository.get_inventory.return_value = {"quantity": 3, "min_stock": 5}
+    mock_repository.update_quantity.return_value = {"quantity": 2, "min_stock": 5}
+
+    service.record_movement("Produto A", -1)
+
+    dispatcher.publish.assert_not_called()
+
+
+def test_get_predicted_stockouts_sorts_by_days_until_stockout(mock_repository):
+    forecaster = Mock()
+    forecaster.get_tenant_rates.return_value = {"Produto A": 1.0, "Produto B": 10.0}
+    service = InventoryService(
+        tenant_id="tenant_1", repository=mock_repository, forecaster=forecaster
+    )
+    mock_repository.get_inventory.side_effect = lambda tenant_id, product_name: {
+        "Produto A": {"quantity": 30, "min_stock": 5},
+        "Produto B": {"quantity": 20, "min_stock": 5},
+    }[product_name]
+
+    result = service.get_predicted_stockouts()
+
+    assert [item.product_name for item in result] == ["Produto B", "Produto A"]
+    assert result[0].days_until_stockout == 2.0
+
+    assert [item.product_name for item in service.get_predicted_stockouts(5)] == [
+        "Produto B"
+    ]
+
+
+def test_get_predicted_stockouts_skips_products_idle_for_weeks(mock_repository):
+    now = [0.0]
+    forecaster = ConsumptionForecaster(clock=lambda: now[0])
+    forecaster.observe("tenant_1", "Produto A", -1, timestamp=0.0)
+    service = InventoryService(
+        tenant_id="tenant_1", repository=mock_repository, forecaster=forecaster
+    )
+    mock_repository.get_inventory.return_value = {"quantity": 30, "min_stock": 5}
+
+    assert len(service.get_predicted_stockouts()) == 1
+
+    now[0] = 60 * SECONDS_PER_DAY
+    assert service.get_predicted_stockouts() == []
+
+
+def test_concurrent_low_stock_reads_are_coalesced(mock_repository):
+    single_flight = SingleFlight()
+    service = InventoryService(
+        tenant_id="tenant_1", repository=mock_repository, single_flight=single_flight
+    )
+    mock_repository.get_version.return_value = 1
+    mock_repository.snapshot_inventory.return_value = {
+        "Produto A": {"quantity": 15, "min_stock": 5},
+        "Produto B": {"quantity": 3, "min_stock": 10},
+    }
+
+    async def scenario():
+        return await asyncio.gather(
+            *[service.get_low_stock_items_json() for _ in range(5)]
+        )
+
+    results = asyncio.run(scenario())
+
+    mock_repository.snapshot_inventory.assert_called_once_with("tenant_1")
+    mock_repository.get_all_inventory.assert_not_called()
+    assert all(result is results[0] for result in results)
+    assert json.loads(results[0])[0]["product_name"] == "Produto B"
+    assert single_flight.stats()["get_low_stock_items"]["coalesced"] == 4
+
+
+def test_record_movement_applies_delta_to_the_given_location(mock_repository):
+    service = InventoryService(tenant_id="tenant_1", repository=mock_repository)
+    mock_repository.get_inventory.return_value = {
+        "quantity": 15,
+        "min_stock": 5,
+        "locations": {"Depósito": 10, "Prateleira": 5},
+    }
+    mock_repository.update_quantity.return_value = {
+        "quantity": 12,
+        "min_stock": 5,
+        "locations": {"Depósito": 10, "Prateleira": 2},
+    }
+
+    result = service.record_movement("Produto A", -3, location="Prateleira")
+
+    mock_repository.update_quantity.assert_called_once_with(
+        tenant_id="tenant_1",
+        product_name="Produto A",
+        quantity=2,
+        location="Prateleira",
+    )
+    assert result.quantity == 12
+    assert result.locations == {"Depósito": 10, "Prateleira": 2}
+
+
+def test_record_movement_rejects_withdrawal_above_location_stock(
+    service, mock_repository
+):
+    mock_repository.get_inventory.return_value = {
+        "quantity": 15,
+        "min_stock": 5,
+        "locations": {"Depósito": 10, "Prateleira": 5},
+    }
 
-    assert "reabastecimento" in result.message.lower()
\ No newline at end of file
+    with pytest.raises(ValueError):
+        service.record_movement("Produto A", -6, location="Prateleira")
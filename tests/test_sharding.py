@@ -0,0 +1,311 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+from app.database.database import MOCK_INVENTORY_DB
+from app.sharding.rebalance import move_tenant
+from app.sharding.ring import ConsistentHashRing
+from app.sharding.state import ShardSettings
+
+TENANTS = [f"Loja{index}" for index in range(1000)]
+SHARD_TOKEN = "test-shard-token"
+SHARD_HEADERS = {"X-Shard-Token": SHARD_TOKEN}
+
+
+def test_ring_assignment_is_deterministic():
+    ring_a = ConsistentHashRing(shards=["shard-a", "shard-b", "shard-c"])
+    ring_b = ConsistentHashRing(shards=["shard-c", "shard-a", "shard-b"])
+
+    assert [ring_a.get_shard(t) for t in TENANTS] == [
+        ring_b.get_shard(t) for t in TENANTS
+    ]
+
+
+def test_ring_spreads_tenants_across_shards():
+    ring = ConsistentHashRing(shards=["shard-a", "shard-b", "shard-c"])
+
+    counts = {}
+    for tenant_id in TENANTS:
+        shard_id = ring.get_shard(tenant_id)
+        counts[shard_id] = counts.get(shard_id, 0) + 1
+
+    assert set(counts) == {"shard-a", "shard-b", "shard-c"}
+    assert min(counts.values()) > len(TENANTS) / 3 * 0.6
+
+
+def test_adding_a_shard_only_moves_tenants_to_the_new_shard():
+    ring = ConsistentHashRing(shards=["shard-a", "shard-b"])
+    before = {tenant_id: ring.get_shard(tenant_id) for tenant_id in TENANTS}
+
+    ring.add_shard("shard-c")
+
+    moved = [t for t in TENANTS if ring.get_shard(t) != before[t]]
+    assert moved
+    assert all(ring.get_shard(t) == "shard-c" for t in moved)
+    assert len(moved) < len(TENANTS) / 2
+
+
+def test_pins_override_the_ring():
+    ring = ConsistentHashRing(shards=["shard-a", "shard-b"])
+    tenant_id = next(t for t in TENANTS if ring.get_shard(t) == "shard-a")
+
+    ring.pin(tenant_id, "shard-b")
+
+    assert ring.get_shard(tenant_id) == "shard-b"
+    with pytest.raises(ValueError):
+        ring.pin(tenant_id, "shard-x")
+
+
+def test_shard_settings_require_internal_token(monkeypatch):
+    monkeypatch.setenv("STOCKWISE_SHARD_ID", "shard-a")
+    monkeypatch.setenv("STOCKWISE_SHARDS", "shard-a=http://127.0.0.1:8001")
+    monkeypatch.delenv("STOCKWISE_SHARD_TOKEN", raising=False)
+
+    with pytest.raises(ValueError, match="STOCKWISE_SHARD_TOKEN"):
+        ShardSettings.from_env()
+
+    monkeypatch.setenv("STOCKWISE_SHARD_TOKEN", SHARD_TOKEN)
+    assert ShardSettings.from_env().token == SHARD_TOKEN
+
+
+def test_failed_pin_aborts_move_without_split_brain():
+    shard_urls = {
+        "shard-a": "http://shard-a",
+        "shard-b": "http://shard-b",
+        "shard-c": "http://shard-c",
+    }
+    snapshot = {"tenant_id": "LojaX", "version": 3, "inventory": {}}
+    calls = []
+    failed = []
+
+    def handler(request):
+        shard = request.url.host
+        action = request.url.path.rsplit("/", 1)[-1]
+        calls.append((request.method, shard, action, request.content or None))
+        if action == "owner":
+            return httpx.Response(200, json={"shard_id": "shard-a"})
+        if action == "freeze":
+            return httpx.Response(200, json={**snapshot, "version": 4})
+        # O primeiro PUT de atribuição em shard-c falha no meio da migração
+        if request.method == "PUT" and shard == "shard-c" and not failed:
+            failed.append(shard)
+            return httpx.Response(503)
+        return httpx.Response(204)
+
+    async def rebalance():
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await move_tenant(
+                    "LojaX", "shard-b", shard_urls, client, SHARD_TOKEN
+                )
+
+    asyncio.run(rebalance())
+
+    to_source = b'{"shard_id":"shard-a"}'
+    assert [call[:3] for call in calls[5:]] == [
+        ("POST", "shard-b", "freeze"),
+        ("PUT", "shard-a", "LojaX"),
+        ("PUT", "shard-b", "LojaX"),
+        ("PUT", "shard-c", "LojaX"),
+        ("POST", "shard-b", "release"),
+        ("POST", "shard-a", "release"),
+    ]
+    assert b'"version":4' in calls[6][3]
+    assert calls[7][3] == calls[8][3] == to_source
+
+
+# --- Integração com vários processos locais ---
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def cluster(tmp_path_factory):
+    ports = {"shard-a": _free_port(), "shard-b": _free_port()}
+    urls = {shard: f"http://127.0.0.1:{port}" for shard, port in ports.items()}
+    shards = ",".join(f"{shard}={url}" for shard, url in urls.items())
+
+    processes = []
+    for shard_id, port in ports.items():
+        env = {
+            **os.environ,
+            "STOCKWISE_SHARD_ID": shard_id,
+            "STOCKWISE_SHARDS": shards,
+            "STOCKWISE_SHARD_TOKEN": SHARD_TOKEN,
+            "STOCKWISE_MOVEMENT_LOG_DIR": str(tmp_path_factory.mktemp(shard_id)),
+        }
+        processes.append(
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "uvicorn",
+                    "app.main:app",
+                    "--host",
+                    "127.0.0.1",
+                    "--port",
+                    str(port),
+                    "--log-level",
+                    "warning",
+                ],
+                env=env,
+            )
+        )
+
+    try:
+        deadline = time.monotonic() + 20
+        for url in urls.values():
+            while True:
+                try:
+                    if httpx.get(f"{url}/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    pytest.fail("Shards não iniciaram a tempo")
+                time.sleep(0.1)
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+def test_each_shard_loads_only_its_own_tenants(cluster):
+    ring = ConsistentHashRing(shards=list(cluster))
+
+    for shard_id, url in cluster.items():
+        ring_status = httpx.get(
+            f"{url}/internal/shards/ring", headers=SHARD_HEADERS
+        ).json()
+        assert ring_status["local_tenants"] == sorted(
+            t for t in MOCK_INVENTORY_DB if ring.get_shard(t) == shard_id
+        )
+
+
+def test_requests_are_routed_to_the_owner_shard(cluster):
+    for url in cluster.values():
+        for tenant_id, products in MOCK_INVENTORY_DB.items():
+            response = httpx.get(
+                f"{url}/api/v1/inventory/Parafuso M8",
+                headers={"X-Tenant-ID": tenant_id},
+            )
+            assert response.status_code == 200
+            assert response.json()["quantity"] == products["Parafuso M8"]["quantity"]
+
+
+def test_rebalance_moves_tenant_between_shards(cluster):
+    ring = ConsistentHashRing(shards=list(cluster))
+    tenant_id = "LojaB"
+    source = ring.get_shard(tenant_id)
+    target = next(shard_id for shard_id in cluster if shard_id != source)
+
+    httpx.post(
+        f"{cluster[source]}/api/v1/inventory/Martelo/movements",
+        headers={"X-Tenant-ID": tenant_id},
+        json={"delta": -4},
+    ).raise_for_status()
+    httpx.put(
+        f"{cluster[source]}/api/v1/inventory/alerts/rules",
+        headers={"X-Tenant-ID": tenant_id},
+        json={"rules": [{"id": "zerado", "max_quantity": 0}]},
+    ).raise_for_status()
+
+    async def rebalance():
+        async with httpx.AsyncClient() as client:
+            return await move_tenant(
+                tenant_id, target, cluster, client, SHARD_TOKEN
+            )
+
+    assert asyncio.run(rebalance()) == source
+
+    target_ring = httpx.get(
+        f"{cluster[target]}/internal/shards/ring", headers=SHARD_HEADERS
+    ).json()
+    source_ring = httpx.get(
+        f"{cluster[source]}/internal/shards/ring", headers=SHARD_HEADERS
+    ).json()
+    assert tenant_id in target_ring["local_tenants"]
+    assert tenant_id not in source_ring["local_tenants"]
+
+    for url in cluster.values():
+        response = httpx.get(
+            f"{url}/api/v1/inventory/Martelo", headers={"X-Tenant-ID": tenant_id}
+        )
+        assert response.json()["quantity"] == 26
+
+    rules = httpx.get(
+        f"{cluster[target]}/api/v1/inventory/alerts/rules",
+        headers={"X-Tenant-ID": tenant_id},
+    ).json()
+    assert [rule["id"] for rule in rules["rules"]] == ["zerado"]
+
+
+def test_write_forwarded_to_frozen_source_reaches_new_owner(cluster):
+    ring = ConsistentHashRing(shards=list(cluster))
+    tenant_id = next(tenant for tenant in MOCK_INVENTORY_DB if tenant != "LojaB")
+    source = ring.get_shard(tenant_id)
+    target = next(shard_id for shard_id in cluster if shard_id != source)
+    quantity = MOCK_INVENTORY_DB[tenant_id]["Parafuso M8"]["quantity"]
+    tenant_url = f"internal/shards/tenants/{tenant_id}"
+
+    async def move_with_write_through_target():
+        async with httpx.AsyncClient(headers=SHARD_HEADERS) as client:
+            response = await client.post(f"{cluster[source]}/{tenant_url}/freeze")
+            snapshot = response.raise_for_status().json()
+
+            # O destino ainda não é dono: repassa a escrita à origem, que a retém
+            write = asyncio.create_task(
+                client.post(
+                    f"{cluster[target]}/api/v1/inventory/Parafuso M8/movements",
+                    headers={"X-Tenant-ID": tenant_id},
+                    json={"delta": -1},
+                )
+            )
+            await asyncio.sleep(0.3)
+            assert not write.done()
+
+            await client.put(f"{cluster[target]}/{tenant_url}", json=snapshot)
+            for shard_id in (target, source):
+                await client.put(
+                    f"{cluster[shard_id]}/internal/shards/assignments/{tenant_id}",
+                    json={"shard_id": target},
+                )
+            await client.post(
+                f"{cluster[source]}/{tenant_url}/release", params={"drop": "true"}
+            )
+            return await write
+
+    response = asyncio.run(move_with_write_through_target())
+
+    assert response.status_code == 200
+    assert response.json()["quantity"] == quantity - 1
+    item = httpx.get(
+        f"{cluster[target]}/api/v1/inventory/Parafuso M8",
+        headers={"X-Tenant-ID": tenant_id},
+    ).json()
+    assert item["quantity"] == quantity - 1
+
+
+def test_internal_routes_reject_missing_or_wrong_token(cluster):
+    url = next(iter(cluster.values()))
+
+    assert httpx.get(f"{url}/internal/shards/ring").status_code == 403
+    assert (
+        httpx.get(
+            f"{url}/internal/shards/ring", headers={"X-Shard-Token": "errado"}
+        ).status_code
+        == 403
+    )
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+@pytest.fixture
+def single_flight():
+    return SingleFlight()
+
+
+def test_concurrent_identical_calls_share_one_execution(single_flight):
+    executions = []
+
+    async def operation():
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return b"[]"
+
+    async def scenario():
+        return await asyncio.gather(
+            *[
+                single_flight.do(("tenant_1", "get_all_inventory", ()), operation)
+                for _ in range(10)
+            ]
+        )
+
+    results = asyncio.run(scenario())
+
+    assert len(executions) == 1
+    assert all(result is results[0] for result in results)
+    assert single_flight.stats() == {
+        "get_all_inventory": {"calls": 10, "executions": 1, "coalesced": 9}
+    }
+
+
+def test_different_keys_are_not_coalesced(single_flight):
+    async def operation():
+        await asyncio.sleep(0.01)
+        return b"[]"
+
+    async def scenario():
+        await asyncio.gather(
+            single_flight.do(("tenant_1", "get_all_inventory", ()), operation),
+            single_flight.do(("tenant_2", "get_all_inventory", ()), operation),
+        )
+
+    asyncio.run(scenario())
+
+    assert single_flight.stats()["get_all_inventory"]["executions"] == 2
+
+
+def test_sequential_calls_execute_again(single_flight):
+    async def operation():
+        return b"[]"
+
+    async def scenario():
+        await single_flight.do(("tenant_1", "get_low_stock_items", ()), operation)
+        await single_flight.do(("tenant_1", "get_low_stock_items", ()), operation)
+
+    asyncio.run(scenario())
+
+    assert single_flight.stats()["get_low_stock_items"]["coalesced"] == 0
+
+
+def test_errors_are_propagated_to_all_waiters(single_flight):
+    async def operation():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("falha")
+
+    async def scenario():
+        return await asyncio.gather(
+            single_flight.do(("tenant_1", "get_all_inventory", ()), operation),
+            single_flight.do(("tenant_1", "get_all_inventory", ()), operation),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_leader_does_not_cancel_waiters(single_flight):
+    executions = []
+
+    async def operation():
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return b"[]"
+
+    async def scenario():
+        key = ("tenant_1", "get_all_inventory", ())
+        leader = asyncio.create_task(single_flight.do(key, operation))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(single_flight.do(key, operation)) for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        return leader.cancelled(), results
+
+    leader_cancelled, results = asyncio.run(scenario())
+
+    assert leader_cancelled
+    assert results == [b"[]"] * 3
+    assert single_flight.stats()["get_all_inventory"] == {
+        "calls": 4,
+        "executions": 2,
+        "coalesced": 2,
+    }
@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import startup
+from app.main import app
+
+
+# Processo novo em fast startup: imprime o fingerprint servido em /openapi.json
+SERVE_OPENAPI = """
+from fastapi.testclient import TestClient
+from app.main import app
+with TestClient(app) as client:
+    info = client.get("/openapi.json").json()["info"]
+print(info.get("x-routes-fingerprint"))
+"""
+
+
+@pytest.fixture
+def reset_openapi():
+    """Descarta o documento OpenAPI em cache após cada teste."""
+    yield
+    app.openapi_schema = None
+    vars(app).pop("openapi", None)
+
+
+def test_precomputed_openapi_is_served_by_a_fresh_process(tmp_path):
+    path = startup.build_openapi_cache(app, str(tmp_path / "openapi.json"))
+
+    result = subprocess.run(
+        [sys.executable, "-c", SERVE_OPENAPI],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={
+            **os.environ,
+            "STOCKWISE_FAST_STARTUP": "1",
+            "STOCKWISE_OPENAPI_PATH": path,
+            "STOCKWISE_MOVEMENT_LOG_DIR": str(tmp_path / "movements"),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == startup.routes_fingerprint(app)
+
+
+def test_installed_openapi_replaces_generation(tmp_path, reset_openapi):
+    path = startup.build_openapi_cache(app, str(tmp_path / "openapi.json"))
+    app.openapi_schema = None
+
+    assert startup.install_precomputed_openapi(app, path) is True
+
+    client = TestClient(app)
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert response.json()["info"][startup.FINGERPRINT_KEY] == (
+        startup.routes_fingerprint(app)
+    )
+
+
+def test_stale_precomputed_openapi_is_ignored(tmp_path, reset_openapi):
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps({"info": {startup.FINGERPRINT_KEY: "antigo"}}))
+
+    assert startup.install_precomputed_openapi(app, str(path)) is False
+    assert startup.install_precomputed_openapi(app, str(tmp_path / "x")) is False
+    assert app.openapi_schema is None
+
+
+def test_fingerprint_changes_when_model_sources_change(monkeypatch, tmp_path):
+    models = tmp_path / "models"
+    models.mkdir()
+    schema_file = models / "schemas.py"
+    schema_file.write_text("class Item(BaseModel):\n    quantity: int\n")
+    monkeypatch.setattr(startup, "SCHEMA_SOURCES", [str(models)])
+    before = startup.routes_fingerprint(app)
+
+    schema_file.write_text("class Item(BaseModel):\n    quantity: float\n")
+
+    assert startup.routes_fingerprint(app) != before
+
+
+def test_fast_startup_lifespan_prewarms(monkeypatch, tmp_path, reset_openapi):
+    monkeypatch.setattr(startup, "FAST_STARTUP", True)
+    monkeypatch.setattr(startup, "OPENAPI_CACHE_PATH", str(tmp_path / "ausente"))
+    prewarm_calls = []
+    prewarm_models = startup.prewarm_models
+
+    def spy_prewarm_models():
+        prewarm_calls.append(app.openapi_schema is not None)
+        prewarm_models()
+
+    monkeypatch.setattr(startup, "prewarm_models", spy_prewarm_models)
+
+    with TestClient(app) as client:
+        # Antes da primeira requisição: OpenAPI gerado e modelos aquecidos
+        assert prewarm_calls == [True]
+        assert app.openapi_schema is not None
+        assert client.get("/health").json() == {"status": "healthy"}
+
+    assert prewarm_calls == [True]
@@ -0,0 +1,362 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.schemas import WebhookEvent, WebhookEventType
+from app.services.webhooks import (
+    DELIVERY_HEADER,
+    WEBHOOK_DISPATCHER,
+    WebhookDestinationError,
+    WebhookDispatcher,
+)
+
+# O receptor dos testes escuta em loopback, recusado por padrão
+LOCAL_HOSTS = {"127.0.0.1"}
+
+
+class StubReceiver:
+    """Servidor HTTP local que registra os POSTs e responde com status programados."""
+
+    def __init__(self):
+        self.requests = []
+        self.statuses = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                receiver.requests.append((dict(self.headers), json.loads(body)))
+                status = receiver.statuses.pop(0) if receiver.statuses else 200
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.01,), daemon=True
+        )
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def receiver():
+    stub = StubReceiver()
+    yield stub
+    stub.close()
+
+
+def make_event(tenant_id="LojaA", product_name="Parafuso M8", quantity=4):
+    return WebhookEvent(
+        id=uuid.uuid4().hex,
+        type=WebhookEventType.LOW_STOCK,
+        tenant_id=tenant_id,
+        product_name=product_name,
+        quantity=quantity,
+        min_stock=5,
+        needs_restock=True,
+        occurred_at=datetime.now(),
+    )
+
+
+async def run_until(dispatcher, predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    await dispatcher.stop()
+
+
+def test_events_for_same_endpoint_are_batched(receiver):
+    dispatcher = WebhookDispatcher(batch_window=0.05, allowed_hosts=LOCAL_HOSTS)
+
+    async def scenario():
+        await dispatcher.subscribe("LojaA", receiver.url)
+        await dispatcher.start()
+        for quantity in (3, 2, 1):
+            dispatcher.publish(make_event(quantity=quantity))
+        await run_until(dispatcher, lambda: receiver.requests)
+
+    asyncio.run(scenario())
+
+    assert len(receiver.requests) == 1
+    _, payload = receiver.requests[0]
+    assert payload["tenant_id"] == "LojaA"
+    assert [event["quantity"] for event in payload["events"]] == [3, 2, 1]
+
+
+def test_failed_delivery_is_retried_with_same_delivery_id(receiver):
+    receiver.statuses = [503, 500]
+    dispatcher = WebhookDispatcher(
+        batch_window=0.01, base_delay=0.01, allowed_hosts=LOCAL_HOSTS
+    )
+
+    async def scenario():
+        await dispatcher.subscribe("LojaA", receiver.url)
+        await dispatcher.start()
+        dispatcher.publish(make_event())
+        await run_until(dispatcher, lambda: len(receiver.requests) == 3)
+
+    asyncio.run(scenario())
+
+    assert len(receiver.requests) == 3
+    assert len({headers[DELIVERY_HEADER] for headers, _ in receiver.requests}) == 1
+    assert dispatcher.get_dead_letters("LojaA") == []
+
+
+def test_exhausted_retries_go_to_dead_letters(receiver):
+    receiver.statuses = [500] * 3
+    dispatcher = WebhookDispatcher(
+        batch_window=0.01, base_delay=0.01, max_attempts=3, allowed_hosts=LOCAL_HOSTS
+    )
+
+    async def scenario():
+        await dispatcher.subscribe("LojaA", receiver.url)
+        await dispatcher.start()
+        dispatcher.publish(make_event())
+        await run_until(dispatcher, lambda: dispatcher.get_dead_letters("LojaA"))
+
+    asyncio.run(scenario())
+
+    [dead_letter] = dispatcher.get_dead_letters("LojaA")
+    assert dead_letter.attempts == 3
+    assert dead_letter.error == "HTTP 500"
+    assert dead_letter.url == receiver.url
+    assert len(dead_letter.events) == 1
+
+
+def test_client_errors_are_not_retried(receiver):
+    receiver.statuses = [410]
+    dispatcher = WebhookDispatcher(
+        batch_window=0.01, base_delay=0.01, allowed_hosts=LOCAL_HOSTS
+    )
+
+    async def scenario():
+        await dispatcher.subscribe("LojaA", receiver.url)
+        await dispatcher.start()
+        dispatcher.publish(make_event())
+        await run_until(dispatcher, lambda: dispatcher.get_dead_letters("LojaA"))
+
+    asyncio.run(scenario())
+
+    assert len(receiver.requests) == 1
+    assert dispatcher.get_dead_letters("LojaA")[0].attempts == 1
+
+
+def test_unreachable_endpoint_goes_to_dead_letters(receiver):
+    url = receiver.url
+    receiver.close()
+    dispatcher = WebhookDispatcher(
+        batch_window=0.01, base_delay=0.01, max_attempts=2, allowed_hosts=LOCAL_HOSTS
+    )
+
+    async def scenario():
+        await dispatcher.subscribe("LojaA", url)
+        await dispatcher.start()
+        dispatcher.publish(make_event())
+        await run_until(dispatcher, lambda: dispatcher.get_dead_letters("LojaA"))
+
+    asyncio.run(scenario())
+
+    [dead_letter] = dispatcher.get_dead_letters("LojaA")
+    assert dead_letter.attempts == 2
+    assert dead_letter.error.startswith("ConnectError")
+
+
+def test_full_queue_dead_letters_the_event(receiver):
+    dispatcher = WebhookDispatcher(
+        max_queue_size=1, batch_window=0.01, allowed_hosts=LOCAL_HOSTS
+    )
+
+    async def scenario():
+        await dispatcher.subscribe("LojaA", receiver.url)
+        await dispatcher.start()
+        dispatcher.publish(make_event(quantity=2))
+        dispatcher.publish(make_event(quantity=1))
+        await run_until(dispatcher, lambda: receiver.requests)
+
+    asyncio.run(scenario())
+
+    assert dispatcher.dropped == 1
+    [dead_letter] = dispatcher.get_dead_letters("LojaA")
+    assert dead_letter.attempts == 0
+    assert dead_letter.events[0].quantity == 1
+
+
+def test_events_without_subscription_are_ignored():
+    dispatcher = WebhookDispatcher()
+
+    assert dispatcher.publish(make_event()) is False
+    assert dispatcher.dropped == 0
+
+
+def test_backoff_grows_exponentially_with_jitter():
+    dispatcher = WebhookDispatcher(base_delay=1.0, max_delay=5.0)
+
+    for attempt, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 5.0), (10, 5.0)]:
+        delays = [dispatcher.backoff(attempt) for _ in range(50)]
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+        assert len(set(delays)) > 1
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://127.0.0.1:8000/hook",
+        "http://localhost/hook",
+        "http://10.0.0.5/hook",
+        "http://192.168.1.10/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+        "http://[::ffff:127.0.0.1]/hook",
+    ],
+)
+def test_subscribe_rejects_internal_addresses(url):
+    dispatcher = WebhookDispatcher()
+
+    with pytest.raises(WebhookDestinationError):
+        asyncio.run(dispatcher.subscribe("LojaA", url))
+
+    assert dispatcher.list_subscriptions("LojaA") == []
+
+
+def test_subscribe_accepts_public_addresses():
+    dispatcher = WebhookDispatcher()
+
+    asyncio.run(dispatcher.subscribe("LojaA", "https://93.184.216.34/hook"))
+
+    assert len(dispatcher.list_subscriptions("LojaA")) == 1
+
+
+def test_delivery_connects_to_the_validated_address(monkeypatch):
+    # DNS rebinding: as verificações (cadastro e entrega) recebem um endereço
+    # público; qualquer resolução posterior apontaria para loopback
+    answers = ["93.184.216.34", "93.184.216.34"]
+
+    def fake_getaddrinfo(host, port, *args, **kwargs):
+        address = answers.pop(0) if answers else "127.0.0.1"
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", fake_getaddrinfo)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200)
+
+    dispatcher = WebhookDispatcher(
+        batch_window=0.01,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    async def scenario():
+        await dispatcher.subscribe("LojaA", "https://hooks.example.com:8443/hook")
+        await dispatcher.start()
+        dispatcher.publish(make_event())
+        await run_until(dispatcher, lambda: requests)
+
+    asyncio.run(scenario())
+
+    [request] = requests
+    assert answers == []
+    assert request.url.host == "93.184.216.34"
+    assert request.url.port == 8443
+    assert request.headers["host"] == "hooks.example.com:8443"
+    assert request.extensions["sni_hostname"] == "hooks.example.com"
+
+
+def test_delivery_to_address_no_longer_allowed_is_dead_lettered(receiver):
+    dispatcher = WebhookDispatcher(batch_window=0.01, allowed_hosts=LOCAL_HOSTS)
+
+    async def scenario():
+        await dispatcher.subscribe("LojaA", receiver.url)
+        dispatcher.allowed_hosts = frozenset()
+        await dispatcher.start()
+        dispatcher.publish(make_event())
+        await run_until(dispatcher, lambda: dispatcher.get_dead_letters("LojaA"))
+
+    asyncio.run(scenario())
+
+    assert receiver.requests == []
+    [dead_letter] = dispatcher.get_dead_letters("LojaA")
+    assert dead_letter.attempts == 1
+    assert "não permitido" in dead_letter.error
+
+
+@pytest.fixture
+def allow_local_webhooks(monkeypatch):
+    monkeypatch.setattr(WEBHOOK_DISPATCHER, "allowed_hosts", frozenset(LOCAL_HOSTS))
+
+
+def test_movement_crossing_min_stock_notifies_subscribers(
+    receiver, allow_local_webhooks
+):
+    headers = {"X-Tenant-ID": "LojaB"}
+    with TestClient(app) as client:
+        subscription = client.post(
+            "/api/v1/webhooks", json={"url": receiver.url}, headers=headers
+        )
+        assert subscription.status_code == 201
+        assert client.get("/api/v1/webhooks", headers=headers).json() == [
+            subscription.json()
+        ]
+
+        # LojaB - Parafuso M8: 150 unidades (100 no Depósito), mínimo 50
+        for movement in (
+            {"delta": -100},
+            {"delta": -1, "location": "Prateleira"},
+            {"delta": 60},
+        ):
+            response = client.post(
+                "/api/v1/inventory/Parafuso M8/movements",
+                json=movement,
+                headers=headers,
+            )
+            assert response.status_code == 200
+
+    events = [event for _, payload in receiver.requests for event in payload["events"]]
+    assert [event["type"] for event in events] == [
+        "inventory.low_stock",
+        "inventory.restocked",
+    ]
+    assert events[0]["quantity"] == 49
+    assert events[1]["quantity"] == 109
+
+
+def test_subscription_to_internal_address_returns_422():
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/v1/webhooks",
+        json={"url": "http://169.254.169.254/latest/meta-data"},
+        headers={"X-Tenant-ID": "LojaA"},
+    )
+
+    assert response.status_code == 422
+    assert "não permitido" in response.json()["detail"]
+
+
+def test_delete_unknown_subscription_returns_404():
+    client = TestClient(app)
+
+    response = client.delete(
+        "/api/v1/webhooks/inexistente", headers={"X-Tenant-ID": "LojaA"}
+    )
+
+    assert response.status_code == 404